@@ -0,0 +1,2 @@
+# lib/benchmarks/__init__.py
+# Run from lib/:  python -m benchmarks.<name>
@@ -0,0 +1,153 @@
+# lib/benchmarks/analytics.py
+"""Analytics over hydrated Employee objects vs. models.analytics.EmployeeSnapshot.
+
+Both sides load every employee with their projects once, then answer the same
+questions: department payroll, salary bands for one department, top 10 earners and
+the staffing ratios of one project. Memory is what stays allocated after loading
+(tracemalloc); query times are the median of several runs, indexes already built.
+Finally some changes are committed and the snapshot is refreshed from the change log.
+
+    cd lib && python -m benchmarks.analytics [employees]
+"""
+import heapq
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+
+from sqlalchemy.orm import selectinload
+from tabulate import tabulate
+
+from benchmarks.synthetic import generate
+from models import Session, make_engine
+from models.analytics import EmployeeSnapshot
+from models.employee import Employee
+from models.project import Project
+
+BANDS = [40_000, 60_000, 80_000, 100_000]
+DEPARTMENT, PROJECT = 3, 5
+
+
+def orm_queries(employees):
+    def payroll():
+        out = {}
+        for e in employees:
+            n, total, low, high = out.get(e.department_id, (0, 0.0, e.salary, e.salary))
+            out[e.department_id] = (n + 1, total + e.salary, min(low, e.salary), max(high, e.salary))
+        return out
+
+    def bands():
+        counts = [0] * (len(BANDS) + 1)
+        for e in employees:
+            if e.department_id == DEPARTMENT:
+                counts[sum(e.salary >= b for b in BANDS)] += 1
+        return counts
+
+    def top():
+        return [(e.id, e.salary) for e in heapq.nlargest(10, employees, key=lambda e: (e.salary, e.id))]
+
+    def staffing():
+        headcount, assigned = defaultdict(int), defaultdict(int)
+        for e in employees:
+            headcount[e.department_id] += 1
+            if any(p.id == PROJECT for p in e.projects):
+                assigned[e.department_id] += 1
+        return {d: (n, headcount[d], n / headcount[d]) for d, n in sorted(assigned.items())}
+
+    return {"payroll": payroll, "salary bands": bands, "top 10": top, "staffing": staffing}
+
+
+def snapshot_queries(snap):
+    return {
+        "payroll": snap.department_stats,
+        "salary bands": lambda: snap.salary_bands(BANDS, DEPARTMENT),
+        "top 10": lambda: snap.top_earners(10),
+        "staffing": lambda: snap.staffing_ratios(PROJECT),
+    }
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def load_orm(s):
+    return s.query(Employee).options(selectinload(Employee.projects)).order_by(Employee.id).all()
+
+
+def measure(load, s):
+    start = time.perf_counter()
+    loaded = load(s)
+    elapsed = time.perf_counter() - start
+    del loaded
+    s.expunge_all()
+    tracemalloc.start()
+    loaded = load(s)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return loaded, elapsed, size
+
+
+def main(employees=200_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "analytics.db")
+        generate(db, employees)
+        eng = make_engine(db, "fast")
+        with Session(bind=eng) as s:
+            orm, orm_load, orm_bytes = measure(load_orm, s)
+
+            def load_snapshot(s):
+                snap = EmployeeSnapshot.load(s)
+                snap.department_stats()  # builds the indexes
+                return snap
+            snap, snap_load, snap_bytes = measure(load_snapshot, s)
+            print(f"{len(snap):,} employees, {len(snap.project_ids):,} assignments")
+            print(tabulate([
+                ["ORM objects (selectinload projects)", f"{orm_load:.2f}", f"{orm_bytes / 1e6:,.1f}", ""],
+                ["EmployeeSnapshot (+ indexes)", f"{snap_load:.2f}", f"{snap_bytes / 1e6:,.1f}",
+                 f"{orm_bytes / snap_bytes:.0f}x smaller"],
+            ], headers=["Load", "Seconds", "Retained MB", ""], tablefmt="grid"))
+
+            rows = []
+            fast = snapshot_queries(snap)
+            for name, fn in orm_queries(orm).items():
+                assert name == "payroll" or fn() == (fast[name]() if name != "salary bands"
+                                                     else [c for _, _, c in fast[name]()]), name
+                slow_s, fast_s = timed(fn, 3), timed(fast[name], 50)
+                rows.append([name, f"{slow_s * 1000:,.1f}", f"{fast_s * 1000:,.3f}", f"{slow_s / fast_s:,.0f}x"])
+            print(tabulate(rows, headers=["Query", "ORM ms", "Snapshot ms", "Speedup"], tablefmt="grid"))
+            del orm
+            s.expunge_all()
+
+            rnd = random.Random(3)
+            project = s.get(Project, PROJECT)
+            for i in range(500):
+                Employee.create(s, first_name="New", last_name="Hire", email=f"new{i}@bench.example",
+                                salary=rnd.randint(30_000, 90_000), department_id=DEPARTMENT)
+            for _ in range(500):
+                Employee.find_by_id(s, rnd.randint(1, employees)).update(s, salary=rnd.randint(30_000, 90_000))
+            project.assign_employees(s, rnd.sample(range(1, employees), 500))
+            start = time.perf_counter()
+            applied = snap.refresh(s)
+            refreshed = time.perf_counter() - start
+            start = time.perf_counter()
+            snap.department_stats()
+            rebuilt = time.perf_counter() - start
+            start = time.perf_counter()
+            EmployeeSnapshot.load(s).department_stats()
+            reload = time.perf_counter() - start
+            print(f"refresh: {applied:,} changes in {refreshed * 1000:,.0f} ms (+ {rebuilt * 1000:,.0f} ms index "
+                  f"rebuild on the next query); a full reload takes {reload * 1000:,.0f} ms")
+        eng.dispose()
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
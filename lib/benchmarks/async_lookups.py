@@ -0,0 +1,99 @@
+# lib/benchmarks/async_lookups.py
+"""Many concurrent lookups from asyncio: async helpers vs. the sync path.
+
+Each of `concurrency` tasks serves requests of one Employee.find_by_id (random id)
+and one Department.find_by_name in a fresh session, three ways:
+
+    blocking   sync helpers called straight from the coroutine (stalls the loop)
+    to_thread  sync helpers through asyncio.to_thread (thread hopping)
+    async      afind_by_id / afind_by_name on an AsyncSession (models/aio.py)
+
+A ticker task measures how late the event loop wakes it (loop lag): other work
+sharing the loop waits that long.
+
+    cd lib && python -m benchmarks.async_lookups [employees] [requests] [concurrency ...]
+"""
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from tabulate import tabulate
+
+TICK = 0.005
+
+
+def lookup(Session, Department, Employee, emp_id, dept):
+    with Session() as s:
+        Employee.find_by_id(s, emp_id)
+        Department.find_by_name(s, dept)
+
+
+async def serve(mode, requests, concurrency):
+    from models import Session, async_session, dispose_async_engine
+    from models.department import Department
+    from models.employee import Employee
+    with Session() as s:
+        names = [d.name for d in Department.get_all(s)]
+        top = s.query(Employee.id).order_by(Employee.id.desc()).limit(1).scalar()
+    rnd = random.Random(11)
+    work = [(rnd.randint(1, top), rnd.choice(names)) for _ in range(requests)]
+    latencies, lag, stop = [], [], asyncio.Event()
+
+    async def ticker():
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lag.append(time.perf_counter() - start - TICK)
+
+    async def one(emp_id, dept):
+        if mode == "blocking":
+            lookup(Session, Department, Employee, emp_id, dept)
+        elif mode == "to_thread":
+            await asyncio.to_thread(lookup, Session, Department, Employee, emp_id, dept)
+        else:
+            async with async_session() as s:
+                await Employee.afind_by_id(s, emp_id)
+                await Department.afind_by_name(s, dept)
+
+    async def worker(chunk):
+        for emp_id, dept in chunk:
+            start = time.perf_counter()
+            await one(emp_id, dept)
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0)  # let the ticker run between blocking calls too
+
+    tick = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(work[i::concurrency]) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    await dispose_async_engine()
+    ms = sorted(x * 1000 for x in latencies)
+    return [mode, concurrency, f"{requests / elapsed:,.0f}", f"{statistics.median(ms):.2f}",
+            f"{ms[int(len(ms) * 0.99) - 1]:.2f}", f"{max(lag, default=0) * 1000:.1f}"]
+
+
+def main(employees=50_000, requests=4000, concurrency=(1, 16, 64)):
+    tmp = tempfile.TemporaryDirectory()
+    db = os.path.join(tmp.name, "async.db")
+    # models reads EMS_DB_PATH on import, so it is only imported after this
+    os.environ["EMS_DB_PATH"] = db
+    from benchmarks.synthetic import generate
+    generate(db, employees)
+    rows = []
+    for c in concurrency:
+        for mode in ("blocking", "to_thread", "async"):
+            rows.append(asyncio.run(serve(mode, requests, c)))
+    print(f"{employees:,} employees, {requests:,} requests (find_by_id + find_by_name), {os.cpu_count()} CPU core(s)")
+    print(tabulate(rows, headers=["Mode", "Concurrency", "Requests/s", "p50 ms", "p99 ms", "Max loop lag ms"],
+                   tablefmt="grid"))
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*args[:2], *([tuple(args[2:])] if args[2:] else []))
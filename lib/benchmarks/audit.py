@@ -0,0 +1,142 @@
+# lib/benchmarks/audit.py
+"""Integrity audit (models/audit.py) vs. checking every row in Python.
+
+The database is a synthetic company of `employees` staff plus about 1.1 project
+assignments each, with `bad` broken rows of each kind written by raw SQL (blank
+names, bad emails and salaries, unnormalized and clashing emails, orphaned
+employees, dangling assignments). Both sides must find the same rows:
+
+    python   stream every table and run the models' @validates functions plus set
+             lookups for the foreign keys and normalized emails
+    audit    chunked SQL aggregates and anti-joins, 1..N worker processes
+
+Finally fix() repairs the fixable findings and the audit runs again; the rest,
+duplicate emails included, are left for a person.
+
+    cd lib && python -m benchmarks.audit [employees] [bad] [workers ...]
+"""
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from tabulate import tabulate
+
+# Full scans are the point here; keep the slow-query log (inherited by the workers) quiet
+os.environ.setdefault("EMS_SLOW_QUERY_MS", "600000")
+
+from sqlalchemy import select  # noqa: E402
+
+from benchmarks.synthetic import populate  # noqa: E402
+from models import Base, Session, make_engine  # noqa: E402
+from models import audit  # noqa: E402
+from models.changes import install_changes  # noqa: E402
+from models.department import Department  # noqa: E402
+from models.employee import Employee  # noqa: E402
+from models.project import Project, employee_project  # noqa: E402
+
+
+def build(path, employees, bad):
+    eng = make_engine(path, "fast")
+    Base.metadata.create_all(eng)
+    install_changes(eng)
+    counts = populate(eng, employees)
+    emp = ("INSERT INTO employees(first_name, last_name, email, salary, department_id) "
+           "VALUES (?, ?, ?, ?, ?)")
+    with eng.begin() as conn:
+        sql = conn.exec_driver_sql
+        for i in range(bad):
+            sql(emp, (" ", "Blank", f"blank{i}@audit.example", 50_000, 1))
+            sql(emp, ("No", "At", f"noat{i}.audit.example", 50_000, 1))
+            sql(emp, ("Text", "Salary", f"text{i}@audit.example", "n/a", 1))
+            sql(emp, ("Upper", "Case", f" Upper{i}@Audit.example", 50_000, 1))
+            sql(emp, ("Clash", "One", f"clash{i}@audit.example", 50_000, 1))
+            sql(emp, ("Clash", "Two", f"CLASH{i}@audit.example", 50_000, 1))
+            sql(emp, ("Lost", "Department", f"lost{i}@audit.example", 50_000, 50_000_000 + i))
+            sql("INSERT INTO employee_project VALUES (?, ?)", (50_000_000 + i, 1))
+            sql("INSERT INTO employee_project VALUES (?, ?)", (1 + i, 50_000_000 + i))
+    eng.dispose()
+    return counts
+
+
+def _fails(fn, key, value):
+    try:
+        fn(None, key, value)
+    except (ValueError, TypeError):
+        return True
+    return False
+
+
+def python_audit(s):
+    """The rules as Python checks over every row, streamed from the tables."""
+    found, seen = Counter(), {}
+    checks = {
+        Department: (("department_name", ("name",)), ("department_location", ("location",))),
+        Project: (("project_name", ("name",)), ("project_budget", ("budget",))),
+        Employee: (("employee_name", ("first_name", "last_name")), ("employee_email", ("email",)),
+                   ("employee_salary", ("salary",))),
+    }
+    ids = {}
+    for cls, rules in checks.items():
+        table = cls.__table__
+        validators = cls.__mapper__.validators
+        ids[cls] = set()
+        for row in s.connection().execution_options(yield_per=10_000).execute(select(table)).mappings():
+            ids[cls].add(row["id"])
+            for rule, cols in rules:
+                if any(_fails(validators[c][0], c, row[c]) for c in cols):
+                    found[rule] += 1
+            if cls is Employee:
+                email = row["email"]
+                norm = email.strip().lower() if isinstance(email, str) else email
+                found["employee_email_case"] += email != norm
+                seen.setdefault(norm, []).append(email == norm)
+    for row in s.connection().execution_options(yield_per=10_000).execute(select(Employee.department_id)):
+        found["employee_department"] += row[0] not in ids[Department]
+    for e, p in s.connection().execution_options(yield_per=10_000).execute(select(employee_project)):
+        found["assignment_employee"] += e not in ids[Employee]
+        found["assignment_project"] += p not in ids[Project]
+    # every row of a clashing email except the normalized one (or, failing that, the first)
+    found["employee_duplicate_email"] = sum(len(v) - 1 for v in seen.values() if len(v) > 1)
+    return {rule: found[rule] for rule in audit.ALL_RULES}
+
+
+def main(employees=1_000_000, bad=100, workers=(1, 2, 4)):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "audit.db")
+        start = time.perf_counter()
+        counts = build(db, employees, bad)
+        print(f"{counts['employees']:,} employees + {counts['assignments']:,} assignments, {bad} broken rows "
+              f"per kind, built in {time.perf_counter() - start:.0f}s; {os.cpu_count()} CPU core(s)")
+        eng = make_engine(db, "fast")
+        rows = []
+        with Session(bind=eng) as s:
+            start = time.perf_counter()
+            expected = python_audit(s)
+            slow = time.perf_counter() - start
+            s.rollback()
+            rows.append(["python, row by row", "-", f"{slow:.2f}", f"{sum(expected.values()):,}", ""])
+            for w in workers:
+                s.rollback()
+                report = audit.audit(s, workers=w)
+                assert report.found == expected, (report.found, expected)
+                rows.append(["audit", w, f"{report.elapsed:.2f}", f"{report.problems:,}",
+                             f"{report.rows_per_sec:,.0f}"])
+            print(tabulate(rows, headers=["Scan", "Workers", "Seconds", "Problems", "Rows/sec"], tablefmt="grid"))
+
+            s.rollback()
+            target = Department.find_by_id(s, 1)
+            start = time.perf_counter()
+            fixed = audit.fix(s, audit.FIXABLE, reassign_to=target)
+            elapsed = time.perf_counter() - start
+            after = audit.audit(s)
+            left = {rule: n for rule, n in after.found.items() if n}
+            print(f"fix: {sum(fixed.values()):,} rows repaired in {elapsed * 1000:,.0f} ms "
+                  f"({', '.join(f'{k} {n}' for k, n in fixed.items())}); left for a person: {left}")
+        eng.dispose()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*args[:2], *([tuple(args[2:])] if args[2:] else []))
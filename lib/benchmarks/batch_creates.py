@@ -0,0 +1,55 @@
+# lib/benchmarks/batch_creates.py
+"""Employee.create one-shot (commit + refresh per call) vs. inside batch().
+
+    cd lib && python -m benchmarks.batch_creates [creates] [profile]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from tabulate import tabulate
+
+from models import PROFILE, Base, Session, make_engine
+from models.department import Department
+from models.employee import Employee
+from models.project import Project  # noqa: F401  (registers employee_project)
+from models.unit_of_work import batch
+
+
+def create_employees(session, n, tag):
+    dept = Department.create(session, name=f"Bench {tag}", location="Lab")
+    for i in range(n):
+        Employee.create(session, first_name="F", last_name="L", email=f"{tag}{i}@bench.io",
+                        salary=1000 + i, department=dept)
+
+
+def one_shot(session, n):
+    create_employees(session, n, "single")
+
+
+def batched(session, n):
+    with batch(session):
+        create_employees(session, n, "batch")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    profile = sys.argv[2] if len(sys.argv) > 2 else PROFILE
+    rows = []
+    for name, fn in (("one-shot", one_shot), ("batch()", batched)):
+        with tempfile.TemporaryDirectory() as tmp:
+            eng = make_engine(os.path.join(tmp, "bench.db"), profile)
+            Base.metadata.create_all(eng)
+            with Session(bind=eng) as s:
+                start = time.perf_counter()
+                fn(s, n)
+                elapsed = time.perf_counter() - start
+            eng.dispose()
+        rows.append((name, f"{elapsed:.2f}", f"{n / elapsed:,.0f}"))
+    print(f"{n:,} Employee.create calls, profile '{profile}'")
+    print(tabulate(rows, headers=["Mode", "Seconds", "Creates/sec"], tablefmt="grid"))
+
+
+if __name__ == "__main__":
+    main()
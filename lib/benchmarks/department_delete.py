@@ -0,0 +1,81 @@
+# lib/benchmarks/department_delete.py
+"""Deleting a large department: ORM cascade vs. the set-based Department.delete.
+
+Each run starts from a fresh copy of one synthetic database whose first
+department holds about `members` employees.
+
+    cd lib && python -m benchmarks.department_delete [members]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from tabulate import tabulate
+
+from benchmarks.synthetic import populate
+from models import Base, Session, make_engine
+from models.changes import install_changes
+from models.department import Department
+from models.search import install_search
+
+
+def orm_cascade(s, d):
+    # What Department.delete used to do: load every member through the
+    # all, delete-orphan cascade and delete them (and their assignments) one by one
+    s.delete(d)
+    s.commit()
+
+
+def set_based(s, d):
+    d.delete(s)
+
+
+def reassign(s, d):
+    d.delete(s, reassign_to=s.get(Department, 2))
+
+
+def build(path, members):
+    eng = make_engine(path, "fast")
+    Base.metadata.create_all(eng)
+    populate(eng, members * 2, departments=2, projects=200)
+    install_search(eng)
+    install_changes(eng)
+    eng.dispose()
+
+
+def run(template, tmp, label, fn):
+    path = os.path.join(tmp, f"{label}.db")
+    shutil.copy(template, path)
+    eng = make_engine(path)
+    try:
+        with Session(bind=eng) as s:
+            d = s.get(Department, 1)
+            preview = d.delete_preview(s)
+            tracemalloc.start()
+            start = time.perf_counter()
+            fn(s, d)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    finally:
+        eng.dispose()
+    return [label, f"{preview['employees']:,}", f"{preview['assignments']:,}", f"{elapsed:.2f}", f"{peak / 1e6:.1f}"]
+
+
+def main(members=20_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        template = os.path.join(tmp, "template.db")
+        build(template, members)
+        rows = [
+            run(template, tmp, "ORM cascade (before)", orm_cascade),
+            run(template, tmp, "set-based delete", set_based),
+            run(template, tmp, "reassign (one UPDATE)", reassign),
+        ]
+    print(tabulate(rows, headers=["Strategy", "Employees", "Assignments", "Seconds", "Peak MB"], tablefmt="grid"))
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
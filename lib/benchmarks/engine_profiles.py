@@ -0,0 +1,68 @@
+# lib/benchmarks/engine_profiles.py
+"""Commit and scan throughput for each SQLite engine profile.
+
+    cd lib && python -m benchmarks.engine_profiles [commits] [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import func, insert, select
+from tabulate import tabulate
+
+from models import PROFILES, Base, make_engine
+from models.department import Department
+from models.employee import Employee
+from models.project import Project  # noqa: F401  (registers employee_project)
+
+
+def run(profile, commits, rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        # Build the schema and scan data with the fast profile, then measure with `profile`
+        setup = make_engine(path, "fast")
+        Base.metadata.create_all(setup)
+        with setup.begin() as conn:
+            conn.execute(insert(Department.__table__), [{"name": "Bench", "location": "Lab"}])
+            conn.execute(insert(Employee.__table__), [
+                {"first_name": "F", "last_name": "L", "email": f"scan{i}@bench.io",
+                 "salary": 1000 + i, "department_id": 1}
+                for i in range(rows)
+            ])
+        setup.dispose()
+
+        eng = make_engine(path, profile)
+        writes = profile != "readonly-report"
+        commit_rate = None
+        if writes:
+            start = time.perf_counter()
+            with eng.connect() as conn:
+                for i in range(commits):
+                    conn.execute(insert(Employee.__table__), {
+                        "first_name": "C", "last_name": "L", "email": f"commit{i}@bench.io",
+                        "salary": 1000, "department_id": 1})
+                    conn.commit()
+            commit_rate = commits / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with eng.connect() as conn:
+            for _ in range(5):
+                conn.execute(select(func.sum(Employee.salary), func.max(Employee.email))).one()
+        scan_rate = 5 * rows / (time.perf_counter() - start)
+        eng.dispose()
+    return commit_rate, scan_rate
+
+
+def main():
+    commits = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    table = []
+    for name in PROFILES:
+        commit_rate, scan_rate = run(name, commits, rows)
+        table.append((name, f"{commit_rate:,.0f}" if commit_rate else "n/a (query_only)", f"{scan_rate:,.0f}"))
+    print(tabulate(table, headers=["Profile", "Commits/sec", "Rows scanned/sec"], tablefmt="grid"))
+
+
+if __name__ == "__main__":
+    main()
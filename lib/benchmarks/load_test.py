@@ -0,0 +1,101 @@
+# lib/benchmarks/load_test.py
+"""Concurrent clients against the HTTP/JSON API: throughput and latency percentiles.
+
+Starts the server in-process on a scratch database (EMS_DB_PATH), seeds it, then
+runs a read-heavy mix (list pages, get by id, prefix search) plus a share of
+updates. Typo searches fall back to trigram matching and cost ~100x more; they
+are left out so the numbers reflect the server rather than the fuzzy ranker.
+
+    cd lib && python -m benchmarks.load_test [clients] [requests_per_client] [workers]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+TMP = tempfile.TemporaryDirectory()
+os.environ["EMS_DB_PATH"] = os.path.join(TMP.name, "load.db")
+
+from sqlalchemy import insert  # noqa: E402
+from tabulate import tabulate  # noqa: E402
+
+from models import engine, init_db  # noqa: E402
+from models.department import Department  # noqa: E402
+from models.employee import Employee  # noqa: E402
+from server import APIServer  # noqa: E402
+
+EMPLOYEES = 20000
+WRITE_SHARE = 0.1
+
+
+def seed():
+    init_db()
+    with engine.begin() as conn:
+        conn.execute(insert(Department.__table__), [{"name": f"Dept {i}", "location": "HQ"} for i in range(1, 21)])
+        conn.execute(insert(Employee.__table__), [
+            {"first_name": f"First{i}", "last_name": f"Last{i}", "email": f"user{i}@load.io",
+             "salary": 30000 + i, "department_id": i % 20 + 1}
+            for i in range(1, EMPLOYEES + 1)
+        ])
+
+
+def client(base, n, seed_, latencies, errors):
+    rnd = random.Random(seed_)
+    for _ in range(n):
+        emp = rnd.randint(1, EMPLOYEES)
+        roll = rnd.random()
+        if roll < WRITE_SHARE:
+            req = Request(f"{base}/employees/{emp}", method="PATCH",
+                          data=json.dumps({"salary": rnd.randint(30000, 90000)}).encode(),
+                          headers={"Content-Type": "application/json"})
+        elif roll < 0.4:
+            req = Request(f"{base}/employees?after={emp}&limit=50")
+        elif roll < 0.5:
+            req = Request(f"{base}/employees?q=Last{emp // 100}")
+        else:
+            req = Request(f"{base}/employees/{emp}")
+        start = time.perf_counter()
+        try:
+            with urlopen(req) as resp:
+                resp.read()
+        except HTTPError as e:
+            errors.append(e.code)
+        latencies.append(time.perf_counter() - start)
+
+
+def pct(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def main(clients=16, per_client=200, workers=8):
+    seed()
+    server = APIServer(("127.0.0.1", 0), workers=workers, quiet=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    latencies, errors = [], []
+    threads = [threading.Thread(target=client, args=(base, per_client, i, latencies, errors))
+               for i in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+    server.server_close()
+
+    latencies.sort()
+    print(tabulate([[clients, workers, len(latencies), len(errors), f"{len(latencies) / elapsed:,.0f}",
+                     f"{pct(latencies, 50) * 1000:.1f}", f"{pct(latencies, 99) * 1000:.1f}"]],
+                   headers=["clients", "workers", "requests", "errors", "req/s", "p50 ms", "p99 ms"],
+                   tablefmt="grid"))
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:4]))
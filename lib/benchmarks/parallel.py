@@ -0,0 +1,66 @@
+# lib/benchmarks/parallel.py
+"""Reports and export over sharded id ranges (models/parallel.py) at 1..N worker processes.
+
+The database is a synthetic company of `employees` staff plus about 1.1 project
+assignments each (2.4M employees = about 5M employee + assignment rows), built
+without the search index. workers=1 is the single-session code path; the other
+runs include starting the worker processes. Scaling stops at the host's core count.
+
+    cd lib && python -m benchmarks.parallel [employees] [workers ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from tabulate import tabulate
+
+# Full scans are the point here; keep the slow-query log (inherited by the workers) quiet
+os.environ.setdefault("EMS_SLOW_QUERY_MS", "600000")
+
+from benchmarks.synthetic import populate  # noqa: E402
+from models import Base, Session, make_engine  # noqa: E402
+from models import parallel  # noqa: E402
+
+TASKS = (
+    ("payroll", lambda s, w, out: parallel.department_payroll(s, workers=w)),
+    ("percentiles", lambda s, w, out: parallel.salary_percentiles(s, workers=w)),
+    ("budget per head", lambda s, w, out: parallel.project_budget_per_head(s, workers=w)),
+    ("export csv", lambda s, w, out: parallel.bulk_export(s, "csv", os.path.join(out, f"csv-{w}"), workers=w)),
+    ("export col", lambda s, w, out: parallel.bulk_export(s, "col", os.path.join(out, f"col-{w}"), workers=w)),
+)
+
+
+def build(path, employees):
+    eng = make_engine(path, "fast")
+    Base.metadata.create_all(eng)
+    counts = populate(eng, employees)
+    eng.dispose()
+    return counts
+
+
+def main(employees=2_400_000, workers=(1, 2, 4, 8)):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "parallel.db")
+        start = time.perf_counter()
+        counts = build(db, employees)
+        print(f"{counts['employees']:,} employees + {counts['assignments']:,} assignments "
+              f"built in {time.perf_counter() - start:.0f}s; {os.cpu_count()} CPU core(s)")
+        eng = make_engine(db, "readonly-report", readonly=True)
+        rows = []
+        for label, fn in TASKS:
+            base = None
+            for w in workers:
+                with Session(bind=eng) as s:
+                    start = time.perf_counter()
+                    fn(s, w, tmp)
+                    elapsed = time.perf_counter() - start
+                base = base or elapsed
+                rows.append([label, w, f"{elapsed:.2f}", f"{base / elapsed:.2f}x"])
+        eng.dispose()
+    print(tabulate(rows, headers=["Task", "Workers", "Seconds", "Speedup vs 1"], tablefmt="grid"))
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*args[:1], *([tuple(args[1:])] if args[1:] else []))
@@ -0,0 +1,83 @@
+# lib/benchmarks/read_routing.py
+"""Writer latency while reader processes stream every project assignment.
+
+Readers loop over Project.roster() (what list_projects reads) through
+read_session(); one writer times short Employee.update commits meanwhile.
+Each routing mode (see models.READ_ROUTES) runs against the same synthetic database.
+
+    cd lib && python -m benchmarks.read_routing [employees] [readers] [writes]
+"""
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from tabulate import tabulate
+
+
+def reader(mode, stop_file):
+    """Runs in a spawned process until stop_file exists; returns the number of full roster scans."""
+    from models import init_db, read_session, set_read_routing
+    from models.project import Project
+    init_db()
+    set_read_routing(mode, max_age=1.0)
+    scans = 0
+    while not os.path.exists(stop_file):
+        with read_session() as s:
+            for _ in Project.roster(s):
+                pass
+        scans += 1
+    return scans
+
+
+def writer(writes, employees):
+    from models import Session
+    from models.employee import Employee
+    rnd = random.Random(7)
+    latencies = []
+    with Session() as s:
+        for _ in range(writes):
+            e = Employee.find_by_id(s, rnd.randint(1, employees))
+            start = time.perf_counter()
+            e.update(s, salary=rnd.randint(30_000, 90_000))
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run(mode, employees, readers, writes, db):
+    ctx = multiprocessing.get_context("spawn")
+    stop_file = f"{db}.{mode}.stop"
+    with ctx.Pool(readers) as pool:
+        scans = pool.starmap_async(reader, [(mode, stop_file)] * readers)
+        time.sleep(2)  # let every reader start scanning
+        latencies = writer(writes, employees)
+        open(stop_file, "w").close()
+        scans = sum(scans.get())
+    return latencies, scans
+
+
+def main(employees=50_000, readers=4, writes=300):
+    tmp = tempfile.TemporaryDirectory()
+    db = os.path.join(tmp.name, "routing.db")
+    # models (imported by synthetic) is only imported after this, here and in the spawned readers
+    os.environ["EMS_DB_PATH"] = db
+    from benchmarks.synthetic import generate
+    from models import engine
+    generate(db, employees)
+    rows = []
+    for mode in ("primary", "readonly", "snapshot"):
+        latencies, scans = run(mode, employees, readers, writes, db)
+        ms = sorted(x * 1000 for x in latencies)
+        rows.append([mode, readers, scans, len(ms), f"{statistics.median(ms):.2f}", f"{ms[int(len(ms) * 0.99) - 1]:.2f}",
+                     f"{ms[-1]:.2f}"])
+        engine.dispose()
+    print(f"{employees:,} employees, {readers} reader processes scanning the project roster")
+    print(tabulate(rows, headers=["Read routing", "Readers", "Roster scans", "Writes", "p50 ms", "p99 ms", "max ms"],
+                   tablefmt="grid"))
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:4]))
@@ -0,0 +1,65 @@
+# lib/benchmarks/rendering.py
+"""Table rendering: tabulate's grid vs. the streaming render modes.
+
+Rows look like the employee list (formatted salary column included). Reports
+total time, time until the first output is written, and output size.
+
+    cd lib && python -m benchmarks.rendering [rows ...]
+"""
+import random
+import sys
+import time
+
+from tabulate import tabulate
+
+import render
+from benchmarks.synthetic import employee_rows
+from helpers import _money
+
+HEADERS = ["ID", "First Name", "Last Name", "Email", "Salary", "Dept ID"]
+
+
+class Sink:
+    """Discards output but remembers when the first write happened and how much was written."""
+
+    def __init__(self):
+        self.first = None
+        self.size = 0
+
+    def write(self, text):
+        if self.first is None:
+            self.first = time.perf_counter()
+        self.size += len(text)
+
+
+def rows(n):
+    for i, e in enumerate(employee_rows(random.Random(42), n, [90_000] * 12), 1):
+        yield i, e["first_name"], e["last_name"], e["email"], e["salary"], e["department_id"]
+
+
+def run(label, n, fn):
+    sink = Sink()
+    start = time.perf_counter()
+    fn(sink)
+    end = time.perf_counter()
+    return [label, f"{n:,}", f"{(end - start) * 1000:,.1f}", f"{(sink.first - start) * 1000:,.2f}",
+            f"{sink.size / 1e6:,.1f}"]
+
+
+def main(sizes=(10_000, 100_000)):
+    table = []
+    for n in sizes:
+        def grid_baseline(out):
+            # What the helpers did before: format every salary, then one grid for everything
+            data = [(i, f, l, e, f"${s:.2f}", d) for i, f, l, e, s, d in rows(n)]
+            out.write(tabulate(data, headers=HEADERS, tablefmt="grid") + "\n")
+        table.append(run("tabulate grid (before)", n, grid_baseline))
+        for mode in ("grid", "fixed", "tsv", "jsonl"):
+            table.append(run(f"render {mode}", n, lambda out, mode=mode: render.table(
+                rows(n), HEADERS, mode=mode, formats={"Salary": _money}, out=out)))
+    print(tabulate(table, headers=["Renderer", "Rows", "Total ms", "First output ms", "Output MB"],
+                   tablefmt="grid"))
+
+
+if __name__ == "__main__":
+    main(tuple(int(a) for a in sys.argv[1:]) or (10_000, 100_000))
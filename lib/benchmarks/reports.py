@@ -0,0 +1,87 @@
+# lib/benchmarks/reports.py
+"""SQL aggregate reports vs. hydrating every Employee and summing in Python.
+
+    cd lib && python -m benchmarks.reports [employees]
+"""
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+
+from sqlalchemy import insert
+from tabulate import tabulate
+
+from models import Base, Session, make_engine
+from models import reports
+from models.department import Department
+from models.employee import Employee
+from models.project import Project, employee_project
+
+
+def seed(eng, employees, departments=50, projects=200):
+    rnd = random.Random(42)
+    with eng.begin() as conn:
+        conn.execute(insert(Department.__table__), [
+            {"name": f"Dept {i}", "location": "HQ"} for i in range(departments)])
+        conn.execute(insert(Project.__table__), [
+            {"name": f"Project {i}", "budget": rnd.randint(10_000, 5_000_000)} for i in range(projects)])
+        conn.execute(insert(Employee.__table__), [
+            {"first_name": "F", "last_name": "L", "email": f"e{i}@bench.io",
+             "salary": rnd.randint(30_000, 250_000), "department_id": rnd.randint(1, departments)}
+            for i in range(employees)])
+        conn.execute(insert(employee_project), [
+            {"employee_id": e, "project_id": p}
+            for e in range(1, employees + 1, 3)
+            for p in {rnd.randint(1, projects), rnd.randint(1, projects)}])
+
+
+def naive(session):
+    by_dept = defaultdict(list)
+    for e in Employee.get_all(session):
+        by_dept[e.department_id].append(e.salary)
+    payroll = {d: (len(v), sum(v), sum(v) / len(v)) for d, v in by_dept.items()}
+    pct = {d: [sorted(v)[max(0, math.ceil(len(v) * p) - 1)] for p in reports.PERCENTILES]
+           for d, v in by_dept.items()}
+    per_head = [(p.name, p.budget / len(p.employees) if p.employees else None)
+                for p in Project.get_all(session)]
+    return payroll, pct, per_head
+
+
+def in_sql(session):
+    return (reports.department_payroll(session), reports.salary_percentiles(session),
+            reports.project_budget_per_head(session))
+
+
+def measure(fn, session_factory):
+    tracemalloc.start()
+    start = time.perf_counter()
+    with session_factory() as s:
+        fn(s)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    employees = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        eng = make_engine(os.path.join(tmp, "bench.db"), "fast")
+        Base.metadata.create_all(eng)
+        seed(eng, employees)
+        factory = lambda: Session(bind=eng)  # noqa: E731
+        rows = []
+        for name, fn in (("ORM + Python", naive), ("SQL GROUP BY / window", in_sql)):
+            elapsed, peak = measure(fn, factory)
+            rows.append((name, f"{elapsed:.3f}", f"{peak / 1e6:.1f}"))
+        eng.dispose()
+    print(f"{employees:,} employees")
+    print(tabulate(rows, headers=["Approach", "Seconds", "Peak MB (Python heap)"], tablefmt="grid"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,461 @@
+# lib/benchmarks/suite.py
+"""Time every model classmethod and every menu action at several company sizes.
+
+Each scale gets a synthetic database (benchmarks/synthetic.py, fixed seed), every
+case runs up to --repeat times (fewer once --budget seconds are spent on it), and
+the results are written as JSON for comparison between commits:
+
+    cd lib && python -m benchmarks.suite --scales 10000,100000 --out before.json
+    cd lib && python -m benchmarks.suite --scales 10000,100000 --out after.json
+    cd lib && python -m benchmarks.suite --compare before.json after.json
+
+Reference caches are cleared before every run, so lookups are measured uncached.
+Write cases undo their changes after each run, keeping the data identical.
+"""
+import argparse
+import contextlib
+import csv
+import datetime
+import fnmatch
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import sqlalchemy
+from sqlalchemy import delete, insert, select
+from tabulate import tabulate
+
+import helpers
+from cli import ROUTES
+from models import Session, engine as default_engine, make_engine, metrics, reports
+from models.bulk import bulk_export, bulk_import
+from models.cache import clear_caches
+from models.department import Department
+from models.employee import Employee
+from models.project import Project, employee_project
+from benchmarks.synthetic import generate
+
+SCALES = (10_000, 100_000, 1_000_000)
+REPEAT = 5
+BUDGET_SECONDS = 10.0
+# Loading every Employee as an ORM object is skipped above this size (memory)
+FULL_LOAD_LIMIT = 100_000
+REGRESSION = 0.10  # --compare flags medians more than 10% slower
+
+TEMP_DEPT = "Benchmark Temp Dept"
+TEMP_EMAIL_DOMAIN = "bench-temp.example"
+
+
+class Case:
+    """One timed operation; setup/teardown run untimed around every run."""
+
+    def __init__(self, name, run, setup=None, teardown=None, kind="model", max_scale=None):
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.teardown = teardown
+        self.kind = kind
+        self.max_scale = max_scale
+
+
+# ---------- Untimed fixtures (Core statements, bypassing the ORM and caches) ----------
+def _exec(ctx, stmt, params=None):
+    with ctx["engine"].begin() as conn:
+        return conn.execute(stmt, params) if params is not None else conn.execute(stmt)
+
+
+def _temp_project(ctx, name="Benchmark Temp Project"):
+    ctx["tmp_project"] = _exec(ctx, insert(Project.__table__).values(name=name, budget=1000.0)).inserted_primary_key[0]
+
+
+def _temp_projects(ctx):
+    _temp_project(ctx, "Benchmark Temp Source")
+    ctx["tmp_source"] = ctx["tmp_project"]
+    _temp_project(ctx, "Benchmark Temp Target")
+    _exec(ctx, insert(employee_project).from_select(
+        ["employee_id", "project_id"],
+        select(Employee.id, sqlalchemy.literal(ctx["tmp_source"])).where(Employee.department_id == ctx["dept"].id)))
+
+
+def _drop_temp_projects(ctx):
+    ids = [ctx.pop(k) for k in ("tmp_project", "tmp_source") if k in ctx]
+    ids += [r[0] for r in _exec(ctx, select(Project.id).where(Project.name.like("Benchmark Temp %")))]
+    _exec(ctx, delete(employee_project).where(employee_project.c.project_id.in_(ids)))
+    _exec(ctx, delete(Project.__table__).where(Project.id.in_(ids)))
+
+
+def _fill_temp_project(ctx):
+    _temp_project(ctx)
+    _exec(ctx, insert(employee_project), [{"employee_id": i, "project_id": ctx["tmp_project"]} for i in ctx["emp_ids"]])
+
+
+def _temp_department(ctx):
+    ctx["tmp_dept"] = _exec(ctx, insert(Department.__table__).values(name=TEMP_DEPT, location="Lab")).inserted_primary_key[0]
+
+
+def _drop_temp_department(ctx):
+    _exec(ctx, delete(Department.__table__).where(Department.name.in_([TEMP_DEPT, TEMP_DEPT + " 2"])))
+
+
+def _temp_employee(ctx):
+    ctx["tmp_emp"] = _exec(ctx, insert(Employee.__table__).values(
+        first_name="Temp", last_name="Bench", email=f"temp@{TEMP_EMAIL_DOMAIN}", salary=50_000.0,
+        department_id=ctx["dept"].id)).inserted_primary_key[0]
+
+
+def _drop_temp_employees(ctx):
+    ids = [r[0] for r in _exec(ctx, select(Employee.id).where(Employee.email.like(f"%@{TEMP_EMAIL_DOMAIN}")))]
+    _exec(ctx, delete(employee_project).where(employee_project.c.employee_id.in_(ids)))
+    _exec(ctx, delete(Employee.__table__).where(Employee.id.in_(ids)))
+
+
+def _restore_employee(ctx):
+    e = ctx["emp"]
+    _exec(ctx, Employee.__table__.update().where(Employee.id == e.id).values(
+        first_name=e.first_name, last_name=e.last_name, email=e.email, salary=e.salary, department_id=e.department_id))
+
+
+def _restore_assignment(ctx):
+    _exec(ctx, delete(employee_project).where(
+        employee_project.c.employee_id == ctx["emp"].id, employee_project.c.project_id == ctx["proj"].id))
+    if ctx["emp_on_proj"]:
+        _exec(ctx, insert(employee_project).values(employee_id=ctx["emp"].id, project_id=ctx["proj"].id))
+
+
+def _consume(iterable):
+    return sum(1 for _ in iterable)
+
+
+# ---------- Model cases ----------
+def model_cases():
+    def find(cls, key):
+        return lambda s, c: cls.find_by_id(s, c[key].id)
+
+    return [
+        Case("Department.get_all", lambda s, c: Department.get_all(s)),
+        Case("Department.page", lambda s, c: Department.page(s, 0, 500)),
+        Case("Department.iter_pages", lambda s, c: _consume(Department.iter_pages(s))),
+        Case("Department.find_by_id", find(Department, "dept")),
+        Case("Department.find_by_name", lambda s, c: Department.find_by_name(s, c["dept"].name)),
+        Case("Department.create", lambda s, c: Department.create(s, name=TEMP_DEPT, location="Lab"),
+             teardown=_drop_temp_department),
+        Case("Department.update", lambda s, c: Department.find_by_id(s, c["tmp_dept"]).update(s, name=TEMP_DEPT + " 2"),
+             setup=_temp_department, teardown=_drop_temp_department),
+        Case("Department.delete", lambda s, c: Department.find_by_id(s, c["tmp_dept"]).delete(s),
+             setup=_temp_department, teardown=_drop_temp_department),
+
+        Case("Employee.get_all", lambda s, c: Employee.get_all(s), max_scale=FULL_LOAD_LIMIT),
+        Case("Employee.page", lambda s, c: Employee.page(s, c["emp"].id, 500)),
+        Case("Employee.page (department)", lambda s, c: Employee.page(s, 0, 500, department_id=c["dept"].id)),
+        Case("Employee.iter_pages", lambda s, c: _consume(Employee.iter_pages(s))),
+        Case("Employee.iter_pages (department)",
+             lambda s, c: _consume(Employee.iter_pages(s, department_id=c["dept"].id))),
+        Case("Employee.find_by_id", find(Employee, "emp")),
+        Case("Employee.find_by_name", lambda s, c: Employee.find_by_name(s, f"{c['emp'].first_name} {c['emp'].last_name}")),
+        Case("Employee.find_by_name (first or last)", lambda s, c: Employee.find_by_name(s, c["emp"].last_name)),
+        Case("Employee.search (prefix)", lambda s, c: Employee.search(s, c["emp"].last_name[:4])),
+        Case("Employee.search (typo)", lambda s, c: Employee.search(s, c["typo"])),
+        Case("Employee.create", lambda s, c: Employee.create(
+            s, first_name="Temp", last_name="Bench", email=f"new@{TEMP_EMAIL_DOMAIN}", salary=50_000,
+            department_id=c["dept"].id), teardown=_drop_temp_employees),
+        Case("Employee.update", lambda s, c: Employee.find_by_id(s, c["emp"].id).update(s, salary=12_345),
+             teardown=_restore_employee),
+        Case("Employee.delete", lambda s, c: Employee.find_by_id(s, c["tmp_emp"]).delete(s),
+             setup=_temp_employee, teardown=_drop_temp_employees),
+
+        Case("Project.get_all", lambda s, c: Project.get_all(s)),
+        Case("Project.page", lambda s, c: Project.page(s, 0, 500)),
+        Case("Project.iter_pages", lambda s, c: _consume(Project.iter_pages(s))),
+        Case("Project.roster", lambda s, c: _consume(Project.roster(s))),
+        Case("Project.find_by_id", find(Project, "proj")),
+        Case("Project.find_by_name", lambda s, c: Project.find_by_name(s, c["proj"].name)),
+        Case("Project.create", lambda s, c: Project.create(s, name="Benchmark Temp Project", budget=1000),
+             teardown=_drop_temp_projects),
+        Case("Project.update", lambda s, c: Project.find_by_id(s, c["tmp_project"]).update(s, budget=2000),
+             setup=_temp_project, teardown=_drop_temp_projects),
+        Case("Project.delete", lambda s, c: Project.find_by_id(s, c["tmp_project"]).delete(s),
+             setup=_temp_project, teardown=_drop_temp_projects),
+        Case("Project.assign_department",
+             lambda s, c: Project.find_by_id(s, c["tmp_project"]).assign_department(s, c["dept"].id),
+             setup=_temp_project, teardown=_drop_temp_projects),
+        Case("Project.assign_employees",
+             lambda s, c: Project.find_by_id(s, c["tmp_project"]).assign_employees(s, c["emp_ids"]),
+             setup=_temp_project, teardown=_drop_temp_projects),
+        Case("Project.unassign_employees",
+             lambda s, c: Project.find_by_id(s, c["tmp_project"]).unassign_employees(s, c["emp_ids"]),
+             setup=_fill_temp_project, teardown=_drop_temp_projects),
+        Case("Project.unassign_department",
+             lambda s, c: Project.find_by_id(s, c["tmp_source"]).unassign_department(s, c["dept"].id),
+             setup=_temp_projects, teardown=_drop_temp_projects),
+        Case("Project.move_members_to",
+             lambda s, c: Project.find_by_id(s, c["tmp_source"]).move_members_to(s, Project.find_by_id(s, c["tmp_project"])),
+             setup=_temp_projects, teardown=_drop_temp_projects),
+
+        Case("reports.department_payroll", lambda s, c: reports.department_payroll(s)),
+        Case("reports.salary_percentiles", lambda s, c: reports.salary_percentiles(s)),
+        Case("reports.project_budget_per_head", lambda s, c: reports.project_budget_per_head(s)),
+        Case("bulk_import (1,000 employees)", lambda s, c: bulk_import(s, "employees", c["import_csv"]),
+             teardown=_drop_temp_employees),
+        Case("bulk_export (col)", lambda s, c: bulk_export(s, "col", c["export_dir"])),
+    ]
+
+
+# ---------- Menu action cases (helpers.py, scripted input, output discarded) ----------
+def helper_cases():
+    def action(name, answers=lambda c: [], **kw):
+        def run(s, c):
+            feed = iter([str(a) for a in answers(c)])
+            helpers._ask = lambda prompt="": next(feed, "")
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                getattr(helpers, name)()
+        return Case(name, run, kind="action", **kw)
+
+    def emp_answers(c, email):
+        e = c["emp"]
+        return [e.first_name, e.last_name, email, e.salary, e.department_id]
+
+    return [
+        action("list_departments"),
+        action("find_department_by_name", lambda c: [c["dept"].name]),
+        action("create_department", lambda c: [TEMP_DEPT, "Lab"], teardown=_drop_temp_department),
+        action("update_department", lambda c: [c["tmp_dept"], TEMP_DEPT + " 2", "Lab"],
+               setup=_temp_department, teardown=_drop_temp_department),
+        action("delete_department", lambda c: [c["tmp_dept"]], setup=_temp_department, teardown=_drop_temp_department),
+        action("list_department_employees", lambda c: [c["dept"].id]),
+
+        action("list_employees"),
+        action("find_employee_by_name", lambda c: [f"{c['emp'].first_name} {c['emp'].last_name}"]),
+        action("find_employee_by_id", lambda c: [c["emp"].id]),
+        action("create_employee", lambda c: emp_answers(c, f"new@{TEMP_EMAIL_DOMAIN}"), teardown=_drop_temp_employees),
+        action("update_employee", lambda c: [c["emp"].id] + emp_answers(c, c["emp"].email), teardown=_restore_employee),
+        action("delete_employee", lambda c: [c["tmp_emp"]], setup=_temp_employee, teardown=_drop_temp_employees),
+        action("search_employees", lambda c: [c["emp"].last_name[:4]]),
+
+        action("list_projects"),
+        action("find_project_by_name", lambda c: [c["proj"].name]),
+        action("create_project", lambda c: ["Benchmark Temp Project", 1000], teardown=_drop_temp_projects),
+        action("assign_employee_to_project", lambda c: [c["emp"].id, c["proj"].id], teardown=_restore_assignment),
+        action("remove_employee_from_project", lambda c: [c["emp"].id, c["proj"].id],
+               setup=lambda c: (_restore_assignment(c), _exec(c, insert(employee_project).prefix_with("OR IGNORE").values(
+                   employee_id=c["emp"].id, project_id=c["proj"].id))),
+               teardown=_restore_assignment),
+        action("assign_department_to_project", lambda c: [c["tmp_project"], c["dept"].id],
+               setup=_temp_project, teardown=_drop_temp_projects),
+        action("assign_employees_to_project", lambda c: [c["tmp_project"], f"{c['emp_ids'][0]}-{c['emp_ids'][-1]}"],
+               setup=_temp_project, teardown=_drop_temp_projects),
+        action("remove_employees_from_project", lambda c: [c["tmp_project"], f"{c['emp_ids'][0]}-{c['emp_ids'][-1]}"],
+               setup=_fill_temp_project, teardown=_drop_temp_projects),
+        action("move_project_members", lambda c: [c["tmp_source"], c["tmp_project"]],
+               setup=_temp_projects, teardown=_drop_temp_projects),
+
+        action("import_data", lambda c: ["employees", c["import_csv"]], teardown=_drop_temp_employees),
+        action("export_data", lambda c: ["col", c["export_dir"]]),
+
+        action("payroll_report"),
+        action("salary_percentile_report"),
+        action("project_budget_report"),
+        action("show_cache_stats"),
+        action("show_timing_stats"),
+        action("audit_data"),
+    ]
+
+
+def uncovered(cases):
+    """Model classmethods and menu actions without a case (reported, so new ones get added)."""
+    names = {c.name.split(" (")[0] for c in cases}
+    missing = [f"{cls.__name__}.{attr}" for cls in (Department, Employee, Project)
+               for attr, value in vars(cls).items()
+               if isinstance(value, classmethod) and not attr.startswith("_")
+               and f"{cls.__name__}.{attr}" not in names]
+    missing += [a for a in ROUTES.values() if a != "exit_program" and a not in names]
+    return missing
+
+
+# ---------- Running ----------
+def context(eng, tmp, scale):
+    with Session(bind=eng) as s:
+        emp = s.get(Employee, scale // 2)
+        dept = s.get(Department, emp.department_id)
+        proj = s.get(Project, 1)
+        s.expunge_all()
+    with eng.connect() as conn:
+        on_proj = conn.execute(select(employee_project).where(
+            employee_project.c.employee_id == emp.id, employee_project.c.project_id == proj.id)).first() is not None
+    import_csv = os.path.join(tmp, "import.csv")
+    with open(import_csv, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["first_name", "last_name", "email", "salary", "department"])
+        w.writerows([("Imported", f"Row{i}", f"import{i}@{TEMP_EMAIL_DOMAIN}", 40_000 + i, dept.name)
+                     for i in range(1000)])
+    # A dropped letter in the longer name part, e.g. "Sarah Muthoni" -> "Sarah Muhoni"
+    first, last = emp.first_name, emp.last_name
+    if len(last) >= len(first):
+        typo = f"{first} {last[:2]}{last[3:]}"
+    else:
+        typo = f"{first[:2]}{first[3:]} {last}"
+    return {
+        "engine": eng, "emp": emp, "dept": dept, "proj": proj, "emp_on_proj": on_proj,
+        "emp_ids": list(range(1, min(scale, 1000) + 1)),
+        "typo": typo,
+        "import_csv": import_csv, "export_dir": os.path.join(tmp, "export"),
+    }
+
+
+def time_case(case, ctx, repeat, budget):
+    walls, span = [], None
+    spent = 0.0
+    while len(walls) < repeat and (not walls or spent < budget):
+        clear_caches()
+        if case.setup:
+            case.setup(ctx)
+        clear_caches()
+        with Session(bind=ctx["engine"]) as s, metrics.measure(case.name) as span:
+            start = time.perf_counter()
+            case.run(s, ctx)
+            wall = time.perf_counter() - start
+        if case.teardown:
+            case.teardown(ctx)
+        walls.append(wall)
+        spent += wall
+    return {
+        "runs": len(walls),
+        "min_ms": round(min(walls) * 1000, 3),
+        "median_ms": round(statistics.median(walls) * 1000, 3),
+        "max_ms": round(max(walls) * 1000, 3),
+        "statements": span.statements,
+        "rows": span.rows,
+    }
+
+
+def run_scale(scale, args, cases):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(args.cache_dir or tmp, f"synthetic-{scale}-{args.seed}.db")
+        start = time.perf_counter()
+        if args.cache_dir and os.path.exists(path):
+            counts, generated = None, False
+        else:
+            counts, generated = generate(path, scale, args.seed), True
+        gen_seconds = time.perf_counter() - start
+        print(f"{scale:,} employees: {'generated' if generated else 'reused'} {path} in {gen_seconds:.1f}s",
+              file=sys.stderr)
+
+        eng = make_engine(path)
+        Session.configure(bind=eng)  # helpers open their sessions through models.Session
+        results = []
+        try:
+            ctx = context(eng, tmp, scale)
+            for case in cases:
+                row = {"scale": scale, "kind": case.kind, "name": case.name}
+                if case.max_scale and scale > case.max_scale:
+                    row["skipped"] = f"scale above {case.max_scale:,}"
+                else:
+                    row.update(time_case(case, ctx, args.repeat, args.budget))
+                    print(f"  {case.name}: {row['median_ms']:.2f} ms ({row['runs']} runs)", file=sys.stderr)
+                results.append(row)
+        finally:
+            Session.configure(bind=default_engine)
+            clear_caches()
+            eng.dispose()
+    return {"generate_seconds": round(gen_seconds, 2), "counts": counts}, results
+
+
+def _commit():
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                               text=True).stdout.strip()
+        return sha + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_suite(args):
+    cases = model_cases() + helper_cases()
+    if args.only:
+        cases = [c for c in cases if any(fnmatch.fnmatch(c.name, p) for p in args.only.split(","))]
+    for name in uncovered(model_cases() + helper_cases()):
+        print(f"warning: no benchmark case for {name}", file=sys.stderr)
+    commit = _commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "budget_seconds": args.budget,
+        },
+        "scales": {},
+        "results": [],
+    }
+    original_ask = helpers._ask
+    try:
+        for scale in args.scales:
+            info, results = run_scale(scale, args, cases)
+            report["scales"][str(scale)] = info
+            report["results"] += results
+    finally:
+        helpers._ask = original_ask
+    out = args.out or f"benchmark-{commit}.json"
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    print(f"wrote {len(report['results'])} results to {out}")
+
+
+def compare(old_path, new_path, threshold=REGRESSION):
+    """Print median changes between two result files; returns the number of regressions."""
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+    before = {(r["scale"], r["name"]): r for r in old["results"] if "median_ms" in r}
+    rows, regressions = [], 0
+    for r in new["results"]:
+        prev = before.get((r["scale"], r["name"]))
+        if prev is None or "median_ms" not in r:
+            continue
+        change = (r["median_ms"] - prev["median_ms"]) / prev["median_ms"] if prev["median_ms"] else 0.0
+        flag = ""
+        if change > threshold:
+            flag, regressions = "slower", regressions + 1
+        elif change < -threshold:
+            flag = "faster"
+        rows.append((r["name"], f"{r['scale']:,}", prev["median_ms"], r["median_ms"], f"{change:+.0%}",
+                     f"{prev['statements']} -> {r['statements']}", flag))
+    print(f"{old['meta']['commit']} -> {new['meta']['commit']}")
+    print(tabulate(rows, headers=["Case", "Employees", "Before ms", "After ms", "Change", "Statements", ""],
+                   tablefmt="grid"))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EMS benchmark suite")
+    parser.add_argument("--scales", type=lambda t: [int(x) for x in t.split(",")], default=list(SCALES[:2]),
+                        help="comma-separated employee counts (default 10000,100000; 1000000 is supported)")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="max runs per case")
+    parser.add_argument("--budget", type=float, default=BUDGET_SECONDS, help="stop repeating a case after this many seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", help="comma-separated name patterns, e.g. 'Employee.*,list_*'")
+    parser.add_argument("--cache-dir", help="keep generated databases here and reuse them")
+    parser.add_argument("--out", help="results file (default benchmark-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two results files")
+    parser.add_argument("--threshold", type=float, default=REGRESSION, help="relative change flagged by --compare")
+    args = parser.parse_args(argv)
+    if args.compare:
+        return 1 if compare(*args.compare, threshold=args.threshold) else 0
+    run_suite(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+# lib/benchmarks/synthetic.py
+"""Deterministic synthetic company: departments, employees, projects, assignments.
+
+The same (employees, seed) always produces the same rows, so benchmark results
+from different commits are comparable.
+
+    cd lib && python -m benchmarks.synthetic out.db [employees] [seed]
+"""
+import os
+import random
+import sys
+import time
+
+from sqlalchemy import insert
+
+from models import SCHEMA_VERSION, Base, make_engine
+from models.department import Department
+from models.employee import Employee
+from models.project import Project, employee_project
+from models.changes import install_changes
+from models.search import install_search
+
+FIRST_NAMES = (
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+    "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen",
+    "Wanjiru", "Kamau", "Achieng", "Otieno", "Njeri", "Mwangi", "Akinyi", "Kiprono", "Amina", "Baraka",
+    "Chen", "Wei", "Yuki", "Haruto", "Priya", "Arjun", "Fatima", "Omar", "Sofia", "Mateo",
+    "Lucia", "Hugo", "Ingrid", "Lars", "Olga", "Dmitri", "Zainab", "Tunde", "Chloe", "Noah",
+)
+LAST_NAMES = (
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Hernandez", "Lopez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin", "Lee",
+    "Mutua", "Odhiambo", "Kariuki", "Wafula", "Chebet", "Njoroge", "Ochieng", "Muthoni", "Kiptoo", "Omondi",
+    "Wang", "Li", "Tanaka", "Sato", "Patel", "Sharma", "Khan", "Haddad", "Rossi", "Silva",
+    "Novak", "Larsen", "Ivanova", "Petrov", "Okafor", "Adeyemi", "Dubois", "Muller", "Kowalski", "Nguyen",
+)
+DOMAINS = ("corp.example", "mail.example", "staff.example")
+# (department, salary band median)
+DEPARTMENTS = (
+    ("Engineering", 120_000), ("Sales", 85_000), ("Marketing", 80_000), ("Finance", 95_000),
+    ("Human Resources", 70_000), ("Operations", 75_000), ("Legal", 130_000), ("Support", 55_000),
+    ("Research", 115_000), ("IT", 90_000), ("Procurement", 68_000), ("Security", 88_000),
+)
+LOCATIONS = ("Nairobi", "Mombasa", "Kisumu", "London", "Berlin", "Toronto", "Singapore", "Austin")
+PROJECT_WORDS = (
+    ("Cloud", "Data", "Mobile", "Payroll", "Customer", "Supply", "Security", "Analytics", "Billing", "Identity"),
+    ("Migration", "Platform", "Portal", "Revamp", "Pipeline", "Audit", "Rollout", "Upgrade", "Hub", "Gateway"),
+)
+# Share of employees on 0, 1, 2 and 3 projects
+PROJECTS_PER_EMPLOYEE = (0.3, 0.4, 0.2, 0.1)
+CHUNK = 50_000
+
+
+def sizes(employees):
+    """Default (departments, projects) for a company with `employees` staff."""
+    return max(len(DEPARTMENTS), employees // 1000), max(10, employees // 50)
+
+
+def department_rows(n):
+    """n unique (name, location, salary median): 'Engineering', ..., 'Engineering Mombasa', ..."""
+    rows = []
+    for i in range(n):
+        base, median = DEPARTMENTS[i % len(DEPARTMENTS)]
+        k = i // len(DEPARTMENTS)
+        location = LOCATIONS[k % len(LOCATIONS)]
+        if k == 0:
+            name = base
+        elif k < len(LOCATIONS):
+            name = f"{base} {location}"
+        else:
+            name = f"{base} {location} {k // len(LOCATIONS) + 1}"
+        rows.append((name, location, median))
+    return rows
+
+
+def employee_rows(rnd, n, dept_medians, start=1):
+    """Yield employee dicts; email is unique through the row number."""
+    ndept = len(dept_medians)
+    for i in range(start, start + n):
+        first, last = rnd.choice(FIRST_NAMES), rnd.choice(LAST_NAMES)
+        dept = rnd.randint(1, ndept)
+        salary = round(dept_medians[dept - 1] * rnd.lognormvariate(0, 0.3), -2)
+        yield {
+            "first_name": first,
+            "last_name": last,
+            "email": f"{first}.{last}{i}@{DOMAINS[i % len(DOMAINS)]}".lower(),
+            "salary": max(salary, 20_000.0),
+            "department_id": dept,
+        }
+
+
+def populate(eng, employees, departments=None, projects=None, seed=42):
+    """Insert a synthetic company into an engine whose tables already exist; returns row counts."""
+    rnd = random.Random(seed)
+    n_depts, n_projects = sizes(employees)
+    n_depts, n_projects = departments or n_depts, projects or n_projects
+    depts = department_rows(n_depts)
+    with eng.begin() as conn:
+        conn.execute(insert(Department.__table__), [{"name": n, "location": loc} for n, loc, _ in depts])
+        conn.execute(insert(Project.__table__), [
+            {"name": f"{rnd.choice(PROJECT_WORDS[0])} {rnd.choice(PROJECT_WORDS[1])} {i}",
+             "budget": float(rnd.randrange(50_000, 5_000_000, 1000))}
+            for i in range(1, n_projects + 1)
+        ])
+        medians = [m for _, _, m in depts]
+        rows = employee_rows(rnd, employees, medians)
+        for _ in range(0, employees, CHUNK):
+            chunk = [row for _, row in zip(range(CHUNK), rows)]
+            conn.execute(insert(Employee.__table__), chunk)
+        assignments = 0
+        chunk = []
+        for emp in range(1, employees + 1):
+            k = rnd.choices(range(len(PROJECTS_PER_EMPLOYEE)), PROJECTS_PER_EMPLOYEE)[0]
+            for proj in rnd.sample(range(1, n_projects + 1), min(k, n_projects)):
+                chunk.append({"employee_id": emp, "project_id": proj})
+            if len(chunk) >= CHUNK:
+                conn.execute(insert(employee_project), chunk)
+                assignments += len(chunk)
+                chunk = []
+        if chunk:
+            conn.execute(insert(employee_project), chunk)
+            assignments += len(chunk)
+    return {"departments": n_depts, "employees": employees, "projects": n_projects, "assignments": assignments}
+
+
+def generate(path, employees, seed=42):
+    """Create a complete throwaway database at `path` (search index, change-log triggers and schema version included).
+
+    The generated rows themselves are not in the change log.
+    """
+    for stale in (path, path + "-wal", path + "-shm"):
+        if os.path.exists(stale):
+            os.remove(stale)
+    eng = make_engine(path, "fast")
+    try:
+        Base.metadata.create_all(eng)
+        counts = populate(eng, employees, seed=seed)
+        # Build the search index once, after the bulk load, instead of per-row triggers
+        install_search(eng)
+        install_changes(eng)
+        with eng.begin() as conn:
+            conn.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    finally:
+        eng.dispose()
+    return counts
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(2)
+    path = sys.argv[1]
+    employees = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 42
+    start = time.perf_counter()
+    counts = generate(path, employees, seed)
+    print(f"{path}: " + ", ".join(f"{v:,} {k}" for k, v in counts.items())
+          + f" in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# lib/benchmarks/write_contention.py
+"""N writer processes hammering one database file through the model helpers.
+
+Each process alternates Employee.create and Employee.update (short transactions,
+like concurrent CLI sessions) and counts commits, lock failures and retries.
+Scenarios vary the busy timeout and the retry budget.
+
+    cd lib && python -m benchmarks.write_contention [processes] [ops_per_process]
+"""
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+from tabulate import tabulate
+
+# (label, busy timeout ms, retries)
+SCENARIOS = [
+    ("no wait, no retry", 0, 0),
+    ("no wait, jittered retry", 0, 5),
+    ("busy_timeout 100 ms, no retry", 100, 0),
+    ("busy_timeout 100 ms + retry", 100, 5),
+    ("busy_timeout 5 s + retry (default)", 5000, 5),
+]
+SEED_EMPLOYEES = 1000
+
+
+def seed():
+    from sqlalchemy import insert
+    from models import engine, init_db
+    from models.department import Department
+    from models.employee import Employee
+    init_db()
+    with engine.begin() as conn:
+        conn.execute(insert(Department.__table__), [{"name": "Load", "location": "Lab"}])
+        conn.execute(insert(Employee.__table__), [
+            {"first_name": "Seed", "last_name": f"N{i}", "email": f"seed{i}@load.io",
+             "salary": 1000, "department_id": 1}
+            for i in range(SEED_EMPLOYEES)
+        ])
+    engine.dispose()
+
+
+def writer(tag, worker, ops, retries):
+    """Runs in a fresh (spawned) process; returns (commits, lock failures, other errors, retries)."""
+    from models import Session, init_db, unit_of_work
+    from models.employee import Employee
+    from models.unit_of_work import is_lock_error, retry_stats
+    unit_of_work.WRITE_RETRIES = retries
+    init_db()
+    rnd = random.Random(worker)
+    commits = locked = other = 0
+    with Session() as s:
+        for i in range(ops):
+            try:
+                if i % 2 == 0:
+                    Employee.create(s, first_name="W", last_name=f"P{worker}",
+                                    email=f"w{tag}.{worker}.{i}@load.io", salary=2000, department_id=1)
+                else:
+                    e = Employee.find_by_id(s, rnd.randint(1, SEED_EMPLOYEES))
+                    e.update(s, salary=rnd.randint(1000, 9000))
+                commits += 1
+            except Exception as e:
+                s.rollback()
+                if is_lock_error(e):
+                    locked += 1
+                else:
+                    other += 1
+    return commits, locked, other, retry_stats()["retries"]
+
+
+def run(tag, processes, ops, busy_ms, retries):
+    os.environ["EMS_BUSY_TIMEOUT"] = str(busy_ms)  # inherited by the spawned writers
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(processes) as pool:
+        start = time.perf_counter()
+        results = pool.starmap(writer, [(tag, w, ops, retries) for w in range(processes)])
+        elapsed = time.perf_counter() - start
+    commits, locked, other, retried = (sum(col) for col in zip(*results))
+    return commits, locked, other, retried, elapsed
+
+
+def main(processes=8, ops=200):
+    # models is imported only after this, here and in the spawned writers (which inherit it)
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["EMS_DB_PATH"] = os.path.join(tmp.name, "contention.db")
+    seed()
+    rows = []
+    for tag, (label, busy_ms, retries) in enumerate(SCENARIOS):
+        commits, locked, other, retried, elapsed = run(tag, processes, ops, busy_ms, retries)
+        rows.append([label, processes, processes * ops, commits, locked, other, retried,
+                     f"{commits / elapsed:,.0f}"])
+    print(tabulate(rows, headers=["scenario", "procs", "attempted", "committed", "locked",
+                                  "other errors", "retries", "commits/s"], tablefmt="grid"))
+    print("(process start-up and init_db are included in commits/s)")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -1,21 +1,9 @@
 # lib/cli.py
-from tabulate import tabulate
-from helpers import (
-    exit_program,
+import sys
+import time
 
-    # Departments
-    list_departments, find_department_by_name, create_department,
-    update_department, delete_department, list_department_employees,
-
-    # Employees
-    list_employees, find_employee_by_name, find_employee_by_id,
-    create_employee, update_employee, delete_employee,
-
-    # Projects
-    list_projects, find_project_by_name, create_project,
-    assign_employee_to_project, remove_employee_from_project,
-)
-from models import init_db
+# Process start, for --profile-startup
+STARTED = time.perf_counter()
 
 MENU = """
 Please select an option:
@@ -34,39 +22,80 @@ Please select an option:
 10. Create employee
 11. Update employee
 12. Delete employee
+20. Search employees (prefix / fuzzy)
 --- Projects ---
 13. List all projects
 14. Find project by name
 15. Create project
 16. Assign employee to project
 17. Remove employee from project
+25. Assign a whole department to a project
+26. Assign a list of employees to a project
+27. Remove a list of employees from a project
+28. Move all members of one project to another
+--- Bulk ---
+18. Import data from CSV/JSONL
+19. Export all tables (CSV/JSONL/columnar)
+--- Reports ---
+22. Department payroll and headcount
+23. Salary percentiles by department
+24. Project budget per head
+--- Diagnostics ---
+21. Show lookup cache statistics
+29. Show action timing statistics
+30. Audit data integrity (validation rules, orphans, duplicate emails)
 """
 
+# Menu option -> helpers function name (helpers is imported only for the menu)
 ROUTES = {
-    "0": exit_program,
+    "0": "exit_program",
+
+    "1": "list_departments",
+    "2": "find_department_by_name",
+    "3": "create_department",
+    "4": "update_department",
+    "5": "delete_department",
+    "6": "list_department_employees",
+
+    "7": "list_employees",
+    "8": "find_employee_by_name",
+    "9": "find_employee_by_id",
+    "10": "create_employee",
+    "11": "update_employee",
+    "12": "delete_employee",
+    "20": "search_employees",
+
+    "13": "list_projects",
+    "14": "find_project_by_name",
+    "15": "create_project",
+    "16": "assign_employee_to_project",
+    "17": "remove_employee_from_project",
+    "25": "assign_department_to_project",
+    "26": "assign_employees_to_project",
+    "27": "remove_employees_from_project",
+    "28": "move_project_members",
 
-    "1": list_departments,
-    "2": find_department_by_name,
-    "3": create_department,
-    "4": update_department,
-    "5": delete_department,
-    "6": list_department_employees,
+    "18": "import_data",
+    "19": "export_data",
 
-    "7": list_employees,
-    "8": find_employee_by_name,
-    "9": find_employee_by_id,
-    "10": create_employee,
-    "11": update_employee,
-    "12": delete_employee,
+    "22": "payroll_report",
+    "23": "salary_percentile_report",
+    "24": "project_budget_report",
 
-    "13": list_projects,
-    "14": find_project_by_name,
-    "15": create_project,
-    "16": assign_employee_to_project,
-    "17": remove_employee_from_project,
+    "21": "show_cache_stats",
+    "29": "show_timing_stats",
+    "30": "audit_data",
 }
 
 def main():
+    # Any arguments switch to the scripted interface (see commands.py)
+    if len(sys.argv) > 1:
+        from commands import main as run_command
+        sys.exit(run_command(sys.argv[1:], started=STARTED))
+    import helpers
+    import render
+    from models import init_db
+    from models.metrics import measure
     init_db()
     print("Welcome to the Employee Management System (EMS)")
     while True:
@@ -75,18 +104,15 @@ def main():
         action = ROUTES.get(choice)
         if action:
             try:
-                result = action()
-                # 🔹 If the action returned a list of models, format into a table
-                if isinstance(result, list) and result:
-                    if hasattr(result[0], "__dict__"):
-                        rows = []
-                        for obj in result:
-                            data = {k: v for k, v in obj.__dict__.items() if not k.startswith("_")}
-                            rows.append(list(data.values()))
-                        headers = [k for k in result[0].__dict__.keys() if not k.startswith("_")]
-                        print(tabulate(rows, headers=headers, tablefmt="grid"))
-                elif result:
-                    print(result)
+                # Wall time, SQL statements, rows and rendering time per action (see models/metrics.py)
+                with measure(action):
+                    result = getattr(helpers, action)()
+                    # 🔹 If the action returned a list of models, format into a table
+                    if isinstance(result, list) and result:
+                        if hasattr(result[0], "to_dict"):
+                            render.table((obj.to_dict() for obj in result), headers="keys")
+                    elif result:
+                        print(result)
             except SystemExit:
                 print("Exited.")
                 break
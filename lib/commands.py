@@ -0,0 +1,589 @@
+# lib/commands.py
+"""Non-interactive command interface: `python lib/cli.py <group> <action> [options]`.
+
+Every command runs against a session passed in by the caller, so a --batch file
+reuses one engine and one session for all of its lines. Listing commands return
+generators over keyset pages (or a streamed query), and emit() writes their rows
+as they are fetched, so memory stays flat however large the table.
+"""
+import argparse
+import json
+import shlex
+import sys
+import time
+from contextlib import nullcontext
+from itertools import chain, islice
+
+# tabulate, models.parallel (reports) and models.bulk are imported only by the commands that
+# need them, so simple lookups (especially with --json) start faster
+import render
+from models import (PROFILES, READ_ROUTES, Session, init_db, metrics, read_session, set_busy_timeout,
+                    set_profile, set_read_routing)
+from models.department import Department
+from models.employee import Employee
+from models.project import Project
+from models.unit_of_work import batch
+
+
+class CommandError(Exception):
+    """A command could not run (bad reference, missing record, ...)."""
+
+
+def _flushed(session, obj):
+    """Inside an atomic batch new rows have no id until flushed."""
+    if obj.id is None:
+        session.flush()
+    return obj
+
+def _find(cls, session, id_):
+    obj = cls.find_by_id(session, id_)
+    if not obj:
+        raise CommandError(f"{cls.__name__} {id_} not found")
+    return obj
+
+def _changes(args, fields):
+    return {f: getattr(args, f) for f in fields if getattr(args, f) is not None}
+
+
+# ---------- Departments ----------
+def department_list(s, args):
+    return (d.to_dict() for page in Department.iter_pages(s) for d in page)
+
+def department_get(s, args):
+    d = Department.find_by_name(s, args.name) if args.name else _find(Department, s, args.id)
+    if not d:
+        raise CommandError(f"Department '{args.name}' not found")
+    return d.to_dict()
+
+def department_create(s, args):
+    return _flushed(s, Department.create(s, name=args.name, location=args.location)).to_dict()
+
+def department_update(s, args):
+    d = _find(Department, s, args.id)
+    return d.update(s, **_changes(args, ("name", "location"))).to_dict()
+
+def department_delete(s, args):
+    d = _find(Department, s, args.id)
+    if args.dry_run:
+        return dict(d.delete_preview(s), department_id=d.id, dry_run=True)
+    target = None
+    if args.reassign_to is not None:
+        target = Department.find_by_name(s, args.reassign_to) or Department.find_by_id(s, args.reassign_to)
+        if not target:
+            raise CommandError(f"Department '{args.reassign_to}' not found")
+    return dict(d.delete(s, reassign_to=target), department_id=int(args.id), deleted=True)
+
+def department_employees(s, args):
+    d = _find(Department, s, args.id)
+    return (e.to_dict() for page in Employee.iter_pages(s, department_id=d.id) for e in page)
+
+
+# ---------- Employees ----------
+def employee_list(s, args):
+    return (e.to_dict() for page in Employee.iter_pages(s) for e in page)
+
+def employee_get(s, args):
+    return _find(Employee, s, args.id).to_dict()
+
+def employee_find(s, args):
+    e = Employee.find_by_name(s, args.name)
+    if not e:
+        raise CommandError(f"Employee '{args.name}' not found")
+    return e.to_dict()
+
+def employee_search(s, args):
+    return [e.to_dict() for e in Employee.search(s, args.query, args.limit)]
+
+def _department_id(s, args):
+    if args.department is not None:
+        d = Department.find_by_name(s, args.department)
+        if not d:
+            raise CommandError(f"Department '{args.department}' not found")
+        return d.id
+    return _find(Department, s, args.department_id).id
+
+def employee_create(s, args):
+    e = Employee.create(
+        s,
+        first_name=args.first_name,
+        last_name=args.last_name,
+        email=args.email,
+        salary=args.salary,
+        department_id=_department_id(s, args),
+    )
+    return _flushed(s, e).to_dict()
+
+def employee_update(s, args):
+    e = _find(Employee, s, args.id)
+    attrs = _changes(args, ("first_name", "last_name", "email", "salary"))
+    if args.department is not None or args.department_id is not None:
+        attrs["department_id"] = _department_id(s, args)
+    return e.update(s, **attrs).to_dict()
+
+def employee_delete(s, args):
+    _find(Employee, s, args.id).delete(s)
+    return f"Employee {args.id} deleted"
+
+
+# ---------- Projects ----------
+def project_list(s, args):
+    return (p.to_dict() for page in Project.iter_pages(s) for p in page)
+
+def project_get(s, args):
+    p = Project.find_by_name(s, args.name) if args.name else _find(Project, s, args.id)
+    if not p:
+        raise CommandError(f"Project '{args.name}' not found")
+    return p.to_dict()
+
+def project_roster(s, args):
+    return (dict(r._mapping) for r in Project.roster(s))
+
+def project_create(s, args):
+    return _flushed(s, Project.create(s, name=args.name, budget=args.budget)).to_dict()
+
+def project_assign(s, args):
+    p = _find(Project, s, args.project)
+    if args.department is not None:
+        added = p.assign_department(s, _find(Department, s, args.department).id)
+    else:
+        added = p.assign_employees(s, args.employee)
+    return {"project_id": p.id, "assigned": added}
+
+def project_unassign(s, args):
+    p = _find(Project, s, args.project)
+    if args.department is not None:
+        removed = p.unassign_department(s, _find(Department, s, args.department).id)
+    else:
+        removed = p.unassign_employees(s, args.employee)
+    return {"project_id": p.id, "removed": removed}
+
+def project_move(s, args):
+    source, target = _find(Project, s, args.source), _find(Project, s, args.target)
+    if source.id == target.id:
+        raise CommandError("source and target project are the same")
+    added, removed = source.move_members_to(s, target)
+    return {"from": source.id, "to": target.id, "moved": removed, "newly_assigned": added}
+
+
+# ---------- Reports / bulk ----------
+def report(s, args):
+    from models import parallel
+    fn = {
+        "payroll": parallel.department_payroll,
+        "percentiles": parallel.salary_percentiles,
+        "budget": parallel.project_budget_per_head,
+    }[args.name]
+    return [r._asdict() for r in fn(s, workers=args.workers)]
+
+def import_file(s, args):
+    from models.bulk import bulk_import
+    r = bulk_import(s, args.kind, args.file)
+    return {"kind": r.kind, "inserted": r.inserted, "rejected": len(r.errors),
+            "errors": [{"line": n, "error": msg} for n, msg in r.errors],
+            "seconds": round(r.elapsed, 3), "rows_per_sec": round(r.rows_per_sec)}
+
+def export_files(s, args):
+    from models.parallel import bulk_export
+    r = bulk_export(s, args.export_format, args.directory, workers=args.workers)
+    return {"format": r.fmt, "tables": {name: {"file": path, "rows": n} for name, (path, n) in r.tables.items()},
+            "rows": r.rows, "seconds": round(r.elapsed, 3), "rows_per_sec": round(r.rows_per_sec)}
+
+def _audit_progress(report):
+    print(f"\raudit: {report.chunks_done}/{report.chunks} ranges, {report.rows:,} rows, "
+          f"{report.rows_per_sec:,.0f} rows/sec", end="", file=sys.stderr, flush=True)
+
+def audit(s, args):
+    from models import audit as integrity
+    fixes = args.fix or []
+    if fixes == ["all"]:
+        # orphaned employees only move when told where to
+        fixes = [r for r in integrity.FIXABLE if r != "employee_department" or args.reassign_to is not None]
+    unfixable = [r for r in fixes if r not in integrity.FIXABLE]
+    if unfixable:
+        raise CommandError(f"no automatic fix for: {', '.join(unfixable)} "
+                           f"(fixable: {', '.join(integrity.FIXABLE)})")
+    target = None
+    if args.reassign_to is not None:
+        target = Department.find_by_name(s, args.reassign_to) or Department.find_by_id(s, args.reassign_to)
+        if not target:
+            raise CommandError(f"Department '{args.reassign_to}' not found")
+    live = not args.quiet and sys.stderr.isatty()
+    r = integrity.audit(s, args.rule, chunk_size=args.chunk_size or integrity.CHUNK_SIZE, workers=args.workers,
+                        progress=_audit_progress if live else None)
+    if live:
+        print(file=sys.stderr)
+    # end the scan's read transaction; fix() starts its own write transaction
+    s.rollback()
+    fixes = [rule for rule in fixes if r.found.get(rule)]
+    fixed = integrity.fix(s, fixes, reassign_to=target) if fixes else {}
+    return {"rows": r.rows, "problems": r.problems, "fixed": sum(fixed.values()), "seconds": round(r.elapsed, 3),
+            "rows_per_sec": round(r.rows_per_sec),
+            "findings": [{"rule": rule, "table": r.table_of(rule), "rows": r.found[rule],
+                          "fixed": fixed.get(rule, 0), "sample": ", ".join(map(str, r.samples[rule]))}
+                         for rule in r.rules]}
+
+def stats(s, args):
+    path = args.log or metrics.METRICS_LOG
+    if not path:
+        raise CommandError("no metrics log: pass --log FILE or set EMS_METRICS_LOG")
+    by_action = metrics.read_log(path)
+    if args.jsonl:
+        for st in by_action.values():
+            print(json.dumps(st.to_dict()))
+        return None
+    if getattr(args, "json", False):
+        return [st.to_dict() for st in by_action.values()]
+    return metrics.summary_rows(by_action)
+
+def changes(s, args):
+    from models.changes import changes_since, last_seq
+    rows = changes_since(s, args.since, args.limit, args.table)
+    if not getattr(args, "json", False):
+        rows = [dict(r, data=json.dumps(r["data"]), ts=time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(r["ts"])))
+                for r in rows]
+    # pass "next" back as --since for the following page
+    return {"since": args.since, "next": rows[-1]["seq"] if rows else args.since,
+            "latest": last_seq(s), "changes": rows}
+
+def snapshot(s, args):
+    from models import SNAPSHOT_PATH, refresh_snapshot
+    seconds = refresh_snapshot()
+    return {"snapshot": SNAPSHOT_PATH, "seconds": round(seconds, 3)}
+
+def serve_api(s, args):
+    from server import serve
+    serve(args.host, args.port, workers=args.workers, quiet=args.quiet)
+
+
+# Commands that only read run on read_session() (see --read-from)
+READ_ONLY = {
+    department_list, department_get, department_employees,
+    employee_list, employee_get, employee_find, employee_search,
+    project_list, project_get, project_roster,
+    report, export_files,
+}
+
+
+# ---------- Parser ----------
+def _ids(text):
+    try:
+        return [int(i) for i in text.split(",") if i.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected comma-separated ids, e.g. 1,2,3")
+
+def _add(sub, name, func, help_):
+    p = sub.add_parser(name, help=help_)
+    p.set_defaults(func=func)
+    # also accept --json after the command; SUPPRESS keeps a global --json intact
+    p.add_argument("--json", action="store_true", default=argparse.SUPPRESS, help="print results as JSON")
+    p.add_argument("--format", choices=render.MODES, default=argparse.SUPPRESS, help="table output mode")
+    return p
+
+def _add_workers(p):
+    p.add_argument("--workers", type=int, metavar="N",
+                   help="split employees / assignments into id ranges over N processes (0 = one per CPU core; "
+                        "default: EMS_WORKERS or 1)")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Employee Management System")
+    parser.add_argument("--profile", choices=list(PROFILES), help="SQLite tuning preset")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--format", choices=render.MODES,
+                        help="table output: grid, streamed fixed-width columns, tsv or JSON lines "
+                             "(default: EMS_OUTPUT or auto = grid for small results)")
+    parser.add_argument("--batch", metavar="FILE", help="run one command per line from FILE ('-' = stdin)")
+    parser.add_argument("--atomic", action="store_true", help="with --batch: commit every command or none")
+    parser.add_argument("--busy-timeout", type=int, metavar="MS",
+                        help="how long to wait for another writer's lock (default: preset's)")
+    parser.add_argument("--slow-ms", type=float, metavar="MS",
+                        help=f"log statements slower than MS (default {metrics.SLOW_QUERY_MS:g})")
+    parser.add_argument("--metrics-log", metavar="FILE",
+                        help="append per-command timings to FILE as JSON lines (default: EMS_METRICS_LOG)")
+    parser.add_argument("--read-from", choices=READ_ROUTES,
+                        help="where list/find/search/report/export commands read: the main database, "
+                             "a read-only connection to it, or a snapshot copy (default: EMS_READ_ROUTING or primary)")
+    parser.add_argument("--snapshot-max-age", type=float, metavar="SECONDS",
+                        help="refresh the snapshot when it is older than this (default: EMS_SNAPSHOT_MAX_AGE or 60)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="report import / init / command timings on stderr")
+    groups = parser.add_subparsers(dest="group", metavar="command")
+
+    dept = groups.add_parser("department", help="department commands").add_subparsers(dest="action", required=True)
+    _add(dept, "list", department_list, "list all departments")
+    p = _add(dept, "get", department_get, "find a department by id or name")
+    who = p.add_mutually_exclusive_group(required=True)
+    who.add_argument("--id")
+    who.add_argument("--name")
+    p = _add(dept, "create", department_create, "create a department")
+    p.add_argument("--name", required=True)
+    p.add_argument("--location", required=True)
+    p = _add(dept, "update", department_update, "update a department")
+    p.add_argument("--id", required=True)
+    p.add_argument("--name")
+    p.add_argument("--location")
+    p = _add(dept, "delete", department_delete, "delete a department with its employees (or move them)")
+    p.add_argument("--id", required=True)
+    p.add_argument("--reassign-to", metavar="DEPARTMENT", help="move the employees to this department (name or id)")
+    p.add_argument("--dry-run", action="store_true", help="only count the employees and assignments affected")
+    p = _add(dept, "employees", department_employees, "list employees in a department")
+    p.add_argument("--id", required=True)
+
+    emp = groups.add_parser("employee", help="employee commands").add_subparsers(dest="action", required=True)
+    _add(emp, "list", employee_list, "list all employees")
+    p = _add(emp, "get", employee_get, "find an employee by id")
+    p.add_argument("--id", required=True)
+    p = _add(emp, "find", employee_find, "find an employee by name")
+    p.add_argument("--name", required=True)
+    p = _add(emp, "search", employee_search, "prefix / typo-tolerant search")
+    p.add_argument("--query", required=True)
+    p.add_argument("--limit", type=int, default=10)
+    for action, func, help_ in (("create", employee_create, "create an employee"),
+                                ("update", employee_update, "update an employee")):
+        p = _add(emp, action, func, help_)
+        creating = action == "create"
+        if not creating:
+            p.add_argument("--id", required=True)
+        p.add_argument("--first", dest="first_name", required=creating)
+        p.add_argument("--last", dest="last_name", required=creating)
+        p.add_argument("--email", required=creating)
+        p.add_argument("--salary", required=creating)
+        where = p.add_mutually_exclusive_group(required=creating)
+        where.add_argument("--department", help="department name")
+        where.add_argument("--department-id")
+    p = _add(emp, "delete", employee_delete, "delete an employee")
+    p.add_argument("--id", required=True)
+
+    proj = groups.add_parser("project", help="project commands").add_subparsers(dest="action", required=True)
+    _add(proj, "list", project_list, "list all projects")
+    _add(proj, "roster", project_roster, "projects with their employees")
+    p = _add(proj, "get", project_get, "find a project by id or name")
+    who = p.add_mutually_exclusive_group(required=True)
+    who.add_argument("--id")
+    who.add_argument("--name")
+    p = _add(proj, "create", project_create, "create a project")
+    p.add_argument("--name", required=True)
+    p.add_argument("--budget", required=True)
+    for action, func, help_ in (("assign", project_assign, "assign employees or a whole department"),
+                                ("unassign", project_unassign, "remove employees or a whole department")):
+        p = _add(proj, action, func, help_)
+        p.add_argument("--project", required=True)
+        who = p.add_mutually_exclusive_group(required=True)
+        who.add_argument("--employee", type=_ids, help="comma-separated employee ids")
+        who.add_argument("--department", help="department id")
+    p = _add(proj, "move", project_move, "move all members of one project to another")
+    p.add_argument("--from", dest="source", required=True)
+    p.add_argument("--to", dest="target", required=True)
+
+    p = _add(groups, "report", report, "aggregate reports")
+    p.add_argument("name", choices=["payroll", "percentiles", "budget"])
+    _add_workers(p)
+    p = _add(groups, "import", import_file, "bulk import a CSV/JSONL file")
+    p.add_argument("kind", help="departments, employees, projects or assignments")
+    p.add_argument("file")
+    p = _add(groups, "export", export_files, "export every table")
+    # not dest "format": that is the table output mode (--format)
+    p.add_argument("export_format", metavar="format", help="csv, jsonl or col")
+    p.add_argument("directory")
+    _add_workers(p)
+    _add(groups, "snapshot", snapshot, "refresh the read snapshot now (backup API copy)")
+    p = _add(groups, "serve", serve_api, "run the local HTTP/JSON API")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8000)
+    p.add_argument("--workers", type=int, default=8, help="concurrent requests (and pooled connections)")
+    p.add_argument("--quiet", action="store_true", help="no per-request log lines")
+    p = _add(groups, "changes", changes, "change log entries after a sequence number (incremental sync)")
+    p.add_argument("--since", type=int, default=0, metavar="SEQ", help="last sequence number already applied")
+    p.add_argument("--limit", type=int, default=1000)
+    p.add_argument("--table", action="append", choices=["departments", "employees", "projects", "employee_project"],
+                   help="only changes to this table (repeatable)")
+    p = _add(groups, "audit", audit, "check stored rows against the validation rules and foreign keys")
+    p.add_argument("--rule", action="append", metavar="RULE",
+                   help="only this rule (repeatable; see models/audit.py for the list)")
+    p.add_argument("--fix", type=lambda t: [r.strip() for r in t.split(",") if r.strip()], metavar="RULES",
+                   help="repair the rows found for these comma-separated rules, or 'all' fixable ones")
+    p.add_argument("--reassign-to", metavar="DEPARTMENT",
+                   help="with --fix employee_department: department (name or id) for orphaned employees")
+    p.add_argument("--chunk-size", type=int, metavar="N", help="rows per scanned range (default 200000)")
+    p.add_argument("--quiet", action="store_true", help="no progress line on stderr")
+    _add_workers(p)
+    p = _add(groups, "stats", stats, "timing histograms from a metrics log")
+    p.add_argument("--log", help="JSON-lines metrics log (default: EMS_METRICS_LOG)")
+    p.add_argument("--jsonl", action="store_true", help="one JSON object per action, for scraping")
+    return parser
+
+
+# ---------- Running ----------
+def _dump_array(rows, out=None):
+    """json.dumps(list(rows)), written in chunks as rows arrive."""
+    out = out or sys.stdout
+    out.write("[")
+    first = True
+    while True:
+        chunk = list(islice(rows, render.CHUNK_ROWS))
+        if not chunk:
+            break
+        out.write(("" if first else ", ") + ", ".join(json.dumps(r, default=str) for r in chunk))
+        first = False
+    out.write("]\n")
+
+def emit(result, as_json, mode=None):
+    if result is None:
+        return
+    if not isinstance(result, (list, dict, str)) and hasattr(result, "__iter__"):
+        # streamed rows (listing commands)
+        if as_json:
+            _dump_array(iter(result))
+            return
+        rows = iter(result)
+        first = next(rows, None)
+        if first is None:
+            print("(no records)")
+        else:
+            render.table(chain([first], rows), "keys", mode)
+        return
+    if as_json:
+        print(json.dumps(result, default=str))
+        return
+    if isinstance(result, list):
+        if result:
+            render.table(result, "keys", mode)
+        else:
+            print("(no records)")
+    elif isinstance(result, dict):
+        render.table([{k: v for k, v in result.items() if not isinstance(v, (list, dict))}], "keys", mode)
+        for key, value in result.items():
+            if isinstance(value, list) and value:
+                render.table(value, "keys", mode)
+            elif isinstance(value, dict):
+                render.table([dict(name=k, **v) for k, v in value.items()], "keys", mode)
+    elif result is not None:
+        print(result)
+
+def _failure(session, e):
+    """Roll back and describe an error raised by a command."""
+    session.rollback()
+    if isinstance(e, (CommandError, ValueError, OSError)):
+        return str(e)
+    # database errors (constraints, locking, ...)
+    return f"{type(e).__name__}: {getattr(e, 'orig', None) or e}"
+
+def run_one(session, args):
+    """Run one parsed command; returns (ok, result or error message).
+
+    A listing's rows are only fetched when emitted; see run_and_emit.
+    """
+    try:
+        return True, args.func(session, args)
+    except Exception as e:
+        return False, _failure(session, e)
+
+def _action_name(args):
+    parts = [args.group, getattr(args, "action", None), args.name if args.group == "report" else None]
+    return " ".join(p for p in parts if p)
+
+def run_and_emit(session, args, as_json):
+    """run_one, printing the result on success; timed as one action (see models/metrics.py)."""
+    with metrics.measure(_action_name(args)):
+        ok, result = run_one(session, args)
+        if ok:
+            try:
+                emit(result, as_json, getattr(args, "format", None))
+            except Exception as e:  # a streamed listing failing part way through
+                ok, result = False, _failure(session, e)
+    return ok, result
+
+def _batch_lines(path):
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    with f:
+        for n, line in enumerate(f, 1):
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield n, line
+
+class _AbortBatch(Exception):
+    pass
+
+def run_batch(parser, opts):
+    """Run every line of opts.batch in one session; returns the number of failed lines.
+
+    With --atomic the whole file is one unit of work and the first failure rolls it back.
+    """
+    failures = 0
+    with Session() as s:
+        try:
+            with batch(s) if opts.atomic else nullcontext():
+                for n, line in _batch_lines(opts.batch):
+                    try:
+                        args = parser.parse_args(shlex.split(line))
+                    except SystemExit:
+                        ok, result = False, "invalid command"
+                    else:
+                        if not getattr(args, "func", None) or args.batch:
+                            ok, result = False, "expected a single command"
+                        else:
+                            ok, result = run_and_emit(s, args, opts.json)
+                    if ok:
+                        continue
+                    failures += 1
+                    if opts.json:
+                        print(json.dumps({"line": n, "error": result}))
+                    else:
+                        print(f"line {n}: error: {result}", file=sys.stderr)
+                    if opts.atomic:
+                        raise _AbortBatch
+        except _AbortBatch:
+            print("batch rolled back", file=sys.stderr)
+    return failures
+
+def _report_startup(timings):
+    total = sum(seconds for _, seconds in timings)
+    parts = ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in timings)
+    print(f"startup: {parts}; total {total * 1000:.1f} ms", file=sys.stderr)
+
+def main(argv, started=None):
+    """Entry point for non-interactive use; returns a process exit status.
+
+    `started` is the process start time from cli.py, used by --profile-startup.
+    """
+    t0 = time.perf_counter()
+    timings = [("imports", t0 - started)] if started is not None else []
+    parser = build_parser()
+    opts = parser.parse_args(argv)
+    if opts.profile:
+        set_profile(opts.profile)
+    if opts.busy_timeout is not None:
+        set_busy_timeout(opts.busy_timeout)
+    if opts.slow_ms is not None:
+        metrics.SLOW_QUERY_MS = opts.slow_ms
+    if opts.metrics_log:
+        metrics.METRICS_LOG = opts.metrics_log
+    if opts.format:
+        render.set_mode(opts.format)
+    if opts.read_from or opts.snapshot_max_age is not None:
+        set_read_routing(opts.read_from, opts.snapshot_max_age)
+    init_db()
+    t1 = time.perf_counter()
+    timings.append(("parse + init_db", t1 - t0))
+    try:
+        if opts.batch:
+            try:
+                return 1 if run_batch(parser, opts) else 0
+            except OSError as e:
+                print(f"error: {e}", file=sys.stderr)
+                return 1
+        if not opts.group:
+            parser.print_help()
+            return 2
+        with (read_session() if opts.func in READ_ONLY else Session()) as s:
+            ok, result = run_and_emit(s, opts, opts.json)
+        if not ok:
+            if opts.json:
+                print(json.dumps({"error": result}))
+            else:
+                print(f"error: {result}", file=sys.stderr)
+            return 1
+        return 0
+    finally:
+        if opts.profile_startup:
+            timings.append(("command", time.perf_counter() - t1))
+            _report_startup(timings)
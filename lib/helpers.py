@@ -1,34 +1,76 @@
 # lib/helpers.py
-from tabulate import tabulate
-from models import Session
+import json
+import sys
+from itertools import chain
+
+import render
+from models import Session, read_session
 from models.department import Department
 from models.employee import Employee
 from models.project import Project
+from models.cache import cache_stats
+from models import audit, parallel, reports
+from models.bulk import KINDS, EXPORT_FORMATS, bulk_import
+from models import metrics
 
 # ---------- Utility ----------
 def _get_session():
     return Session()
 
+def _read_session():
+    # Lists, finds, reports and export; see read_session() for the routing options
+    return read_session()
+
+# Every prompt goes through here: time at a prompt is not charged to the action
+# (rendering is charged in render.py)
+@metrics.untimed
 def _ask(prompt):
     return input(prompt).strip()
 
+def _money(value):
+    return f"${value:.2f}" if value is not None else "-"
+
+# Rows per page for the list actions
+PAGE_SIZE = 50
+
+def _print_pages(pages, headers, to_row, empty="(no records)", formats=None):
+    """Print rows page by page as they are fetched.
+
+    Interactive terminals get one table per page and a prompt between pages; piped
+    input streams every page into a single table (see render.py for the modes).
+    """
+    pages = iter(pages)
+    page = next(pages, None)
+    if not page:
+        print(empty)
+        return
+    if not sys.stdin.isatty():
+        rest = (x for p in pages for x in p)
+        render.table(map(to_row, chain(page, rest)), headers, formats=formats)
+        return
+    while page:
+        render.table([to_row(x) for x in page], headers, formats=formats)
+        page = next(pages, None)
+        if page:
+            if _ask("-- Enter for more, q to quit -- ").lower() == "q":
+                return
+
 # ---------- Department actions ----------
 def list_departments():
-    with _get_session() as s:
-        deps = Department.get_all(s)
-        if not deps:
-            print("(no records)")
-        else:
-            table = [(d.id, d.name, d.location) for d in deps]
-            print(tabulate(table, headers=["ID", "Name", "Location"], tablefmt="grid"))
+    with _read_session() as s:
+        _print_pages(
+            Department.iter_pages(s, PAGE_SIZE),
+            ["ID", "Name", "Location"],
+            lambda d: (d.id, d.name, d.location),
+        )
 
 def find_department_by_name():
     name = _ask("Enter the department's name: ")
-    with _get_session() as s:
+    with _read_session() as s:
         d = Department.find_by_name(s, name)
         if d:
             table = [(d.id, d.name, d.location)]
-            print(tabulate(table, headers=["ID", "Name", "Location"], tablefmt="grid"))
+            render.table(table, ["ID", "Name", "Location"])
         else:
             print(f"Department '{name}' not found")
 
@@ -39,7 +81,7 @@ def create_department():
         try:
             d = Department.create(s, name=name, location=location)
             table = [(d.id, d.name, d.location)]
-            print(tabulate(table, headers=["ID", "Name", "Location"], tablefmt="grid"))
+            render.table(table, ["ID", "Name", "Location"])
         except Exception as e:
             s.rollback()
             print("Error creating department:", e)
@@ -56,7 +98,7 @@ def update_department():
             location = _ask("Enter the department's new location: ")
             d.update(s, name=name, location=location)
             table = [(d.id, d.name, d.location)]
-            print(tabulate(table, headers=["ID", "Name", "Location"], tablefmt="grid"))
+            render.table(table, ["ID", "Name", "Location"])
         except Exception as e:
             s.rollback()
             print("Error updating department:", e)
@@ -68,52 +110,73 @@ def delete_department():
         if not d:
             print(f"Department {id_} not found")
             return
-        d.delete(s)
-        print(f"Department {id_} deleted")
+        target = None
+        preview = d.delete_preview(s)
+        if preview["employees"]:
+            print(f"{d.name} has {preview['employees']} employee(s) with {preview['assignments']} project assignment(s).")
+            target_id = _ask("Move them to department id (blank = delete them too): ")
+            if target_id:
+                target = Department.find_by_id(s, target_id)
+                if not target:
+                    print(f"Department {target_id} not found")
+                    return
+            if _ask("Proceed? (y/N): ").lower() != "y":
+                print("Cancelled")
+                return
+        try:
+            result = d.delete(s, reassign_to=target)
+        except ValueError as e:
+            s.rollback()
+            print("Error deleting department:", e)
+            return
+        if target:
+            print(f"Department {id_} deleted; {result['reassigned']} employee(s) moved to {target.name}")
+        else:
+            print(f"Department {id_} deleted with {result['employees']} employee(s) "
+                  f"and {result['assignments']} project assignment(s)")
 
 def list_department_employees():
     id_ = _ask("Enter the department's id: ")
-    with _get_session() as s:
+    with _read_session() as s:
         d = Department.find_by_id(s, id_)
         if not d:
             print(f"Department {id_} not found")
             return
-        if not d.employees:
-            print("(no employees in this department)")
-        else:
-            table = [
-                (e.id, e.first_name, e.last_name, e.email, f"${e.salary:.2f}")
-                for e in d.employees
-            ]
-            print(tabulate(table, headers=["ID", "First Name", "Last Name", "Email", "Salary"], tablefmt="grid"))
+        _print_pages(
+            Employee.iter_pages(s, PAGE_SIZE, department_id=d.id),
+            ["ID", "First Name", "Last Name", "Email", "Salary"],
+            lambda e: (e.id, e.first_name, e.last_name, e.email, e.salary),
+            empty="(no employees in this department)",
+            formats={"Salary": _money},
+        )
 
 # ---------- Employee actions ----------
 def list_employees():
-    with _get_session() as s:
-        emps = Employee.get_all(s)
-        if not emps:
-            print("(no records)")
-        else:
-            table = [(e.id, e.first_name, e.last_name, e.email, f"${e.salary:.2f}", e.department_id) for e in emps]
-            print(tabulate(table, headers=["ID", "First Name", "Last Name", "Email", "Salary", "Dept ID"], tablefmt="grid"))
+    with _read_session() as s:
+        _print_pages(
+            Employee.iter_pages(s, PAGE_SIZE),
+            ["ID", "First Name", "Last Name", "Email", "Salary", "Dept ID"],
+            lambda e: (e.id, e.first_name, e.last_name, e.email, e.salary, e.department_id),
+            formats={"Salary": _money},
+        )
 
 def find_employee_by_name():
     name = _ask("Enter the employee's name (First Last or either): ")
-    with _get_session() as s:
+    with _read_session() as s:
         e = Employee.find_by_name(s, name)
         if e:
             table = [(e.id, e.first_name, e.last_name, e.email, f"${e.salary:.2f}", e.department_id)]
-            print(tabulate(table, headers=["ID", "First Name", "Last Name", "Email", "Salary", "Dept ID"], tablefmt="grid"))
+            render.table(table, ["ID", "First Name", "Last Name", "Email", "Salary", "Dept ID"])
         else:
             print(f"Employee '{name}' not found")
 
 def find_employee_by_id():
     id_ = _ask("Enter the employee's id: ")
-    with _get_session() as s:
+    with _read_session() as s:
         e = Employee.find_by_id(s, id_)
         if e:
             table = [(e.id, e.first_name, e.last_name, e.email, f"${e.salary:.2f}", e.department_id)]
-            print(tabulate(table, headers=["ID", "First Name", "Last Name", "Email", "Salary", "Dept ID"], tablefmt="grid"))
+            render.table(table, ["ID", "First Name", "Last Name", "Email", "Salary", "Dept ID"])
         else:
             print(f"Employee {id_} not found")
 
@@ -138,7 +201,7 @@ def create_employee():
                 department_id=d.id,
             )
             table = [(e.id, e.first_name, e.last_name, e.email, f"${e.salary:.2f}", e.department_id)]
-            print(tabulate(table, headers=["ID", "First Name", "Last Name", "Email", "Salary", "Dept ID"], tablefmt="grid"))
+            render.table(table, ["ID", "First Name", "Last Name", "Email", "Salary", "Dept ID"])
         except Exception as ex:
             s.rollback()
             print("Error creating employee:", ex)
@@ -169,7 +232,7 @@ def update_employee():
                 department_id=d.id,
             )
             table = [(e.id, e.first_name, e.last_name, e.email, f"${e.salary:.2f}", e.department_id)]
-            print(tabulate(table, headers=["ID", "First Name", "Last Name", "Email", "Salary", "Dept ID"], tablefmt="grid"))
+            render.table(table, ["ID", "First Name", "Last Name", "Email", "Salary", "Dept ID"])
         except Exception as ex:
             s.rollback()
             print("Error updating employee:", ex)
@@ -184,46 +247,46 @@ def delete_employee():
         e.delete(s)
         print(f"Employee {id_} deleted")
 
-# ---------- Project actions ----------
-def list_projects():
-    with _get_session() as s:
-        projs = Project.get_all(s)
-        if not projs:
-            print("(no records)")
+def search_employees():
+    query = _ask("Search employees (name or email, prefix or approximate): ")
+    with _read_session() as s:
+        emps = Employee.search(s, query, limit=20)
+        if not emps:
+            print(f"No employees match '{query}'")
             return
+        table = [(e.id, e.first_name, e.last_name, e.email, f"${e.salary:.2f}", e.department_id) for e in emps]
+        render.table(table, ["ID", "First Name", "Last Name", "Email", "Salary", "Dept ID"])
 
-        rows = []
-        for p in projs:
-            if p.employees:  # If project has employees
-                for e in p.employees:
-                    dept_name = e.department.name if e.department else "N/A"
-                    rows.append([
-                        e.id,
-                        e.full_name,
-                        dept_name,
-                        p.name,
-                        f"${p.budget:.2f}"
-                    ])
-            else:
-                # Show project even if it has no employees assigned
-                rows.append([
-                    "-", "No employee assigned", "-", p.name, f"${p.budget:.2f}"
-                ])
+# ---------- Project actions ----------
+def list_projects():
+    def to_row(r):
+        if r.employee_id is None:
+            # Show project even if it has no employees assigned
+            return ["-", "No employee assigned", "-", r.project_name, r.budget]
+        return [
+            r.employee_id,
+            f"{r.first_name} {r.last_name}",
+            r.department_name or "N/A",
+            r.project_name,
+            r.budget
+        ]
 
-        print(tabulate(
-            rows,
-            headers=["Employee ID", "Employee Name", "Department", "Project Name", "Budget"],
-            tablefmt="grid"
-        ))
+    with _read_session() as s:
+        _print_pages(
+            Project.roster(s, chunk_size=PAGE_SIZE).partitions(),
+            ["Employee ID", "Employee Name", "Department", "Project Name", "Budget"],
+            to_row,
+            formats={"Budget": _money},
+        )
 
 
 def find_project_by_name():
     name = _ask("Enter the project's name: ")
-    with _get_session() as s:
+    with _read_session() as s:
         p = Project.find_by_name(s, name)
         if p:
             table = [(p.id, p.name, f"${p.budget:.2f}")]
-            print(tabulate(table, headers=["ID", "Name", "Budget"], tablefmt="grid"))
+            render.table(table, ["ID", "Name", "Budget"])
         else:
             print(f"Project '{name}' not found")
 
@@ -234,7 +297,7 @@ def create_project():
         try:
             p = Project.create(s, name=name, budget=budget)
             table = [(p.id, p.name, f"${p.budget:.2f}")]
-            print(tabulate(table, headers=["ID", "Name", "Budget"], tablefmt="grid"))
+            render.table(table, ["ID", "Name", "Budget"])
         except Exception as ex:
             s.rollback()
             print("Error creating project:", ex)
@@ -277,6 +340,207 @@ def remove_employee_from_project():
         s.commit()
         print(f"Removed {e.full_name} from project '{p.name}'")
 
+# ---------- Bulk project staffing ----------
+def _parse_ids(text):
+    """'1, 4, 10-20' -> [1, 4, 10, ..., 20]; raises ValueError on anything else."""
+    ids = []
+    for part in text.replace(" ", "").split(","):
+        if not part:
+            continue
+        if "-" in part:
+            lo, hi = part.split("-", 1)
+            ids.extend(range(int(lo), int(hi) + 1))
+        else:
+            ids.append(int(part))
+    return ids
+
+def _ask_project(s, prompt="Enter the project id: "):
+    proj_id = _ask(prompt)
+    p = Project.find_by_id(s, proj_id)
+    if not p:
+        print(f"Project {proj_id} not found")
+    return p
+
+def assign_department_to_project():
+    with _get_session() as s:
+        p = _ask_project(s)
+        if not p:
+            return
+        dept_id = _ask("Enter the department id: ")
+        d = Department.find_by_id(s, dept_id)
+        if not d:
+            print(f"Department {dept_id} not found")
+            return
+        added = p.assign_department(s, d.id)
+        print(f"Assigned {added} employee(s) from '{d.name}' to project '{p.name}'")
+
+def assign_employees_to_project():
+    with _get_session() as s:
+        p = _ask_project(s)
+        if not p:
+            return
+        try:
+            ids = _parse_ids(_ask("Enter employee ids (e.g. 1, 4, 10-20): "))
+        except ValueError:
+            print("Error: ids must be numbers or ranges like 10-20")
+            return
+        added = p.assign_employees(s, ids)
+        print(f"Assigned {added} employee(s) to project '{p.name}'")
+
+def remove_employees_from_project():
+    with _get_session() as s:
+        p = _ask_project(s)
+        if not p:
+            return
+        try:
+            ids = _parse_ids(_ask("Enter employee ids (e.g. 1, 4, 10-20): "))
+        except ValueError:
+            print("Error: ids must be numbers or ranges like 10-20")
+            return
+        removed = p.unassign_employees(s, ids)
+        print(f"Removed {removed} employee(s) from project '{p.name}'")
+
+def move_project_members():
+    with _get_session() as s:
+        source = _ask_project(s, "Enter the project id to move members from: ")
+        if not source:
+            return
+        target = _ask_project(s, "Enter the project id to move members to: ")
+        if not target:
+            return
+        if source.id == target.id:
+            print("Error: source and target project are the same")
+            return
+        added, removed = source.move_members_to(s, target)
+        print(f"Moved {removed} member(s) from '{source.name}' to '{target.name}' ({added} newly assigned)")
+
+# ---------- Bulk import ----------
+def import_data(kind=None, path=None):
+    kind = kind or _ask(f"Enter what to import ({', '.join(KINDS)}): ")
+    path = path or _ask("Enter the path of the .csv or .jsonl file: ")
+    with _get_session() as s:
+        try:
+            report = bulk_import(s, kind, path)
+        except (OSError, ValueError) as ex:
+            print("Error importing data:", ex)
+            return
+    if report.errors:
+        render.table(report.errors, ["Line", "Error"])
+    print(f"Imported {report.inserted} {kind} ({len(report.errors)} rejected) "
+          f"in {report.elapsed:.2f}s, {report.rows_per_sec:.0f} rows/sec")
+
+def export_data(fmt=None, out_dir=None):
+    fmt = fmt or _ask(f"Enter the export format ({', '.join(EXPORT_FORMATS)}): ")
+    out_dir = out_dir or _ask("Enter the output directory: ")
+    with _read_session() as s:
+        try:
+            # EMS_WORKERS > 1 exports the big tables in worker processes (models/parallel.py)
+            report = parallel.bulk_export(s, fmt, out_dir)
+        except (OSError, ValueError) as ex:
+            print("Error exporting data:", ex)
+            return
+    table = [(name, path, rows) for name, (path, rows) in report.tables.items()]
+    render.table(table, ["Table", "File", "Rows"])
+    print(f"Exported {report.rows} rows in {report.elapsed:.2f}s, {report.rows_per_sec:.0f} rows/sec")
+
+# ---------- Reports ----------
+# Single-session queries unless EMS_WORKERS > 1 (see models/parallel.py)
+def payroll_report():
+    with _read_session() as s:
+        rows = parallel.department_payroll(s)
+    if not rows:
+        print("(no records)")
+        return
+    table = [
+        (r.id, r.name, r.headcount, _money(r.total_salary), _money(r.avg_salary),
+         _money(r.min_salary), _money(r.max_salary))
+        for r in rows
+    ]
+    render.table(table, ["ID", "Department", "Headcount", "Total", "Average", "Min", "Max"])
+
+def salary_percentile_report():
+    with _read_session() as s:
+        rows = parallel.salary_percentiles(s)
+    if not rows:
+        print("(no records)")
+        return
+    labels = [f"P{int(p * 100)}" for p in reports.PERCENTILES]
+    table = [(r[0], r[1], r[2], *[_money(v) for v in r[3:]]) for r in rows]
+    render.table(table, ["ID", "Department", "Headcount", *labels])
+
+def project_budget_report():
+    with _read_session() as s:
+        rows = parallel.project_budget_per_head(s)
+    if not rows:
+        print("(no records)")
+        return
+    table = [
+        (r.id, r.name, _money(r.budget), r.headcount, _money(r.staff_salary), _money(r.budget_per_head))
+        for r in rows
+    ]
+    render.table(table, ["ID", "Project", "Budget", "Headcount", "Staff Salaries", "Budget/Head"])
+
+# ---------- Diagnostics ----------
+def show_cache_stats():
+    table = [
+        (name, size, hits, misses, f"{hits / (hits + misses):.0%}" if hits + misses else "-")
+        for name, size, hits, misses in cache_stats()
+    ]
+    render.table(table, ["Cache", "Cached Rows", "Hits", "Misses", "Hit Rate"])
+
+def show_timing_stats():
+    rows = metrics.summary_rows(metrics.stats())
+    if not rows:
+        print("No actions measured yet.")
+        return
+    render.table(rows, "keys")
+    path = _ask("Write as JSON lines to (blank to skip): ")
+    if path:
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                for st in metrics.stats().values():
+                    f.write(json.dumps(st.to_dict()) + "\n")
+            print(f"Wrote {len(rows)} action(s) to {path}")
+        except OSError as ex:
+            print("Error writing statistics:", ex)
+
+def audit_data():
+    def progress(r):
+        print(f"\rScanned {r.chunks_done}/{r.chunks} ranges, {r.rows:,} rows ({r.rows_per_sec:,.0f} rows/sec)",
+              end="", flush=True)
+
+    with _get_session() as s:
+        report = audit.audit(s, progress=progress)
+        print()
+        # don't hold the scan's read transaction open at the prompt
+        s.rollback()
+        table = [(rule, report.table_of(rule), report.found[rule], ", ".join(map(str, report.samples[rule])))
+                 for rule in report.rules if report.found[rule]]
+        if not table:
+            print(f"No problems in {report.rows:,} rows ({report.elapsed:.2f}s)")
+            return
+        render.table(table, ["Rule", "Table", "Rows", "Sample"])
+        fixable = [rule for rule in audit.FIXABLE if report.found[rule]]
+        if not fixable or _ask(f"Fix {', '.join(fixable)}? (y/N): ").lower() != "y":
+            return
+        target = None
+        if "employee_department" in fixable:
+            target_id = _ask("Move orphaned employees to department id (blank = leave them): ")
+            if target_id:
+                target = Department.find_by_id(s, target_id)
+                if not target:
+                    print(f"Department {target_id} not found")
+                    return
+            else:
+                fixable.remove("employee_department")
+        try:
+            fixed = audit.fix(s, fixable, reassign_to=target)
+        except ValueError as e:
+            print("Error fixing data:", e)
+            return
+    for rule, n in fixed.items():
+        print(f"{rule}: {n} row(s) fixed")
+
 # ---------- Exit ----------
 def exit_program():
     print("Goodbye!")
@@ -1,20 +1,284 @@
 # lib/models/__init__.py
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-# DB lives at lib/company.db
+from .metrics import CountingConnection, instrument
+
+# DB lives at lib/company.db unless EMS_DB_PATH points elsewhere
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
-DB_PATH = os.path.join(BASE_DIR, "company.db")
+DB_PATH = os.environ.get("EMS_DB_PATH") or os.path.join(BASE_DIR, "company.db")
+
+# SQLite tuning presets, applied as PRAGMAs on every new connection.
+# busy_timeout goes first so switching journal_mode can wait out other writers.
+PROFILES = {
+    # WAL + fsync on every commit: safe default for interactive use
+    "durable": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16000,        # KiB (negative = size, not pages)
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+    },
+    # WAL + fsync only at checkpoints: bulk loads and batch jobs
+    "fast": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+    # Large cache and mmap for long scans, refuses writes
+    "readonly-report": {
+        "busy_timeout": 10000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -256000,
+        "mmap_size": 1024 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "query_only": "ON",
+    },
+}
+PROFILE = os.environ.get("EMS_DB_PROFILE", "durable")
+# Milliseconds to wait for another writer's lock; overrides the preset's busy_timeout
+BUSY_TIMEOUT = int(os.environ["EMS_BUSY_TIMEOUT"]) if os.environ.get("EMS_BUSY_TIMEOUT") else None
+
+# Where read-only actions (lists, finds, search, reports, export) run; see read_session():
+#   primary   the main engine, like everything else
+#   readonly  a second engine on the same file, opened with mode=ro and query_only
+#   snapshot  a copy of the database taken with the SQLite backup API and refreshed
+#             once it is older than SNAPSHOT_MAX_AGE seconds; readers never touch DB_PATH
+READ_ROUTES = ("primary", "readonly", "snapshot")
+READ_ROUTING = os.environ.get("EMS_READ_ROUTING", "primary")
+SNAPSHOT_PATH = os.environ.get("EMS_SNAPSHOT_PATH") or os.path.splitext(DB_PATH)[0] + ".snapshot.db"
+SNAPSHOT_MAX_AGE = float(os.environ.get("EMS_SNAPSHOT_MAX_AGE", 60))
+
+def _pragma_listener(profile=None, readonly=False):
+    """Build a 'connect' listener applying a preset (None = the current PROFILE)."""
+    def apply(dbapi_conn, conn_record):
+        cur = dbapi_conn.cursor()
+        for pragma, value in PROFILES[profile or PROFILE].items():
+            # Setting journal_mode takes a lock even when unchanged; skip it if already set.
+            # A mode=ro connection cannot change it at all.
+            if pragma == "journal_mode":
+                if readonly:
+                    continue
+                # execute() then fetchone(): aiosqlite's adapted cursor does not return itself
+                cur.execute("PRAGMA journal_mode")
+                if cur.fetchone()[0].upper() == value:
+                    continue
+            cur.execute(f"PRAGMA {pragma}={value}")
+        # An override applies after setup, which keeps the preset's wait
+        if BUSY_TIMEOUT is not None:
+            cur.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT}")
+        cur.close()
+    return apply
+
+def make_engine(path=DB_PATH, profile=None, readonly=False, **engine_options):
+    """Create a SQLite engine for `path` with a tuning preset applied on connect.
+
+    readonly opens the file with mode=ro, so SQLite refuses writes at the file level.
+    Extra keyword arguments (pool_size, max_overflow, ...) go to create_engine.
+    The driver opens write transactions with BEGIN IMMEDIATE: the write lock is
+    taken (or waited for) before the first change, not halfway through a flush.
+    Statements are timed and counted by models.metrics.
+    """
+    _driver_options(profile, engine_options)
+    url = f"sqlite:///file:{path}?mode=ro&uri=true" if readonly else f"sqlite:///{path}"
+    eng = create_engine(url, echo=False, future=True, **engine_options)
+    event.listen(eng, "connect", _pragma_listener(profile, readonly))
+    instrument(eng)
+    return eng
+
+def _driver_options(profile, engine_options):
+    if profile is not None and profile not in PROFILES:
+        raise ValueError(f"Unknown DB profile '{profile}' (expected one of: {', '.join(PROFILES)})")
+    connect_args = engine_options.setdefault("connect_args", {})
+    connect_args.setdefault("isolation_level", "IMMEDIATE")
+    connect_args.setdefault("factory", CountingConnection)  # rows fetched, see metrics.py
+
+def make_async_engine(path=DB_PATH, profile=None, **engine_options):
+    """make_engine for asyncio code: an AsyncEngine over sqlite+aiosqlite.
 
-engine = create_engine(f"sqlite:///{DB_PATH}", echo=False, future=True)
+    Presets, BEGIN IMMEDIATE and metrics are the same (they are set on the wrapped
+    sync engine). Needs the aiosqlite package, which is only imported here.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+    _driver_options(profile, engine_options)
+    eng = create_async_engine(f"sqlite+aiosqlite:///{path}", **engine_options)
+    event.listen(eng.sync_engine, "connect", _pragma_listener(profile))
+    instrument(eng.sync_engine)
+    return eng
+
+def set_profile(name):
+    """Switch the main engine to another preset; pooled connections are reopened."""
+    global PROFILE
+    if name not in PROFILES:
+        raise ValueError(f"Unknown DB profile '{name}' (expected one of: {', '.join(PROFILES)})")
+    PROFILE = name
+    engine.dispose()
+
+def set_busy_timeout(ms):
+    """Override the preset's busy_timeout (milliseconds) for new connections."""
+    global BUSY_TIMEOUT
+    if ms < 0:
+        raise ValueError("busy timeout must be >= 0 ms")
+    BUSY_TIMEOUT = ms
+    engine.dispose()
+
+def set_read_routing(mode=None, max_age=None):
+    """Switch where read_session() sends read-only actions (see READ_ROUTES); None keeps the current value."""
+    global READ_ROUTING, SNAPSHOT_MAX_AGE
+    mode = mode or READ_ROUTING
+    if mode not in READ_ROUTES:
+        raise ValueError(f"Unknown read routing '{mode}' (expected one of: {', '.join(READ_ROUTES)})")
+    if max_age is not None:
+        if max_age < 0:
+            raise ValueError("snapshot max age must be >= 0 seconds")
+        SNAPSHOT_MAX_AGE = max_age
+    READ_ROUTING = mode
+    _dispose_read_engine()
+
+if PROFILE not in PROFILES:
+    raise ValueError(f"Unknown EMS_DB_PROFILE '{PROFILE}' (expected one of: {', '.join(PROFILES)})")
+if READ_ROUTING not in READ_ROUTES:
+    raise ValueError(f"Unknown EMS_READ_ROUTING '{READ_ROUTING}' (expected one of: {', '.join(READ_ROUTES)})")
+
+engine = make_engine()
 Session = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+
+# ---------- Read routing ----------
+_read_engine = None
+_snapshot_lock = threading.Lock()
+
+def _dispose_read_engine():
+    global _read_engine
+    if _read_engine is not None:
+        _read_engine.dispose()
+        _read_engine = None
+
+def refresh_snapshot(path=None):
+    """Copy the main database to `path` (default SNAPSHOT_PATH) with the backup API.
+
+    The copy is made in one step from a single read transaction, so it is consistent
+    without blocking writers (WAL), and then swapped in with an atomic rename.
+    Returns the seconds taken.
+    """
+    import sqlite3
+    path = path or SNAPSHOT_PATH
+    start = time.perf_counter()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    dst = sqlite3.connect(tmp)
+    try:
+        with engine.connect() as conn:
+            conn.connection.driver_connection.backup(dst)
+        # A rollback-journal copy has no -wal/-shm files to go stale on the next swap
+        dst.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        dst.close()
+    os.replace(tmp, path)
+    if path == SNAPSHOT_PATH:
+        # Pooled connections still read the replaced file; reopen them
+        _dispose_read_engine()
+    return time.perf_counter() - start
+
+def snapshot_age(path=None):
+    """Seconds since the snapshot was taken, or None if there is none."""
+    try:
+        return time.time() - os.path.getmtime(path or SNAPSHOT_PATH)
+    except OSError:
+        return None
+
+def _read_bind():
+    global _read_engine
+    if READ_ROUTING == "snapshot":
+        with _snapshot_lock:
+            age = snapshot_age()
+            if age is None or age > SNAPSHOT_MAX_AGE:
+                refresh_snapshot()
+    if _read_engine is None:
+        path = SNAPSHOT_PATH if READ_ROUTING == "snapshot" else DB_PATH
+        _read_engine = make_engine(path, "readonly-report", readonly=True)
+    return _read_engine
+
+def read_session():
+    """Session for actions that only read, bound according to READ_ROUTING.
+
+    Writes keep going through Session() and the main engine. Snapshot sessions are
+    marked in session.info so the lookup caches do not keep their possibly stale rows.
+    """
+    if READ_ROUTING == "primary":
+        return Session()
+    return Session(bind=_read_bind(), info={"snapshot": READ_ROUTING == "snapshot"})
+
+# ---------- Async ----------
+_async_engine = None
+_async_sessions = None
+
+def get_async_engine():
+    """The AsyncEngine on DB_PATH, created on first use (so aiosqlite stays optional)."""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = make_async_engine()
+    return _async_engine
+
+def async_session(**kwargs):
+    """AsyncSession on the main database, for the a* model helpers (see models/aio.py).
+
+    Like Session(), but objects are not expired on commit: an async caller cannot
+    reload attributes lazily. The sync session inside uses Session's class, so the
+    reference-cache invalidation listeners apply to it too.
+    """
+    global _async_sessions
+    if _async_sessions is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+        _async_sessions = async_sessionmaker(get_async_engine(), sync_session_class=Session.class_,
+                                             autoflush=False, expire_on_commit=False)
+    return _async_sessions(**kwargs)
+
+async def dispose_async_engine():
+    """Close the async engine's connections; await it before the event loop shuts down."""
+    global _async_engine, _async_sessions
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = _async_sessions = None
+
 Base = declarative_base()
 
+# Registers the change-log listeners on Base (see models/changes.py)
+from . import changes  # noqa: E402,F401
+
+# Bump whenever tables, indexes or the search triggers change; init_db() stores it
+# in PRAGMA user_version and skips the schema checks when the file already matches.
+SCHEMA_VERSION = 2
+
+def schema_version(bind=None):
+    with (bind or engine).connect() as conn:
+        return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
 def init_db():
-    """Import models and create tables."""
+    """Import models, then create tables, indexes, search tables and change-log triggers missing from company.db.
+
+    The DDL checks are skipped when the stored schema version is current.
+    """
     # Import models so metadata knows about them
     from .department import Department  # noqa: F401
     from .employee import Employee      # noqa: F401
     from .project import Project, employee_project  # noqa: F401
+    if schema_version() == SCHEMA_VERSION:
+        return
+    from .search import install_search
+    from .changes import install_changes
     Base.metadata.create_all(bind=engine)
+    # create_all skips indexes on tables that already exist
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    install_search(engine)
+    install_changes(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
@@ -0,0 +1,51 @@
+# lib/models/aio.py
+"""Awaitable CRUD helpers for asyncio code.
+
+    async with async_session() as s:
+        dept = await Department.afind_by_name(s, "Engineering")
+        emp = await Employee.acreate(s, first_name="Ada", last_name="Obi", email="ada@corp.example",
+                                     salary=90000, department_id=dept.id)
+        await emp.aupdate(s, salary=95000)
+
+Each a* method runs the sync helper of the same name on the AsyncSession's inner
+session (AsyncSession.run_sync). Validation, the reference caches and the change log
+therefore behave exactly as in the sync API. The statements run on aiosqlite's
+thread, so the event loop keeps serving other tasks while SQLite works.
+The write helpers retry lock errors with aretry_on_lock, which sleeps with
+asyncio.sleep. They call the unwrapped sync helper, so that helper's own blocking
+retry is not used.
+
+Relationships are not lazy-loaded in async code (there is no greenlet to await in).
+Reach them inside session.run_sync() or load them eagerly.
+"""
+from .unit_of_work import aretry_on_lock
+
+
+class AsyncCRUD:
+    """Mixin adding aget_all, afind_by_id, afind_by_name, acreate, aupdate and adelete."""
+
+    @classmethod
+    async def aget_all(cls, session):
+        return await session.run_sync(lambda s: cls.get_all(s))
+
+    @classmethod
+    async def afind_by_id(cls, session, id_):
+        return await session.run_sync(lambda s: cls.find_by_id(s, id_))
+
+    @classmethod
+    async def afind_by_name(cls, session, name):
+        return await session.run_sync(lambda s: cls.find_by_name(s, name))
+
+    @classmethod
+    @aretry_on_lock
+    async def acreate(cls, session, **attrs):
+        return await session.run_sync(lambda s: cls.create.__wrapped__(cls, s, **attrs))
+
+    @aretry_on_lock
+    async def aupdate(self, session, **attrs):
+        return await session.run_sync(lambda s: type(self).update.__wrapped__(self, s, **attrs))
+
+    @aretry_on_lock
+    async def adelete(self, session, **kwargs):
+        # kwargs: Department.delete's reassign_to
+        return await session.run_sync(lambda s: type(self).delete.__wrapped__(self, s, **kwargs))
@@ -0,0 +1,325 @@
+# lib/models/analytics.py
+"""EmployeeSnapshot: employees and their project assignments as packed columns.
+
+An Employee object carries SQLAlchemy instance state and costs kilobytes; here an
+employee is a few slots in array.array columns, in id order:
+
+    ids, salary, department_id      one entry per employee
+    project_ptr, project_ids        CSR adjacency: the projects of row r are
+                                    project_ids[project_ptr[r]:project_ptr[r + 1]]
+
+Queries work on row positions (array of ints) and run on sorted indexes built on
+first use: employees ordered by salary, by (department, salary), and the reverse
+project -> employees adjacency. Department aggregates, salary bands, percentiles,
+top earners and project headcounts then take a slice or a few bisects instead of
+a pass over every row.
+
+refresh() applies the change log (models/changes.py) since the snapshot was
+taken: new employees are appended past max(id), updates are written in place,
+deletes and assignment changes rebuild the affected columns in one pass.
+
+    snap = EmployeeSnapshot.load(session)
+    snap.department_stats()
+    snap.top_earners(10, department_id=3)
+    snap.refresh(session)
+"""
+import heapq
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import accumulate, chain, compress, groupby, repeat
+
+from sqlalchemy import select
+
+from .changes import MAX_LIMIT, changes_since, last_seq
+from .employee import Employee
+from .project import employee_project
+
+COLUMNS = ("ids", "salary", "department_id")
+
+
+class EmployeeSnapshot:
+    """Employees (id, salary, department) and their projects, loaded once into arrays."""
+
+    def __init__(self):
+        self.ids = array("q")
+        self.salary = array("d")
+        self.department_id = array("q")
+        self.project_ptr = array("q", [0])
+        self.project_ids = array("q")
+        self.seq = 0  # change-log position the snapshot reflects
+        self._index = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __repr__(self):
+        return (f"<EmployeeSnapshot {len(self)} employees, {len(self.project_ids)} assignments, "
+                f"seq {self.seq}, {self.nbytes / 1e6:.1f} MB>")
+
+    @property
+    def nbytes(self):
+        """Bytes held by the column arrays and, once built, the index arrays."""
+        arrays = [self.ids, self.salary, self.department_id, self.project_ptr, self.project_ids]
+        if self._index is not None:
+            arrays += [v for v in vars(self._index).values() if isinstance(v, array)]
+        return sum(a.itemsize * len(a) for a in arrays)
+
+    # ---------- Loading ----------
+    @classmethod
+    def load(cls, session, chunk_size=50_000):
+        """Read every employee and assignment, streamed in chunks."""
+        snap = cls()
+        # Taken first: changes committed while loading are replayed (harmlessly) by refresh()
+        snap.seq = last_seq(session)
+        conn = session.connection().execution_options(stream_results=True, yield_per=chunk_size)
+        stmt = select(Employee.id, Employee.salary, Employee.department_id).order_by(Employee.id)
+        for part in conn.execute(stmt).partitions():
+            ids, salary, dept = zip(*part)
+            snap.ids.extend(ids)
+            snap.salary.extend(salary)
+            snap.department_id.extend(dept)
+        n = len(snap.ids)
+        counts = array("q", [0]) * n
+        stmt = (select(employee_project.c.employee_id, employee_project.c.project_id)
+                .order_by(employee_project.c.employee_id, employee_project.c.project_id))
+        pos = 0
+        for part in conn.execute(stmt).partitions():
+            for emp, project in part:
+                while pos < n and snap.ids[pos] < emp:
+                    pos += 1
+                # Assignments of employees that no longer exist are left out
+                if pos < n and snap.ids[pos] == emp:
+                    counts[pos] += 1
+                    snap.project_ids.append(project)
+        snap.project_ptr = array("q", accumulate(counts, initial=0))
+        return snap
+
+    def refresh(self, session):
+        """Apply the change log since the last load/refresh; returns the number of changes applied."""
+        changes = []
+        while True:
+            page = changes_since(session, self.seq, MAX_LIMIT, tables=("employees", "employee_project"))
+            if not page:
+                break
+            changes += page
+            self.seq = page[-1]["seq"]
+        if not changes:
+            return 0
+        employees = {}  # id -> merged column values, None once deleted
+        assigned = {}  # (employee id, project id) -> last state
+        for c in changes:
+            if c["table"] == "employee_project":
+                assigned[c["data"]["employee_id"], c["data"]["project_id"]] = c["op"] == "insert"
+            elif c["op"] == "delete":
+                employees[c["row_id"]] = None
+            else:
+                employees[c["row_id"]] = {**(employees.get(c["row_id"]) or {}), **c["data"]}
+        dropped = set()
+        for emp, values in sorted(employees.items()):
+            pos = self.position(emp)
+            if values is None:
+                if pos is not None:
+                    dropped.add(pos)
+            elif pos is not None:
+                if "salary" in values:
+                    self.salary[pos] = values["salary"]
+                if "department_id" in values:
+                    self.department_id[pos] = values["department_id"]
+            elif "salary" not in values:
+                continue  # an update to a row inserted and deleted before this refresh
+            elif not self.ids or emp > self.ids[-1]:
+                self.ids.append(emp)
+                self.salary.append(values["salary"])
+                self.department_id.append(values["department_id"])
+                self.project_ptr.append(self.project_ptr[-1])
+            else:
+                # An explicit id below max(id): cheaper to read everything again than to shift every column
+                fresh = type(self).load(session)
+                self.__dict__.update(fresh.__dict__)
+                return len(changes)
+        edits = defaultdict(lambda: (set(), set()))  # row -> (projects added, projects removed)
+        for (emp, project), now in assigned.items():
+            pos = self.position(emp)
+            if pos is not None:
+                edits[pos][0 if now else 1].add(project)
+        if edits or dropped:
+            self._rebuild(edits, dropped)
+        self._index = None
+        return len(changes)
+
+    def _rebuild(self, edits, dropped):
+        """Rewrite the adjacency with `edits` applied and drop the `dropped` rows, copying untouched runs whole."""
+        ptr, idx = self.project_ptr, self.project_ids
+        new_ptr, new_idx = array("q", [0]), array("q")
+        start = 0
+        for pos in sorted(set(edits) | dropped):
+            shift = len(new_idx) - ptr[start]
+            new_idx.extend(idx[ptr[start]:ptr[pos]])
+            new_ptr.extend(map(shift.__add__, ptr[start + 1:pos + 1]))
+            if pos not in dropped:
+                added, removed = edits[pos]
+                new_idx.extend(sorted(set(idx[ptr[pos]:ptr[pos + 1]]) - removed | added))
+                new_ptr.append(len(new_idx))
+            start = pos + 1
+        shift = len(new_idx) - ptr[start]
+        new_idx.extend(idx[ptr[start]:])
+        new_ptr.extend(map(shift.__add__, ptr[start + 1:]))
+        self.project_ptr, self.project_ids = new_ptr, new_idx
+        if dropped:
+            keep = bytearray(b"\1") * len(self.ids)
+            for pos in dropped:
+                keep[pos] = 0
+            for name in COLUMNS:
+                col = getattr(self, name)
+                setattr(self, name, array(col.typecode, compress(col, keep)))
+
+    # ---------- Indexes ----------
+    def _indexes(self):
+        if self._index is None:
+            self._index = _Index(self)
+        return self._index
+
+    def position(self, employee_id):
+        """Row of an employee id, or None."""
+        pos = bisect_left(self.ids, employee_id)
+        return pos if pos < len(self.ids) and self.ids[pos] == employee_id else None
+
+    def _salary_slice(self, department_id=None):
+        # Salaries in ascending order with their rows: all employees or one department
+        ix = self._indexes()
+        if department_id is None:
+            return ix.by_salary, ix.salary_sorted, 0, len(ix.by_salary)
+        start, end = ix.departments.get(department_id, (0, 0))
+        return ix.by_department, ix.department_salary, start, end
+
+    # ---------- Filter / group / sort ----------
+    def filter(self, department_id=None, min_salary=None, max_salary=None, project_id=None):
+        """Rows matching every given condition (min inclusive, max exclusive), in id order."""
+        rows, salaries, start, end = self._salary_slice(department_id)
+        if min_salary is not None:
+            start = bisect_left(salaries, min_salary, start, end)
+        if max_salary is not None:
+            end = bisect_left(salaries, max_salary, start, end)
+        selected = rows[start:end]
+        if project_id is not None:
+            ix = self._indexes()
+            a, b = ix.projects.get(project_id, (0, 0))
+            members = set(ix.project_rows[a:b])
+            selected = [r for r in selected if r in members]
+        return array("i", sorted(selected))
+
+    def group(self, rows=None, by="department_id"):
+        """{key: (count, total salary, min, max)} over `rows` (default all), grouped by a column."""
+        keys, salary = getattr(self, by), self.salary
+        rows = range(len(self)) if rows is None else rows
+        out = {}
+        for r in rows:
+            k, s = keys[r], salary[r]
+            if k in out:
+                n, total, low, high = out[k]
+                out[k] = (n + 1, total + s, low if low < s else s, high if high > s else s)
+            else:
+                out[k] = (1, s, s, s)
+        return out
+
+    def sort(self, rows, by="salary", descending=False, limit=None):
+        """`rows` ordered by a column; with limit, only the first `limit`."""
+        col = getattr(self, by)
+        if limit is not None:
+            pick = heapq.nlargest if descending else heapq.nsmallest
+            return array("i", pick(limit, rows, key=col.__getitem__))
+        return array("i", sorted(rows, key=col.__getitem__, reverse=descending))
+
+    def take(self, column, rows):
+        """Values of a column for `rows`."""
+        return [getattr(self, column)[r] for r in rows]
+
+    # ---------- Analytics ----------
+    def department_stats(self):
+        """[(department id, headcount, total, average, min, max)] by department id."""
+        return [(d, n, total, total / n, low, high)
+                for d, (n, total, low, high) in sorted(self._indexes().department_totals.items())]
+
+    def salary_bands(self, edges, department_id=None):
+        """Employees per band: [(lo, hi, count)] with bands [-inf, e0), [e0, e1), ..., [eN, inf)."""
+        _, salaries, start, end = self._salary_slice(department_id)
+        cuts = [start, *(bisect_left(salaries, e, start, end) for e in edges), end]
+        bounds = [float("-inf"), *edges, float("inf")]
+        return [(bounds[i], bounds[i + 1], cuts[i + 1] - cuts[i]) for i in range(len(cuts) - 1)]
+
+    def percentile(self, p, department_id=None):
+        """Nearest-rank salary percentile (0 < p <= 1), or None for no employees."""
+        _, salaries, start, end = self._salary_slice(department_id)
+        n = end - start
+        if not n:
+            return None
+        exact = p * n
+        rank = int(exact) + (exact > int(exact))
+        return salaries[start + max(rank, 1) - 1]
+
+    def top_earners(self, n=10, department_id=None):
+        """[(employee id, salary)] of the n best paid, highest first (ties: higher id first)."""
+        rows, salaries, start, end = self._salary_slice(department_id)
+        first = max(start, end - n)
+        return [(self.ids[rows[i]], salaries[i]) for i in range(end - 1, first - 1, -1)]
+
+    def salary_rank(self, employee_id):
+        """Number of employees paid strictly less than this one, or None if unknown."""
+        pos = self.position(employee_id)
+        if pos is None:
+            return None
+        return bisect_left(self._indexes().salary_sorted, self.salary[pos])
+
+    def project_headcounts(self):
+        """{project id: employees assigned}."""
+        return {p: end - start for p, (start, end) in self._indexes().projects.items()}
+
+    def staffing_ratios(self, project_id):
+        """{department id: (assigned to the project, department headcount, ratio)}."""
+        ix = self._indexes()
+        start, end = ix.projects.get(project_id, (0, 0))
+        assigned = defaultdict(int)
+        for r in ix.project_rows[start:end]:
+            assigned[self.department_id[r]] += 1
+        totals = ix.department_totals
+        return {d: (n, totals[d][0], n / totals[d][0]) for d, n in sorted(assigned.items())}
+
+    def projects_of(self, employee_id):
+        """Project ids of one employee (sorted)."""
+        pos = self.position(employee_id)
+        return [] if pos is None else list(self.project_ids[self.project_ptr[pos]:self.project_ptr[pos + 1]])
+
+
+class _Index:
+    """Sorted views of an EmployeeSnapshot; rebuilt after every refresh that changed something."""
+
+    def __init__(self, snap):
+        salary, dept, n = snap.salary, snap.department_id, len(snap)
+        # Stable sorts: by salary, then by department keeps salary order within a department
+        by_salary = sorted(range(n), key=salary.__getitem__)
+        by_department = sorted(by_salary, key=dept.__getitem__)
+        self.by_salary = array("i", by_salary)
+        self.salary_sorted = array("d", map(salary.__getitem__, by_salary))
+        self.by_department = array("i", by_department)
+        self.department_salary = array("d", map(salary.__getitem__, by_department))
+        del by_salary, by_department
+        self.departments, self.department_totals = {}, {}
+        start = 0
+        for d, run in groupby(map(dept.__getitem__, self.by_department)):
+            end = start + sum(1 for _ in run)
+            part = self.department_salary[start:end]
+            self.departments[d] = (start, end)
+            self.department_totals[d] = (end - start, sum(part), part[0], part[-1])
+            start = end
+        # Reverse adjacency: rows of each project, grouped by project id
+        ptr, projects = snap.project_ptr, snap.project_ids
+        owner = array("i", chain.from_iterable(repeat(r, ptr[r + 1] - ptr[r]) for r in range(n)))
+        order = sorted(range(len(projects)), key=projects.__getitem__)
+        self.project_rows = array("i", map(owner.__getitem__, order))
+        self.projects = {}
+        start = 0
+        for p, run in groupby(map(projects.__getitem__, order)):
+            end = start + sum(1 for _ in run)
+            self.projects[p] = (start, end)
+            start = end
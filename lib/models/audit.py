@@ -0,0 +1,262 @@
+# lib/models/audit.py
+"""Integrity audit of the rows already stored.
+
+The @validates hooks only run on attribute assignment, and SQLite does not enforce
+foreign keys here, so rows from legacy imports or raw SQL can break rules the models
+never see. Each rule below is one SQL predicate over a single table; a table is read
+in id ranges of `chunk_size` with one aggregate statement per range (a failing-row
+count per rule), and a few sample rows are fetched only for rules that failed:
+
+    department_name, department_location   not a non-empty string (Department validators)
+    project_name, project_budget           empty name; budget not a number > 0 (Project)
+    employee_name, employee_email,
+    employee_salary                        Employee's validators
+    employee_email_case                    email not stored trimmed and lower-cased
+    employee_department                    department_id with no department (anti-join)
+    assignment_employee, assignment_project
+                                           employee_project rows pointing nowhere (anti-join)
+    employee_duplicate_email               same email as another employee ignoring case and
+                                           surrounding space (only unnormalized rows can clash)
+
+With workers > 1 the ranges are scanned in worker processes (models/parallel.py).
+fix() repairs the rules in FIXABLE with set-based statements, written to the
+change log; the others need a person to decide on the right value. Duplicate
+emails are among them: which of two people keeps the address is not a call to
+make by deleting the other.
+"""
+import time
+
+from sqlalchemy import and_, case, delete, exists, func, or_, select, update
+
+from . import parallel
+from .changes import log_rows
+from .department import Department
+from .employee import Employee
+from .project import Project, employee_project
+from .unit_of_work import begin_write
+
+# Rows per range; one aggregate statement each
+CHUNK_SIZE = 200_000
+# Failing rows listed per rule
+SAMPLE = 10
+
+_d, _e, _p, _ep = Department.__table__, Employee.__table__, Project.__table__, employee_project
+# Scan order, and the column a table's ranges are taken over
+TABLE_KEYS = {"departments": _d.c.id, "projects": _p.c.id, "employees": _e.c.id,
+              "employee_project": _ep.c.employee_id}
+
+
+def _not_text(col):
+    """What the name/location validators reject: missing, not a string, or blank."""
+    return or_(col.is_(None), func.typeof(col) != "text", func.trim(col) == "")
+
+
+def _not_positive(col):
+    # REAL affinity stores numeric text as a number, so text left over is not a number
+    return or_(col.is_(None), func.typeof(col).not_in(("integer", "real")), col <= 0)
+
+
+# rule -> (table, predicate true for a failing row)
+RULES = {
+    "department_name": (_d, _not_text(_d.c.name)),
+    "department_location": (_d, _not_text(_d.c.location)),
+    "project_name": (_p, _not_text(_p.c.name)),
+    "project_budget": (_p, _not_positive(_p.c.budget)),
+    "employee_name": (_e, or_(_not_text(_e.c.first_name), _not_text(_e.c.last_name))),
+    "employee_email": (_e, or_(_e.c.email.is_(None), func.typeof(_e.c.email) != "text",
+                               func.instr(_e.c.email, "@") == 0, func.instr(_e.c.email, ".") == 0)),
+    "employee_email_case": (_e, _e.c.email != func.lower(func.trim(_e.c.email))),
+    "employee_salary": (_e, _not_positive(_e.c.salary)),
+    "employee_department": (_e, ~exists().where(_d.c.id == _e.c.department_id)),
+    "assignment_employee": (_ep, ~exists().where(_e.c.id == _ep.c.employee_id)),
+    "assignment_project": (_ep, ~exists().where(_p.c.id == _ep.c.project_id)),
+}
+DUPLICATE_EMAIL = "employee_duplicate_email"
+ALL_RULES = (*RULES, DUPLICATE_EMAIL)
+# Duplicate emails are report-only; see fix()
+FIXABLE = ("employee_email_case", "employee_department", "assignment_employee", "assignment_project")
+
+
+def duplicate_emails():
+    """Select of the ids of employees whose email clashes with another's ignoring case and space.
+
+    Emails stored through the model are already trimmed and lower-cased and unique, so
+    only rows that are not can clash: with a normalized row (an index lookup on the
+    unique email), or with each other (numbered within the few such rows). The
+    normalized row, or else the lowest id, is the one kept.
+    """
+    norm = func.lower(func.trim(_e.c.email))
+    odd = (
+        select(_e.c.id, norm.label("norm"),
+               func.row_number().over(partition_by=norm, order_by=_e.c.id).label("n"))
+        .where(_e.c.email != norm)
+        .subquery()
+    )
+    other = _e.alias()
+    return select(odd.c.id).where(or_(odd.c.n > 1, exists().where(other.c.email == odd.c.norm)))
+
+
+class AuditReport:
+    """Failing-row counts and samples per rule, rows scanned per table, timing and progress."""
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.scanned = {}  # table name -> rows
+        self.found = {rule: 0 for rule in rules}
+        self.samples = {rule: [] for rule in rules}  # ids; (employee_id, project_id) for assignments
+        self.chunks = 0
+        self.chunks_done = 0
+        self.elapsed = 0.0
+
+    @property
+    def rows(self):
+        return sum(self.scanned.values())
+
+    @property
+    def problems(self):
+        return sum(self.found.values())
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def table_of(self, rule):
+        return _e.name if rule == DUPLICATE_EMAIL else RULES[rule][0].name
+
+    def _add(self, table, scanned, found, samples, limit):
+        self.scanned[table] = self.scanned.get(table, 0) + scanned
+        for rule, n in found.items():
+            self.found[rule] += n
+            self.samples[rule].extend(samples.get(rule, ())[:limit - len(self.samples[rule])])
+        self.chunks_done += 1
+
+    def __repr__(self):
+        return (f"<AuditReport {len(self.scanned)} tables, {self.rows} rows, {self.problems} problems, "
+                f"{self.rows_per_sec:.0f} rows/sec>")
+
+
+def _ranges(session, column, size):
+    """Half-open key ranges of about `size` rows each, stepping along the key's index.
+
+    Counted in rows rather than ids, so gaps and stray huge ids (the very rows an
+    audit is looking for) do not turn into thousands of empty ranges.
+    """
+    lo, top = session.execute(select(func.min(column), func.max(column))).one()
+    ranges = []
+    while lo is not None:
+        hi = session.execute(select(column).where(column >= lo).order_by(column).offset(size).limit(1)).scalar()
+        hi = top + 1 if hi is None else max(hi, lo + 1)
+        ranges.append((lo, hi))
+        lo = hi if hi <= top else None
+    return ranges
+
+
+def _refs(table):
+    return (table.c.employee_id, table.c.project_id) if table is _ep else (table.c.id,)
+
+
+def _scan(conn, table_name, rules, lo, hi, sample):
+    """Rows in [lo, hi) of one table, failing-row counts per rule and up to `sample` of them."""
+    table = RULES[rules[0]][0]
+    key = TABLE_KEYS[table_name]
+    in_range = and_(key >= lo, key < hi)
+    counts = conn.execute(
+        select(func.count(), *[func.sum(case((RULES[r][1], 1), else_=0)) for r in rules])
+        .select_from(table).where(in_range)
+    ).one()
+    found = {r: n or 0 for r, n in zip(rules, counts[1:])}
+    samples = {}
+    for rule, n in found.items():
+        if n and sample:
+            refs = _refs(table)
+            rows = conn.execute(select(*refs).where(in_range, RULES[rule][1]).order_by(*refs).limit(sample))
+            samples[rule] = [r[0] if len(r) == 1 else tuple(r) for r in rows]
+    return table_name, counts[0], found, samples
+
+
+def _scan_part(table_name, rules, lo, hi, sample):
+    with parallel._engine.connect() as conn:
+        return _scan(conn, table_name, rules, lo, hi, sample)
+
+
+def audit(session, rules=None, chunk_size=CHUNK_SIZE, workers=None, progress=None, sample=SAMPLE):
+    """Check every row against `rules` (default: all); returns an AuditReport.
+
+    progress(report) is called after each range with the counters so far.
+    Nothing is changed; see fix().
+    """
+    rules = list(ALL_RULES if rules is None else rules)
+    unknown = [r for r in rules if r not in ALL_RULES]
+    if unknown:
+        raise ValueError(f"unknown audit rule(s): {', '.join(unknown)} (expected {', '.join(ALL_RULES)})")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    report = AuditReport(rules)
+    start = time.perf_counter()
+
+    def done(part):
+        report._add(*part, limit=sample)
+        report.elapsed = time.perf_counter() - start
+        if progress:
+            progress(report)
+
+    shards = []
+    for table_name, key in TABLE_KEYS.items():
+        table_rules = [r for r in rules if r in RULES and RULES[r][0].name == table_name]
+        if table_rules:
+            shards += [(table_name, table_rules, lo, hi, sample) for lo, hi in _ranges(session, key, chunk_size)]
+    report.chunks = len(shards) + (DUPLICATE_EMAIL in rules)
+    if parallel._workers(workers) == 1:
+        conn = session.connection()
+        for shard in shards:
+            done(_scan(conn, *shard))
+    else:
+        parallel.run_sharded(session, _scan_part, shards, workers, on_result=lambda i, part: done(part))
+
+    if DUPLICATE_EMAIL in rules:
+        dups = duplicate_emails().subquery()
+        n = session.execute(select(func.count()).select_from(dups)).scalar()
+        ids = session.execute(select(dups.c.id).order_by(dups.c.id).limit(sample)).scalars().all() if n else []
+        done((_e.name, 0, {DUPLICATE_EMAIL: n}, {DUPLICATE_EMAIL: ids}))
+    return report
+
+
+def fix(session, rules, reassign_to=None):
+    """Repair the rows failing `rules` (a subset of FIXABLE) in one transaction; returns rows per rule.
+
+        employee_email_case        store the email trimmed and lower-cased (rows that would clash
+                                   are left alone; see employee_duplicate_email)
+        employee_department        move orphaned employees to `reassign_to` (a Department)
+        assignment_employee/_project   delete the dangling employee_project rows
+
+    Every change goes to the change log, as with the model helpers.
+    """
+    rules = set(rules)
+    unfixable = sorted(rules.difference(FIXABLE))
+    if unfixable:
+        raise ValueError(f"no automatic fix for: {', '.join(unfixable)} (fixable: {', '.join(FIXABLE)})")
+    if "employee_department" in rules and reassign_to is None:
+        raise ValueError("employee_department needs a department to move orphaned employees to")
+    fixed = {}
+    begin_write(session)
+    try:
+        for rule in FIXABLE:
+            if rule not in rules:
+                continue
+            table, where = RULES[rule]
+            if rule == "employee_email_case":
+                # normalizing a clashing email would break the unique index
+                where = and_(where, _e.c.id.not_in(duplicate_emails()))
+                norm = func.lower(func.trim(_e.c.email))
+                log_rows(session, _e, "update", where, {"email": norm})
+                fixed[rule] = session.execute(update(_e).where(where).values(email=norm)).rowcount
+            elif rule == "employee_department":
+                log_rows(session, _e, "update", where, {"department_id": reassign_to.id})
+                fixed[rule] = session.execute(update(_e).where(where).values(department_id=reassign_to.id)).rowcount
+            else:
+                fixed[rule] = session.execute(delete(table).where(where)).rowcount
+        session.commit()
+    except BaseException:
+        session.rollback()
+        raise
+    return fixed
@@ -0,0 +1,360 @@
+# lib/models/bulk.py
+import csv
+import json
+import os
+import struct
+import sys
+import time
+from array import array
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from .changes import log_rows
+from .department import Department
+from .employee import Employee
+from .project import Project, employee_project
+from .unit_of_work import begin_write
+
+# Expected columns (CSV headers / JSON keys) per kind:
+#   departments: name, location
+#   employees:   first_name, last_name, email, salary, department (name) or department_id
+#   projects:    name, budget
+#   assignments: employee (email) or employee_id, project (name) or project_id
+KINDS = ("departments", "employees", "projects", "assignments")
+
+
+class ImportReport:
+    """Outcome of a bulk_import run: inserted count, per-row errors and timing."""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.inserted = 0
+        self.errors = []  # (line number, message)
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_sec(self):
+        return self.inserted / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return (f"<ImportReport {self.kind}: {self.inserted} inserted, "
+                f"{len(self.errors)} errors, {self.rows_per_sec:.0f} rows/sec>")
+
+
+def read_rows(path):
+    """Yield (line number, row dict) from a .csv or .jsonl file without loading it whole.
+
+    Lines that fail to parse, or JSON lines that are not objects, are yielded as
+    (line number, ValueError).
+    """
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, newline="", encoding="utf-8") as f:
+        if ext in (".jsonl", ".ndjson", ".json"):
+            for n, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield n, ValueError(f"invalid JSON: {e}")
+                    continue
+                if isinstance(row, dict):
+                    yield n, row
+                else:
+                    yield n, ValueError("expected a JSON object")
+        else:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+
+
+def _validate(cls, row, fields):
+    """Run the model's @validates rules over plain values, no ORM instance needed."""
+    validators = cls.__mapper__.validators
+    out = {}
+    for key in fields:
+        value = row.get(key)
+        if key in validators:
+            fn, _ = validators[key]
+            value = fn(None, key, value)
+        out[key] = value
+    return out
+
+
+def _lookup(mapping, row, name_key, id_key, label):
+    """Resolve a reference given by name (via mapping) or by explicit id."""
+    name = row.get(name_key)
+    if name not in (None, ""):
+        key = str(name).strip()
+        if key in mapping:
+            return mapping[key]
+        raise ValueError(f"unknown {label} '{key}'")
+    raw = row.get(id_key)
+    if raw not in (None, "") and str(raw).isdigit() and int(raw) in mapping.ids:
+        return int(raw)
+    raise ValueError(f"{label} must reference an existing {label}")
+
+
+class _RefMap(dict):
+    """name -> id map that also remembers the set of valid ids."""
+
+    def __init__(self, pairs):
+        super().__init__()
+        self.ids = set()
+        for name, id_ in pairs:
+            self[name] = id_
+            self.ids.add(id_)
+
+
+def _row_builder(session, kind):
+    """Return (table, fn(row) -> insert params) for an import kind."""
+    if kind == "departments":
+        return Department.__table__, lambda row: _validate(Department, row, ("name", "location"))
+
+    if kind == "projects":
+        return Project.__table__, lambda row: _validate(Project, row, ("name", "budget"))
+
+    if kind == "employees":
+        depts = _RefMap(session.execute(select(Department.name, Department.id)))
+
+        def build(row):
+            params = _validate(Employee, row, ("first_name", "last_name", "email", "salary"))
+            params["department_id"] = _lookup(depts, row, "department", "department_id", "department")
+            return params
+        return Employee.__table__, build
+
+    if kind == "assignments":
+        emps = _RefMap(session.execute(select(Employee.email, Employee.id)))
+        projs = _RefMap(session.execute(select(Project.name, Project.id)))
+
+        def build(row):
+            # emails are stored lower-cased by Employee.validate_email
+            email = row.get("employee")
+            if email:
+                row = dict(row, employee=str(email).lower())
+            return {
+                "employee_id": _lookup(emps, row, "employee", "employee_id", "employee"),
+                "project_id": _lookup(projs, row, "project", "project_id", "project"),
+            }
+        return employee_project, build
+
+    raise ValueError(f"Unknown import kind '{kind}' (expected one of: {', '.join(KINDS)})")
+
+
+def _flush_chunk(session, table, chunk, report):
+    """executemany one chunk; on a constraint error, retry row by row to pinpoint the bad ones."""
+    params = [p for _, p in chunk]
+    try:
+        with session.begin_nested():
+            session.execute(insert(table), params)
+        report.inserted += len(params)
+        return
+    except IntegrityError:
+        pass
+    for line_no, p in chunk:
+        try:
+            with session.begin_nested():
+                session.execute(insert(table), p)
+            report.inserted += 1
+        except IntegrityError as e:
+            report.errors.append((line_no, str(e.orig)))
+
+
+def bulk_import(session, kind, path, chunk_size=1000):
+    """Stream rows from a CSV/JSONL file into one table inside a single transaction.
+
+    Rows failing validation or constraints are skipped and listed in the report;
+    everything else is committed once at the end. The write lock is held throughout.
+    """
+    start = time.perf_counter()
+    report = ImportReport(kind)
+    table, build = _row_builder(session, kind)
+    chunk = []
+    try:
+        begin_write(session)
+        # Core inserts fire no ORM events: model rows above this id are logged at the end
+        # (assignments are logged by triggers)
+        last_id = None
+        if table is not employee_project:
+            last_id = session.execute(select(func.max(table.c.id))).scalar() or 0
+        for line_no, row in read_rows(path):
+            if isinstance(row, Exception):
+                report.errors.append((line_no, str(row)))
+                continue
+            try:
+                chunk.append((line_no, build(row)))
+            except (ValueError, TypeError) as e:
+                # TypeError: a validator given a JSON number or list where it expects text
+                report.errors.append((line_no, str(e)))
+                continue
+            if len(chunk) >= chunk_size:
+                _flush_chunk(session, table, chunk, report)
+                chunk = []
+        if chunk:
+            _flush_chunk(session, table, chunk, report)
+        if last_id is not None:
+            log_rows(session, table, "insert", table.c.id > last_id)
+        session.commit()
+        report.errors.sort()
+    except Exception:
+        session.rollback()
+        raise
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+# ---------- Export ----------
+EXPORT_FORMATS = ("csv", "jsonl", "col")
+EXPORT_TABLES = (Department.__table__, Employee.__table__, Project.__table__, employee_project)
+
+# Columnar (.col) layout, all little-endian:
+#   magic b"EMSCOL1\0", u32 column count, per column: u16 name length, name, type code
+#   then row groups: u32 row count, per column either packed int64 ('q') / float64 ('d')
+#   values, or ('s') u32 offsets[n + 1] followed by the utf-8 blob; a 0 row count ends the file.
+COL_MAGIC = b"EMSCOL1\0"
+_COL_TYPES = {int: "q", float: "d", str: "s"}
+
+
+class ExportReport:
+    """Rows written per table plus timing for a bulk_export run."""
+
+    def __init__(self, fmt):
+        self.fmt = fmt
+        self.tables = {}  # table name -> (path, rows)
+        self.elapsed = 0.0
+
+    @property
+    def rows(self):
+        return sum(n for _, n in self.tables.values())
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return (f"<ExportReport {self.fmt}: {len(self.tables)} tables, {self.rows} rows, "
+                f"{self.rows_per_sec:.0f} rows/sec>")
+
+
+def _packed(typecode, values):
+    arr = array(typecode, values)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _col_codes(table):
+    return [_COL_TYPES[c.type.python_type] for c in table.columns]
+
+
+def _write_col_header(f, table):
+    codes = _col_codes(table)
+    f.write(COL_MAGIC)
+    f.write(struct.pack("<I", len(codes)))
+    for col, code in zip(table.columns, codes):
+        name = col.name.encode()
+        f.write(struct.pack("<H", len(name)) + name + code.encode())
+    return codes
+
+
+def _write_col_group(f, codes, rows):
+    f.write(struct.pack("<I", len(rows)))
+    for i, code in enumerate(codes):
+        values = [r[i] for r in rows]
+        if code != "s":
+            f.write(_packed(code, values))
+            continue
+        blobs = [v.encode() for v in values]
+        offsets = [0]
+        for b in blobs:
+            offsets.append(offsets[-1] + len(b))
+        f.write(_packed("I", offsets))
+        f.write(b"".join(blobs))
+
+
+def read_columnar(path):
+    """Yield each row group of a .col file as {column name: list of values}."""
+    with open(path, "rb") as f:
+        if f.read(len(COL_MAGIC)) != COL_MAGIC:
+            raise ValueError(f"{path} is not an EMS columnar file")
+        (ncols,) = struct.unpack("<I", f.read(4))
+        cols = []
+        for _ in range(ncols):
+            (n,) = struct.unpack("<H", f.read(2))
+            cols.append((f.read(n).decode(), f.read(1).decode()))
+        while True:
+            (nrows,) = struct.unpack("<I", f.read(4))
+            if not nrows:
+                return
+            group = {}
+            for name, code in cols:
+                if code == "s":
+                    offsets = array("I")
+                    offsets.frombytes(f.read(4 * (nrows + 1)))
+                    if sys.byteorder == "big":
+                        offsets.byteswap()
+                    blob = f.read(offsets[-1])
+                    group[name] = [blob[offsets[i]:offsets[i + 1]].decode() for i in range(nrows)]
+                else:
+                    arr = array(code)
+                    arr.frombytes(f.read(8 * nrows))
+                    if sys.byteorder == "big":
+                        arr.byteswap()
+                    group[name] = arr.tolist()
+            yield group
+
+
+def _export_table(conn, table, fmt, path, chunk_size, where=None, framed=True):
+    """Stream one table to disk a chunk at a time; returns the row count.
+
+    where limits the rows written (one shard, see models/parallel.py). framed=False
+    leaves out the csv header row and the col header and terminator, so the parts
+    of a table can be concatenated behind a single header.
+    """
+    stmt = select(table).order_by(*table.primary_key.columns)
+    if where is not None:
+        stmt = stmt.where(where)
+    result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(stmt)
+    keys = list(result.keys())
+    rows = 0
+    if fmt == "col":
+        with open(path, "wb") as f:
+            codes = _write_col_header(f, table) if framed else _col_codes(table)
+            for part in result.partitions():
+                _write_col_group(f, codes, part)
+                rows += len(part)
+            if framed:
+                f.write(struct.pack("<I", 0))
+        return rows
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            writer = csv.writer(f)
+            if framed:
+                writer.writerow(keys)
+            for part in result.partitions():
+                writer.writerows(part)
+                rows += len(part)
+        else:
+            for part in result.partitions():
+                f.write("".join(json.dumps(dict(zip(keys, r))) + "\n" for r in part))
+                rows += len(part)
+    return rows
+
+
+def bulk_export(session, fmt, out_dir, chunk_size=10000):
+    """Write every table to out_dir/<table>.<fmt> using Core selects streamed in chunks.
+
+    Memory is bounded by chunk_size regardless of table size.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}' (expected one of: {', '.join(EXPORT_FORMATS)})")
+    start = time.perf_counter()
+    report = ExportReport(fmt)
+    os.makedirs(out_dir, exist_ok=True)
+    conn = session.connection()
+    for table in EXPORT_TABLES:
+        path = os.path.join(out_dir, f"{table.name}.{fmt}")
+        report.tables[table.name] = (path, _export_table(conn, table, fmt, path, chunk_size))
+    report.elapsed = time.perf_counter() - start
+    return report
@@ -0,0 +1,119 @@
+# lib/models/cache.py
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from . import Session
+
+# Defaults for the small reference tables (departments, projects)
+MAX_ENTRIES = 1024
+TTL_SECONDS = 300
+
+_caches = []
+
+
+class RefCache:
+    """Process-wide LRU/TTL cache of detached rows keyed by ("id", id) and ("name", name).
+
+    Hits are merged into the caller's session with load=False, so they cost no SQL.
+    """
+
+    def __init__(self, name, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (expires_at, detached copy)
+        self._keys_by_id = {}          # id -> keys pointing at that row
+        self._lock = threading.Lock()
+        _caches.append(self)
+
+    def __len__(self):
+        return len(self._keys_by_id)
+
+    def lookup(self, session, key, loader):
+        """Return the cached row for key in `session`, or load it with loader() and cache it."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                cached = entry[1]
+            else:
+                self.misses += 1
+                cached = None
+        if cached is not None:
+            # Prefer the session's own copy so pending changes there are not overwritten
+            existing = session.identity_map.get(inspect(cached).key)
+            return existing if existing is not None else session.merge(cached, load=False)
+        obj = loader()
+        # Rows read from a snapshot may already be stale; don't hand them to other sessions
+        if obj is not None and not session.info.get("snapshot"):
+            self._put(key, obj)
+        return obj
+
+    def _put(self, key, obj):
+        mapper = inspect(obj).mapper
+        # Not through __init__: the @validates hooks would reject rows stored before a rule existed
+        copy = mapper.class_manager.new_instance()
+        for attr in mapper.column_attrs:
+            set_committed_value(copy, attr.key, getattr(obj, attr.key))
+        make_transient_to_detached(copy)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, copy)
+            self._entries.move_to_end(key)
+            self._keys_by_id.setdefault(copy.id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                old_key, (_, old) = self._entries.popitem(last=False)
+                keys = self._keys_by_id.get(old.id)
+                if keys:
+                    keys.discard(old_key)
+                    if not keys:
+                        del self._keys_by_id[old.id]
+
+    def invalidate(self, id_):
+        """Drop every key (by id and by name) that points at row id_."""
+        with self._lock:
+            for key in self._keys_by_id.pop(id_, ()):
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_id.clear()
+
+
+def cache_stats():
+    """(cache name, cached rows, hits, misses) for every reference cache."""
+    return [(c.name, len(c), c.hits, c.misses) for c in _caches]
+
+
+def clear_caches():
+    """Empty every reference cache, e.g. after rows were changed outside the ORM."""
+    for c in _caches:
+        c.clear()
+
+
+# --- Invalidation on commit / rollback ---
+# Rows inserted, changed or deleted through any Session are remembered at flush
+# time and evicted when the transaction ends: after a commit they are stale, and
+# after a rollback anything cached from inside the transaction may never have existed.
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    pending = session.info.setdefault("ref_cache_pending", set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        cache = getattr(type(obj), "_cache", None)
+        if cache is not None:
+            pending.add((cache, obj.id))
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _evict_pending(session):
+    for cache, id_ in session.info.pop("ref_cache_pending", ()):
+        cache.invalidate(id_)
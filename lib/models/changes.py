@@ -0,0 +1,144 @@
+# lib/models/changes.py
+"""Append-only change log for incremental sync.
+
+Every insert, update and delete of a department, employee, project or project
+assignment adds a row to change_log in the same transaction as the change:
+
+    seq         monotonically increasing (AUTOINCREMENT, never reused)
+    table_name  departments / employees / projects / employee_project
+    op          insert / update / delete
+    row_id      primary key of the row (NULL for employee_project)
+    data        JSON: the full row for insert/delete, the changed columns (and id) for update
+    ts          unix time of the change
+
+SQLite has one writer at a time, so changes commit in seq order and a consumer
+only needs to remember the last seq it applied:
+
+    changes = changes_since(session, last_seq)
+
+Model rows are logged from the ORM's after_insert/after_update/after_delete events.
+Assignments are written by Core INSERT ... SELECT / DELETE statements and by the
+ORM's secondary-table sync, which fire no mapper events, so employee_project is
+logged by triggers (installed by init_db, like the search triggers). Core inserts
+and deletes of model rows (bulk_import, Department.delete) call log_rows() themselves.
+"""
+import json
+import time
+
+from sqlalchemy import Column, Float, Integer, String, Table, Text, event, func, insert, inspect, literal, select
+from sqlalchemy.sql.expression import ColumnElement
+
+from . import Base
+
+change_log = Table(
+    "change_log",
+    Base.metadata,
+    Column("seq", Integer, primary_key=True),
+    Column("table_name", String, nullable=False),
+    Column("op", String, nullable=False),
+    Column("row_id", Integer),
+    Column("data", Text, nullable=False),
+    Column("ts", Float, nullable=False),
+    sqlite_autoincrement=True,
+)
+
+TRACKED = ("departments", "employees", "projects")
+# Largest page returned by changes_since
+MAX_LIMIT = 10_000
+
+_NOW_SQL = "(julianday('now') - 2440587.5) * 86400.0"
+
+
+def _columns(mapper):
+    return [attr.key for attr in mapper.column_attrs]
+
+
+# Plain SQL: the events run once per flushed row, and building a Core insert each
+# time would cost more than the insert itself
+_INSERT_SQL = "INSERT INTO change_log (table_name, op, row_id, data, ts) VALUES (?, ?, ?, ?, ?)"
+
+
+def _log(connection, mapper, target, op, data):
+    connection.exec_driver_sql(_INSERT_SQL, (mapper.local_table.name, op, target.id,
+                                             json.dumps(data, default=str), time.time()))
+
+
+@event.listens_for(Base, "after_insert", propagate=True)
+def _after_insert(mapper, connection, target):
+    if mapper.local_table.name in TRACKED:
+        _log(connection, mapper, target, "insert", {k: getattr(target, k) for k in _columns(mapper)})
+
+
+@event.listens_for(Base, "after_update", propagate=True)
+def _after_update(mapper, connection, target):
+    if mapper.local_table.name not in TRACKED:
+        return
+    state = inspect(target)
+    changed = {k: getattr(target, k) for k in _columns(mapper) if state.attrs[k].history.has_changes()}
+    # Relationship-only changes (e.g. a project list) issue no UPDATE for this row
+    if changed:
+        _log(connection, mapper, target, "update", {"id": target.id, **changed})
+
+
+@event.listens_for(Base, "after_delete", propagate=True)
+def _after_delete(mapper, connection, target):
+    if mapper.local_table.name in TRACKED:
+        _log(connection, mapper, target, "delete", {k: getattr(target, k) for k in _columns(mapper)})
+
+
+def log_rows(session, table, op, where, changes=None):
+    """Log the rows of a tracked table matching `where`, for Core statements that bypass the ORM.
+
+    insert: call after inserting; delete: call before deleting (full rows are logged).
+    update: call before updating, with `changes` the new column values (plain values or
+    SQL expressions over the row); only those (and id) are logged, as the ORM event does.
+    Returns the number of rows logged.
+    """
+    if changes is not None:
+        pairs = [("id", table.c.id)] + [(k, v if isinstance(v, ColumnElement) else literal(v))
+                                    for k, v in changes.items()]
+    else:
+        pairs = [(c.name, c) for c in table.c]
+    data = func.json_object(*[x for name, value in pairs for x in (literal(name), value)])
+    stmt = insert(change_log).from_select(
+        ["table_name", "op", "row_id", "data", "ts"],
+        select(literal(table.name), literal(op), table.c.id, data, literal(time.time()))
+        .where(where)
+        .order_by(table.c.id),
+    )
+    return session.execute(stmt).rowcount
+
+
+def _ddl():
+    for op, ref in (("insert", "new"), ("delete", "old")):
+        yield (f"CREATE TRIGGER IF NOT EXISTS employee_project_log_{op} AFTER {op.upper()} ON employee_project "
+               f"BEGIN INSERT INTO change_log(table_name, op, row_id, data, ts) VALUES ('employee_project', '{op}', "
+               f"NULL, json_object('employee_id', {ref}.employee_id, 'project_id', {ref}.project_id), {_NOW_SQL}); END")
+
+
+def install_changes(engine):
+    """Create the change_log table and the employee_project triggers if missing."""
+    change_log.create(engine, checkfirst=True)
+    with engine.begin() as conn:
+        for stmt in _ddl():
+            conn.exec_driver_sql(stmt)
+
+
+def last_seq(session):
+    """Sequence number of the newest change (0 when the log is empty)."""
+    return session.execute(select(func.coalesce(func.max(change_log.c.seq), 0))).scalar()
+
+
+def changes_since(session, seq=0, limit=1000, tables=None):
+    """Changes with seq > `seq`, oldest first, as dicts; at most `limit` (capped at MAX_LIMIT).
+
+    Pass the last returned seq back in to get the next page.
+    """
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    stmt = select(change_log).where(change_log.c.seq > int(seq)).order_by(change_log.c.seq).limit(limit)
+    if tables:
+        stmt = stmt.where(change_log.c.table_name.in_(tables))
+    return [
+        {"seq": r.seq, "table": r.table_name, "op": r.op, "row_id": r.row_id, "data": json.loads(r.data), "ts": r.ts}
+        for r in session.execute(stmt)
+    ]
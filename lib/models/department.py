@@ -1,12 +1,20 @@
 # lib/models/department.py
-from sqlalchemy import Column, Integer, String, UniqueConstraint
+from sqlalchemy import Column, Integer, String, UniqueConstraint, delete, func, select, update
 from sqlalchemy.orm import relationship, validates
 
 from . import Base
+from .aio import AsyncCRUD
+from .unit_of_work import commit, retry_on_lock
+from .cache import RefCache
+from .changes import log_rows
+from .employee import Employee
 
-class Department(Base):
+class Department(AsyncCRUD, Base):
     __tablename__ = "departments"
 
+    # Read-through cache for find_by_id / find_by_name (see models/cache.py)
+    _cache = RefCache("departments")
+
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
     location = Column(String, nullable=False)
@@ -14,7 +22,8 @@ class Department(Base):
     # Unique department names
     __table_args__ = (UniqueConstraint("name", name="uq_department_name"),)
 
-    # Relationship: one Department -> many Employees
+    # Relationship: one Department -> many Employees.
+    # delete() below does not go through this cascade (it would load every member)
     employees = relationship(
         "Employee",
         back_populates="department",
@@ -38,33 +47,100 @@ class Department(Base):
     def __repr__(self):
         return f"<Department {self.id}: {self.name}, {self.location}>"
 
+    def to_dict(self):
+        return {"id": self.id, "name": self.name, "location": self.location}
+
     @classmethod
+    @retry_on_lock
     def create(cls, session, name, location):
         dept = cls(name=name, location=location)
         session.add(dept)
-        session.commit()
-        session.refresh(dept)
+        commit(session, dept)
         return dept
 
     @classmethod
     def get_all(cls, session):
         return session.query(cls).order_by(cls.id).all()
 
+    @classmethod
+    def page(cls, session, after_id=0, limit=500):
+        """One keyset page: rows with id > after_id in id order."""
+        return session.query(cls).filter(cls.id > after_id).order_by(cls.id).limit(limit).all()
+
+    @classmethod
+    def iter_pages(cls, session, page_size=500):
+        """Yield lists of rows in id order, keyset-paginated (WHERE id > last)."""
+        last_id = 0
+        while True:
+            page = cls.page(session, last_id, page_size)
+            if not page:
+                return
+            yield page
+            last_id = page[-1].id
+
     @classmethod
     def find_by_id(cls, session, id_):
-        return session.get(cls, int(id_)) if str(id_).isdigit() else None
+        if not str(id_).isdigit():
+            return None
+        return cls._cache.lookup(session, ("id", int(id_)), lambda: session.get(cls, int(id_)))
 
     @classmethod
     def find_by_name(cls, session, name):
-        return session.query(cls).filter(cls.name == name).first()
+        return cls._cache.lookup(
+            session, ("name", name),
+            lambda: session.query(cls).filter(cls.name == name).first(),
+        )
 
+    @retry_on_lock
     def update(self, session, **attrs):
         for k, v in attrs.items():
             setattr(self, k, v)
-        session.commit()
-        session.refresh(self)
+        self._cache.invalidate(self.id)
+        commit(session, self)
         return self
 
-    def delete(self, session):
-        session.delete(self)
-        session.commit()
+    def _member_ids(self):
+        return select(Employee.id).where(Employee.department_id == self.id)
+
+    def delete_preview(self, session):
+        """Dry run of delete(): how many employees and project assignments it would remove."""
+        from .project import employee_project
+        employees = session.execute(
+            select(func.count()).where(Employee.department_id == self.id)).scalar()
+        assignments = session.execute(
+            select(func.count()).select_from(employee_project)
+            .where(employee_project.c.employee_id.in_(self._member_ids()))).scalar()
+        return {"employees": employees, "assignments": assignments}
+
+    @retry_on_lock
+    def delete(self, session, reassign_to=None):
+        """Delete this department with set-based statements; returns what was affected.
+
+        Its employees are deleted together with their project assignments, or moved to
+        the department `reassign_to` (a Department) with a single UPDATE. Nothing is
+        loaded into the session, so the cost does not grow with Python objects per member.
+        """
+        from .project import employee_project
+        emp = Employee.__table__
+        in_dept = emp.c.department_id == self.id
+        if reassign_to is not None:
+            if reassign_to.id == self.id:
+                raise ValueError("Cannot reassign employees to the department being deleted")
+            log_rows(session, emp, "update", in_dept, {"department_id": reassign_to.id})
+            moved = session.execute(update(emp).where(in_dept).values(department_id=reassign_to.id)).rowcount
+            result = {"reassigned": moved, "employees": 0, "assignments": 0}
+        else:
+            # assignment deletes are logged by the employee_project triggers
+            assignments = session.execute(
+                delete(employee_project).where(employee_project.c.employee_id.in_(self._member_ids()))).rowcount
+            log_rows(session, emp, "delete", in_dept)
+            employees = session.execute(delete(emp).where(in_dept)).rowcount
+            result = {"reassigned": 0, "employees": employees, "assignments": assignments}
+        table = type(self).__table__
+        log_rows(session, table, "delete", table.c.id == self.id)
+        session.execute(delete(table).where(table.c.id == self.id))
+        self._cache.invalidate(self.id)
+        commit(session)
+        # The row is gone; keep the stale instance out of this session's identity map
+        session.expunge(self)
+        return result
@@ -1,10 +1,13 @@
 # lib/models/employee.py
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, CheckConstraint, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, CheckConstraint, UniqueConstraint, Index
 from sqlalchemy.orm import relationship, validates
 
 from . import Base
+from .aio import AsyncCRUD
+from .unit_of_work import commit, retry_on_lock
+from .search import fuzzy_ids, prefix_ids
 
-class Employee(Base):
+class Employee(AsyncCRUD, Base):
     __tablename__ = "employees"
 
     id = Column(Integer, primary_key=True)
@@ -17,6 +20,11 @@ class Employee(Base):
     __table_args__ = (
         UniqueConstraint("email", name="uq_employee_email"),
         CheckConstraint("salary > 0", name="ck_employee_salary_positive"),
+        # find_by_name: full-name match and the first OR last fallback
+        Index("ix_employee_last_first", "last_name", "first_name"),
+        Index("ix_employee_first_name", "first_name"),
+        # department listings / cascades
+        Index("ix_employee_department_id", "department_id"),
     )
 
     # Many employees -> one department
@@ -52,22 +60,45 @@ class Employee(Base):
         return (f"<Employee {self.id}: {self.first_name} {self.last_name}, "
                 f"{self.email}, ${self.salary:.2f}, Department ID: {self.department_id}>")
 
+    def to_dict(self):
+        return {"id": self.id, "first_name": self.first_name, "last_name": self.last_name,
+                "email": self.email, "salary": self.salary, "department_id": self.department_id}
+
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
 
     @classmethod
+    @retry_on_lock
     def create(cls, session, **attrs):
         emp = cls(**attrs)
         session.add(emp)
-        session.commit()
-        session.refresh(emp)
+        commit(session, emp)
         return emp
 
     @classmethod
     def get_all(cls, session):
         return session.query(cls).order_by(cls.id).all()
 
+    @classmethod
+    def page(cls, session, after_id=0, limit=500, department_id=None):
+        """One keyset page: rows with id > after_id in id order."""
+        q = session.query(cls).filter(cls.id > after_id)
+        if department_id is not None:
+            q = q.filter(cls.department_id == department_id)
+        return q.order_by(cls.id).limit(limit).all()
+
+    @classmethod
+    def iter_pages(cls, session, page_size=500, department_id=None):
+        """Yield lists of rows in id order, keyset-paginated (WHERE id > last)."""
+        last_id = 0
+        while True:
+            page = cls.page(session, last_id, page_size, department_id)
+            if not page:
+                return
+            yield page
+            last_id = page[-1].id
+
     @classmethod
     def find_by_id(cls, session, id_):
         return session.get(cls, int(id_)) if str(id_).isdigit() else None
@@ -83,13 +114,26 @@ class Employee(Base):
         # fallback: match either first OR last
         return q.filter((cls.first_name == name) | (cls.last_name == name)).first()
 
+    @classmethod
+    def search(cls, session, query, limit=10):
+        """Ranked prefix search over names and emails (FTS5), topped up with
+        typo-tolerant matches when there are fewer than `limit` hits."""
+        ids = prefix_ids(session, query, limit)
+        if len(ids) < limit:
+            ids += fuzzy_ids(session, query, limit - len(ids), exclude=set(ids))
+        if not ids:
+            return []
+        found = {e.id: e for e in session.query(cls).filter(cls.id.in_(ids))}
+        return [found[i] for i in ids if i in found]
+
+    @retry_on_lock
     def update(self, session, **attrs):
         for k, v in attrs.items():
             setattr(self, k, v)
-        session.commit()
-        session.refresh(self)
+        commit(session, self)
         return self
 
+    @retry_on_lock
     def delete(self, session):
         session.delete(self)
-        session.commit()
+        commit(session)
@@ -0,0 +1,272 @@
+# lib/models/metrics.py
+"""Per-action timing, SQL statement counts and a slow-query log.
+
+Every engine from make_engine() reports its statements here through the
+before/after_cursor_execute events. Statements, rows fetched and SQL time are
+charged to the action currently being measured on that thread:
+
+    with measure("list_employees"):
+        ...                       # queries, tabulate(...) via timed_render
+
+Finished actions are aggregated in-process (stats()) and, when EMS_METRICS_LOG
+is set, appended as JSON lines to that file so `cli.py stats` can summarise
+several runs.
+"""
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from sqlalchemy import event
+
+# Statements slower than this are logged to EMS_SLOW_QUERY_LOG (default stderr)
+SLOW_QUERY_MS = float(os.environ.get("EMS_SLOW_QUERY_MS", 250))
+METRICS_LOG = os.environ.get("EMS_METRICS_LOG")
+
+# Histogram upper bounds in milliseconds; the last bucket is open-ended
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+slow_log = logging.getLogger("ems.slow_query")
+if not slow_log.handlers:
+    _handler = (logging.FileHandler(os.environ["EMS_SLOW_QUERY_LOG"]) if os.environ.get("EMS_SLOW_QUERY_LOG")
+                else logging.StreamHandler(sys.stderr))
+    _handler.setFormatter(logging.Formatter("%(asctime)s slow query %(message)s"))
+    slow_log.addHandler(_handler)
+    slow_log.setLevel(logging.WARNING)
+    slow_log.propagate = False
+
+_local = threading.local()
+_lock = threading.Lock()
+_stats = {}
+
+
+class Span:
+    """Measurements for one run of an action."""
+
+    __slots__ = ("action", "start", "statements", "rows", "sql", "render", "waiting")
+
+    def __init__(self, action):
+        self.action = action
+        self.start = time.perf_counter()
+        self.statements = self.rows = 0
+        self.sql = self.render = self.waiting = 0.0
+
+    def record(self, wall):
+        return {
+            "ts": round(time.time(), 3),
+            "action": self.action,
+            "wall_ms": round(wall * 1000, 3),
+            "statements": self.statements,
+            "rows": self.rows,
+            "sql_ms": round(self.sql * 1000, 3),
+            "render_ms": round(self.render * 1000, 3),
+        }
+
+
+class ActionStats:
+    """Running totals and a wall-time histogram for one action."""
+
+    def __init__(self, action):
+        self.action = action
+        self.calls = 0
+        self.wall_ms = self.max_ms = self.sql_ms = self.render_ms = 0.0
+        self.statements = self.rows = 0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, rec):
+        self.calls += 1
+        self.wall_ms += rec["wall_ms"]
+        self.max_ms = max(self.max_ms, rec["wall_ms"])
+        self.sql_ms += rec["sql_ms"]
+        self.render_ms += rec["render_ms"]
+        self.statements += rec["statements"]
+        self.rows += rec["rows"]
+        self.buckets[_bucket(rec["wall_ms"])] += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (None = above the last bound)."""
+        rank, seen = q * self.calls, 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else None
+        return None
+
+    def to_dict(self):
+        labels = [f"le_{b}" for b in BUCKETS_MS] + ["inf"]
+        return {
+            "action": self.action, "calls": self.calls,
+            "wall_ms": round(self.wall_ms, 3), "max_ms": round(self.max_ms, 3),
+            "statements": self.statements, "rows": self.rows,
+            "sql_ms": round(self.sql_ms, 3), "render_ms": round(self.render_ms, 3),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+def _bucket(ms):
+    for i, bound in enumerate(BUCKETS_MS):
+        if ms <= bound:
+            return i
+    return len(BUCKETS_MS)
+
+
+def current():
+    """The span being measured on this thread, or None."""
+    return getattr(_local, "span", None)
+
+
+@contextmanager
+def measure(action):
+    """Measure an action; nested calls are charged to the outermost one."""
+    if current() is not None:
+        yield current()
+        return
+    span = _local.span = Span(action)
+    try:
+        yield span
+    finally:
+        _local.span = None
+        rec = span.record(time.perf_counter() - span.start - span.waiting)
+        with _lock:
+            _stats.setdefault(action, ActionStats(action)).add(rec)
+            if METRICS_LOG:
+                with open(METRICS_LOG, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(rec) + "\n")
+
+
+def _charged(attr):
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            span = current()
+            if span is None:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                setattr(span, attr, getattr(span, attr) + time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+# tabulate = timed_render(tabulate): rendering time is reported separately
+timed_render = _charged("render")
+# @untimed on the prompt helper: time spent at a prompt is not part of the action's wall time
+untimed = _charged("waiting")
+
+
+def stats():
+    """ActionStats for every action measured in this process, by action name."""
+    with _lock:
+        return dict(_stats)
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+def histogram_text(stats_):
+    """Compact non-empty buckets, e.g. '<=5:3 <=25:1 >5000:1'."""
+    labels = [f"<={b}" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}"]
+    return " ".join(f"{label}:{n}" for label, n in zip(labels, stats_.buckets) if n)
+
+
+def summary_rows(stats_by_action):
+    """One table row per action, slowest total first."""
+    rows = []
+    for st in sorted(stats_by_action.values(), key=lambda st: st.wall_ms, reverse=True):
+        p50, p95 = st.quantile(0.5), st.quantile(0.95)
+        rows.append({
+            "action": st.action,
+            "calls": st.calls,
+            "avg_ms": round(st.wall_ms / st.calls, 2),
+            "p50_ms": f"<={p50}" if p50 else f">{BUCKETS_MS[-1]}",
+            "p95_ms": f"<={p95}" if p95 else f">{BUCKETS_MS[-1]}",
+            "max_ms": round(st.max_ms, 2),
+            "stmts/call": round(st.statements / st.calls, 1),
+            "rows/call": round(st.rows / st.calls, 1),
+            "sql_ms/call": round(st.sql_ms / st.calls, 2),
+            "render_ms/call": round(st.render_ms / st.calls, 2),
+            "histogram (ms:calls)": histogram_text(st),
+        })
+    return rows
+
+
+def read_log(path):
+    """Aggregate a JSON-lines metrics log into ActionStats by action name."""
+    totals = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                rec = json.loads(line)
+                totals.setdefault(rec["action"], ActionStats(rec["action"])).add(rec)
+    return totals
+
+
+# ---------- Engine instrumentation ----------
+class _CountingCursor(sqlite3.Cursor):
+    """Counts fetched rows for the current span (SQLAlchemy fetches through these methods)."""
+
+    def fetchone(self):
+        row = super().fetchone()
+        span = current()
+        if span is not None and row is not None:
+            span.rows += 1
+        return row
+
+    def fetchmany(self, *args):
+        rows = super().fetchmany(*args)
+        span = current()
+        if span is not None:
+            span.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        span = current()
+        if span is not None:
+            span.rows += len(rows)
+        return rows
+
+
+class CountingConnection(sqlite3.Connection):
+    """sqlite3 connection factory handing out row-counting cursors."""
+
+    def cursor(self, factory=_CountingCursor):
+        return super().cursor(factory)
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    span = current()
+    if span is not None:
+        span.statements += 1
+        span.sql += elapsed
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        params = "<executemany>" if executemany else repr(parameters)[:200]
+        slow_log.warning("%.1f ms [%s] %s %s", elapsed * 1000,
+                         span.action if span else "-", " ".join(statement.split())[:500], params)
+
+
+def _on_error(ctx):
+    # after_cursor_execute does not run for a failed statement
+    if ctx.connection is not None and ctx.connection.info.get("query_start"):
+        ctx.connection.info["query_start"].pop()
+
+
+def instrument(engine):
+    """Attach the statement timing listeners to an engine."""
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    event.listen(engine, "after_cursor_execute", _after_execute)
+    event.listen(engine, "handle_error", _on_error)
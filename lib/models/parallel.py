@@ -0,0 +1,252 @@
+# lib/models/parallel.py
+"""Reports and export spread over worker processes.
+
+The employees and employee_project tables are split into id ranges (shards); each
+shard runs in a ProcessPoolExecutor worker on its own read-only engine (mode=ro,
+readonly-report preset) and the parent merges what comes back:
+
+    department_payroll       per-department count/sum/min/max over employee id ranges
+    salary_percentiles       department id ranges (a percentile needs a whole department)
+    project_budget_per_head  per-project count/salary sum over employee_project ranges
+    bulk_export              part files per range, concatenated behind one header
+
+run_sharded() is the general form: any picklable module-level task(*shard) whose
+results the caller knows how to combine.
+
+Workers read the file behind the caller's session (main database, or the snapshot
+under snapshot read routing). Each worker has its own read transaction, so under
+concurrent writes shards can see slightly different moments; use snapshot routing
+when the result must come from a single point in time.
+
+workers=None uses EMS_WORKERS (default 1 = the single-session code, no processes);
+0 means one worker per CPU core.
+"""
+import csv
+import io
+import multiprocessing
+import os
+import shutil
+import struct
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from sqlalchemy import and_, func, select
+
+from . import Base, Session, make_engine, reports
+from .bulk import (EXPORT_FORMATS, EXPORT_TABLES, ExportReport, _export_table, _write_col_header,
+                   bulk_export as _serial_export)
+from .department import Department
+from .employee import Employee
+from .project import Project, employee_project
+
+WORKERS = int(os.environ.get("EMS_WORKERS", 1))
+# Several shards per worker evens out ranges with uneven density (deleted ids, busy employees)
+SHARDS_PER_WORKER = 4
+# Sharded tables and the column their ranges are taken over; the rest export as one part
+SHARD_KEYS = {"employees": "id", "employee_project": "employee_id"}
+
+PayrollRow = namedtuple("PayrollRow", "id name headcount total_salary avg_salary min_salary max_salary")
+BudgetRow = namedtuple("BudgetRow", "id name budget headcount staff_salary budget_per_head")
+
+
+def _workers(n):
+    n = WORKERS if n is None else n
+    if n < 0:
+        raise ValueError("workers must be >= 0 (0 = one per CPU core)")
+    return n or os.cpu_count() or 1
+
+
+def id_ranges(session, column, shards):
+    """Split min(column)..max(column) into at most `shards` half-open (lo, hi) ranges."""
+    lo, hi = session.execute(select(func.min(column), func.max(column))).one()
+    if lo is None:
+        return []
+    hi += 1
+    step = max(1, -(-(hi - lo) // shards))
+    return [(a, min(a + step, hi)) for a in range(lo, hi, step)]
+
+
+def _database_path(session):
+    # The file behind the session's bind, whichever engine read routing picked
+    path = session.connection().exec_driver_sql("PRAGMA database_list").fetchone()[2]
+    if not path:
+        raise ValueError("parallel execution needs a database file (not an in-memory database)")
+    return path
+
+
+# ---------- Worker side ----------
+_engine = None
+
+
+def _init_worker(path):
+    global _engine
+    _engine = make_engine(path, "readonly-report", readonly=True)
+
+
+def run_sharded(session, task, shards, workers=None, on_result=None):
+    """Run task(*shard) for every shard in worker processes; returns the results in shard order.
+
+    Workers open the database behind `session` read-only; task must be a
+    module-level function (it is pickled by name) and use the worker's engine.
+    on_result(index, result) is called in this process as each shard finishes (progress).
+    """
+    if not shards:
+        return []
+    workers = min(_workers(workers), len(shards))
+    # Workers fork from a server process that has imported this module but never opened
+    # the database: no inherited SQLite connections (unlike fork), and no per-worker
+    # SQLAlchemy import (unlike spawn). The server is started once per parent process.
+    ctx = multiprocessing.get_context("forkserver")
+    ctx.set_forkserver_preload([__name__])
+    with ProcessPoolExecutor(workers, mp_context=ctx, initializer=_init_worker,
+                             initargs=(_database_path(session),)) as pool:
+        futures = {pool.submit(task, *shard): i for i, shard in enumerate(shards)}
+        results = [None] * len(shards)
+        for f in as_completed(futures):
+            i = futures[f]
+            results[i] = f.result()
+            if on_result:
+                on_result(i, results[i])
+        return results
+
+
+def _payroll_part(lo, hi):
+    stmt = (
+        select(Employee.department_id, func.count(), func.sum(Employee.salary),
+               func.min(Employee.salary), func.max(Employee.salary))
+        .where(Employee.id >= lo, Employee.id < hi)
+        .group_by(Employee.department_id)
+    )
+    with _engine.connect() as conn:
+        return [tuple(r) for r in conn.execute(stmt)]
+
+
+def _percentile_part(lo, hi, percentiles):
+    with Session(bind=_engine) as s:
+        return [tuple(r) for r in reports.salary_percentiles(s, percentiles, departments=(lo, hi))]
+
+
+def _budget_part(lo, hi):
+    stmt = (
+        select(employee_project.c.project_id, func.count(), func.sum(Employee.salary))
+        .join(Employee, Employee.id == employee_project.c.employee_id)
+        .where(employee_project.c.employee_id >= lo, employee_project.c.employee_id < hi)
+        .group_by(employee_project.c.project_id)
+    )
+    with _engine.connect() as conn:
+        return [tuple(r) for r in conn.execute(stmt)]
+
+
+def _export_part(table_name, fmt, path, lo, hi, chunk_size):
+    table = Base.metadata.tables[table_name]
+    where = None
+    if lo is not None:
+        column = table.c[SHARD_KEYS[table_name]]
+        where = and_(column >= lo, column < hi)
+    with _engine.connect() as conn:
+        return _export_table(conn, table, fmt, path, chunk_size, where=where, framed=False)
+
+
+# ---------- Reports ----------
+def department_payroll(session, workers=None):
+    """reports.department_payroll computed over employee id ranges in worker processes."""
+    workers = _workers(workers)
+    if workers == 1:
+        return reports.department_payroll(session)
+    shards = id_ranges(session, Employee.id, workers * SHARDS_PER_WORKER)
+    totals = {}
+    for part in run_sharded(session, _payroll_part, shards, workers):
+        for dept, n, total, low, high in part:
+            if dept in totals:
+                m = totals[dept]
+                totals[dept] = (m[0] + n, m[1] + total, min(m[2], low), max(m[3], high))
+            else:
+                totals[dept] = (n, total, low, high)
+    rows = []
+    for id_, name in session.execute(select(Department.id, Department.name).order_by(Department.id)):
+        n, total, low, high = totals.get(id_, (0, 0, None, None))
+        rows.append(PayrollRow(id_, name, n, total, total / n if n else None, low, high))
+    return rows
+
+
+def salary_percentiles(session, percentiles=reports.PERCENTILES, workers=None):
+    """reports.salary_percentiles computed over department id ranges in worker processes."""
+    workers = _workers(workers)
+    if workers == 1:
+        return reports.salary_percentiles(session, percentiles)
+    row = namedtuple("PercentileRow", ["id", "name", "headcount", *[f"p{int(p * 100)}" for p in percentiles]])
+    shards = [(lo, hi, percentiles) for lo, hi in id_ranges(session, Department.id, workers * SHARDS_PER_WORKER)]
+    return [row(*r) for part in run_sharded(session, _percentile_part, shards, workers) for r in part]
+
+
+def project_budget_per_head(session, workers=None):
+    """reports.project_budget_per_head computed over employee_project ranges in worker processes."""
+    workers = _workers(workers)
+    if workers == 1:
+        return reports.project_budget_per_head(session)
+    shards = id_ranges(session, employee_project.c.employee_id, workers * SHARDS_PER_WORKER)
+    staff = {}
+    for part in run_sharded(session, _budget_part, shards, workers):
+        for project, n, salary in part:
+            m = staff.get(project, (0, 0))
+            staff[project] = (m[0] + n, m[1] + salary)
+    rows = []
+    for id_, name, budget in session.execute(select(Project.id, Project.name, Project.budget).order_by(Project.id)):
+        n, salary = staff.get(id_, (0, 0))
+        rows.append(BudgetRow(id_, name, budget, n, salary, budget / n if n else None))
+    return rows
+
+
+# ---------- Export ----------
+def _assemble(table, fmt, path, parts):
+    """Write the table's header, then each part file in order (removing it), then the terminator."""
+    with open(path, "wb") as out:
+        if fmt == "csv":
+            buf = io.StringIO()
+            csv.writer(buf).writerow([c.name for c in table.columns])
+            out.write(buf.getvalue().encode("utf-8"))
+        elif fmt == "col":
+            _write_col_header(out, table)
+        for part in parts:
+            with open(part, "rb") as f:
+                shutil.copyfileobj(f, out, 1024 * 1024)
+            os.remove(part)
+        if fmt == "col":
+            out.write(struct.pack("<I", 0))
+
+
+def bulk_export(session, fmt, out_dir, workers=None, chunk_size=10000):
+    """models.bulk.bulk_export with employees and employee_project written in parallel id ranges.
+
+    csv and jsonl files are byte-for-byte the single-session output; col files hold
+    the same rows, with row groups also breaking at shard boundaries.
+    """
+    workers = _workers(workers)
+    if workers == 1:
+        return _serial_export(session, fmt, out_dir, chunk_size)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}' (expected one of: {', '.join(EXPORT_FORMATS)})")
+    start = time.perf_counter()
+    report = ExportReport(fmt)
+    os.makedirs(out_dir, exist_ok=True)
+    shards, parts = [], {}
+    for table in EXPORT_TABLES:
+        path = os.path.join(out_dir, f"{table.name}.{fmt}")
+        key = SHARD_KEYS.get(table.name)
+        ranges = id_ranges(session, table.c[key], workers * SHARDS_PER_WORKER) if key else [(None, None)]
+        parts[table.name] = [f"{path}.{i}.part" for i in range(len(ranges))]
+        shards += [(table.name, fmt, part, lo, hi, chunk_size) for part, (lo, hi) in zip(parts[table.name], ranges)]
+    try:
+        counts = iter(run_sharded(session, _export_part, shards, workers))
+        for table in EXPORT_TABLES:
+            path = os.path.join(out_dir, f"{table.name}.{fmt}")
+            rows = sum(next(counts) for _ in parts[table.name])
+            _assemble(table, fmt, path, parts[table.name])
+            report.tables[table.name] = (path, rows)
+    finally:
+        for part in (p for ps in parts.values() for p in ps):
+            if os.path.exists(part):
+                os.remove(part)
+    report.elapsed = time.perf_counter() - start
+    return report
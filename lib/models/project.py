@@ -1,8 +1,13 @@
 # lib/models/project.py
-from sqlalchemy import Column, Integer, String, Float, Table, ForeignKey, UniqueConstraint, CheckConstraint
+from sqlalchemy import Column, Integer, String, Float, Table, ForeignKey, UniqueConstraint, CheckConstraint, Index, delete, insert, literal, select
 from sqlalchemy.orm import relationship, validates
 
 from . import Base
+from .aio import AsyncCRUD
+from .unit_of_work import commit, retry_on_lock
+from .cache import RefCache
+from .department import Department
+from .employee import Employee
 
 # Association table for many-to-many Employee <-> Project
 employee_project = Table(
@@ -10,11 +15,24 @@ employee_project = Table(
     Base.metadata,
     Column("employee_id", ForeignKey("employees.id"), primary_key=True),
     Column("project_id", ForeignKey("projects.id"), primary_key=True),
+    # Reverse lookup (project -> employees); the PK covers employee -> projects
+    Index("ix_employee_project_project_employee", "project_id", "employee_id"),
 )
 
-class Project(Base):
+# Max ids bound into one IN (...) clause (SQLite caps host parameters per statement)
+ID_CHUNK = 500
+
+def _chunks(ids):
+    ids = sorted({int(i) for i in ids})
+    for start in range(0, len(ids), ID_CHUNK):
+        yield ids[start:start + ID_CHUNK]
+
+class Project(AsyncCRUD, Base):
     __tablename__ = "projects"
 
+    # Read-through cache for find_by_id / find_by_name (see models/cache.py)
+    _cache = RefCache("projects")
+
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
     budget = Column(Float, nullable=False)
@@ -47,33 +65,159 @@ class Project(Base):
     def __repr__(self):
         return f"<Project {self.id}: {self.name}, Budget ${self.budget:.2f}>"
 
+    def to_dict(self):
+        return {"id": self.id, "name": self.name, "budget": self.budget}
+
     @classmethod
+    @retry_on_lock
     def create(cls, session, name, budget):
         proj = cls(name=name, budget=budget)
         session.add(proj)
-        session.commit()
-        session.refresh(proj)
+        commit(session, proj)
         return proj
 
     @classmethod
     def get_all(cls, session):
         return session.query(cls).order_by(cls.id).all()
 
+    @classmethod
+    def page(cls, session, after_id=0, limit=500):
+        """One keyset page: rows with id > after_id in id order."""
+        return session.query(cls).filter(cls.id > after_id).order_by(cls.id).limit(limit).all()
+
+    @classmethod
+    def iter_pages(cls, session, page_size=500):
+        """Yield lists of rows in id order, keyset-paginated (WHERE id > last)."""
+        last_id = 0
+        while True:
+            page = cls.page(session, last_id, page_size)
+            if not page:
+                return
+            yield page
+            last_id = page[-1].id
+
+    @classmethod
+    def roster(cls, session, chunk_size=1000):
+        """Every project with its assigned employees and their department names.
+
+        One outer-joined SELECT streamed in chunks; projects without employees
+        come back once with the employee columns set to None.
+        """
+        stmt = (
+            select(
+                cls.id.label("project_id"),
+                cls.name.label("project_name"),
+                cls.budget,
+                Employee.id.label("employee_id"),
+                Employee.first_name,
+                Employee.last_name,
+                Department.name.label("department_name"),
+            )
+            .select_from(cls)
+            .outerjoin(employee_project, employee_project.c.project_id == cls.id)
+            .outerjoin(Employee, Employee.id == employee_project.c.employee_id)
+            .outerjoin(Department, Department.id == Employee.department_id)
+            .order_by(cls.id, Employee.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        return session.execute(stmt)
+
     @classmethod
     def find_by_id(cls, session, id_):
-        return session.get(cls, int(id_)) if str(id_).isdigit() else None
+        if not str(id_).isdigit():
+            return None
+        return cls._cache.lookup(session, ("id", int(id_)), lambda: session.get(cls, int(id_)))
 
     @classmethod
     def find_by_name(cls, session, name):
-        return session.query(cls).filter(cls.name == name).first()
+        return cls._cache.lookup(
+            session, ("name", name),
+            lambda: session.query(cls).filter(cls.name == name).first(),
+        )
+
+    # --- Set-based assignment helpers (single INSERT ... SELECT / DELETE statements) ---
+    def _assign_from(self, session, employee_ids_select):
+        stmt = (
+            insert(employee_project)
+            .prefix_with("OR IGNORE")
+            .from_select(["employee_id", "project_id"], employee_ids_select.add_columns(literal(self.id)))
+        )
+        return session.execute(stmt).rowcount
+
+    @retry_on_lock
+    def assign_department(self, session, department_id):
+        """Assign every employee of a department; returns the number of new assignments."""
+        added = self._assign_from(session, select(Employee.id).where(Employee.department_id == department_id))
+        commit(session)
+        return added
+
+    @retry_on_lock
+    def assign_employees(self, session, employee_ids):
+        """Assign existing employees by id (unknown ids are skipped); returns rows added."""
+        added = sum(
+            self._assign_from(session, select(Employee.id).where(Employee.id.in_(chunk)))
+            for chunk in _chunks(employee_ids)
+        )
+        commit(session)
+        return added
+
+    @retry_on_lock
+    def unassign_employees(self, session, employee_ids):
+        """Remove the given employees from this project; returns rows removed."""
+        removed = sum(
+            session.execute(
+                delete(employee_project).where(
+                    employee_project.c.project_id == self.id,
+                    employee_project.c.employee_id.in_(chunk),
+                )
+            ).rowcount
+            for chunk in _chunks(employee_ids)
+        )
+        commit(session)
+        return removed
+
+    @retry_on_lock
+    def unassign_department(self, session, department_id):
+        """Remove every employee of a department from this project; returns rows removed."""
+        removed = session.execute(
+            delete(employee_project).where(
+                employee_project.c.project_id == self.id,
+                employee_project.c.employee_id.in_(
+                    select(Employee.id).where(Employee.department_id == department_id)
+                ),
+            )
+        ).rowcount
+        commit(session)
+        return removed
+
+    @retry_on_lock
+    def move_members_to(self, session, target):
+        """Move all members of this project to `target`; returns (added to target, removed here)."""
+        added = session.execute(
+            insert(employee_project)
+            .prefix_with("OR IGNORE")
+            .from_select(
+                ["employee_id", "project_id"],
+                select(employee_project.c.employee_id, literal(target.id))
+                .where(employee_project.c.project_id == self.id),
+            )
+        ).rowcount
+        removed = session.execute(
+            delete(employee_project).where(employee_project.c.project_id == self.id)
+        ).rowcount
+        commit(session)
+        return added, removed
 
+    @retry_on_lock
     def update(self, session, **attrs):
         for k, v in attrs.items():
             setattr(self, k, v)
-        session.commit()
-        session.refresh(self)
+        self._cache.invalidate(self.id)
+        commit(session, self)
         return self
 
+    @retry_on_lock
     def delete(self, session):
+        self._cache.invalidate(self.id)
         session.delete(self)
-        session.commit()
+        commit(session)
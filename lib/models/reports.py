@@ -0,0 +1,98 @@
+# lib/models/reports.py
+from sqlalchemy import Integer, case, cast, func, select
+
+from .department import Department
+from .employee import Employee
+from .project import Project, employee_project
+
+# Percentiles reported by salary_percentiles (nearest-rank method)
+PERCENTILES = (0.25, 0.5, 0.75, 0.9)
+
+
+def department_payroll(session):
+    """Headcount and total/average/min/max salary per department, one GROUP BY."""
+    stmt = (
+        select(
+            Department.id,
+            Department.name,
+            func.count(Employee.id).label("headcount"),
+            func.coalesce(func.sum(Employee.salary), 0).label("total_salary"),
+            func.avg(Employee.salary).label("avg_salary"),
+            func.min(Employee.salary).label("min_salary"),
+            func.max(Employee.salary).label("max_salary"),
+        )
+        .select_from(Department)
+        .outerjoin(Employee, Employee.department_id == Department.id)
+        .group_by(Department.id)
+        .order_by(Department.id)
+    )
+    return session.execute(stmt).all()
+
+
+def salary_percentiles(session, percentiles=PERCENTILES, departments=None):
+    """Salary percentiles per department using ROW_NUMBER/COUNT window functions.
+
+    Rows are returned as (department id, department name, headcount, p1, p2, ...).
+    departments=(lo, hi) limits the report to department ids lo <= id < hi.
+    """
+    ranked = select(
+        Employee.department_id,
+        Employee.salary,
+        func.row_number().over(partition_by=Employee.department_id, order_by=Employee.salary).label("rn"),
+        func.count().over(partition_by=Employee.department_id).label("n"),
+    )
+    if departments is not None:
+        lo, hi = departments
+        ranked = ranked.where(Employee.department_id >= lo, Employee.department_id < hi)
+    ranked = ranked.subquery()
+
+    def nearest_rank(p):
+        # ceil(p * n) without relying on SQLite's optional math functions
+        exact = p * ranked.c.n
+        floor = cast(exact, Integer)
+        return floor + case((exact > floor, 1), else_=0)
+
+    stmt = (
+        select(
+            Department.id,
+            Department.name,
+            func.max(ranked.c.n).label("headcount"),
+            *[
+                func.max(case((ranked.c.rn == nearest_rank(p), ranked.c.salary))).label(f"p{int(p * 100)}")
+                for p in percentiles
+            ],
+        )
+        .select_from(ranked)
+        .join(Department, Department.id == ranked.c.department_id)
+        .group_by(Department.id)
+        .order_by(Department.id)
+    )
+    return session.execute(stmt).all()
+
+
+def project_budget_per_head(session):
+    """Budget, staff count, staff salary cost and budget per head for each project."""
+    staff = (
+        select(
+            employee_project.c.project_id,
+            func.count().label("headcount"),
+            func.sum(Employee.salary).label("staff_salary"),
+        )
+        .join(Employee, Employee.id == employee_project.c.employee_id)
+        .group_by(employee_project.c.project_id)
+        .subquery()
+    )
+    headcount = func.coalesce(staff.c.headcount, 0)
+    stmt = (
+        select(
+            Project.id,
+            Project.name,
+            Project.budget,
+            headcount.label("headcount"),
+            func.coalesce(staff.c.staff_salary, 0).label("staff_salary"),
+            (Project.budget / func.nullif(headcount, 0)).label("budget_per_head"),
+        )
+        .outerjoin(staff, staff.c.project_id == Project.id)
+        .order_by(Project.id)
+    )
+    return session.execute(stmt).all()
@@ -0,0 +1,93 @@
+# lib/models/search.py
+import difflib
+import re
+
+from sqlalchemy import text
+
+# Two external-content FTS5 indexes over employees, kept in sync by triggers:
+#   employees_fts      word tokens with prefix indexes -> "pet*" style prefix search
+#   employees_fts_tri  trigram tokens                   -> candidates for typo-tolerant search
+FTS_TABLES = ("employees_fts", "employees_fts_tri")
+_TOKENIZERS = {
+    "employees_fts": "tokenize='unicode61 remove_diacritics 2', prefix='2 3'",
+    "employees_fts_tri": "tokenize='trigram'",
+}
+_COLS = "first_name, last_name, email"
+
+# Fuzzy matches below this difflib ratio are dropped
+MIN_SIMILARITY = 0.6
+
+
+def _ddl():
+    for table, options in _TOKENIZERS.items():
+        yield (f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5("
+               f"{_COLS}, content='employees', content_rowid='id', {options})")
+    insert_new = "".join(
+        f"INSERT INTO {t}(rowid, {_COLS}) VALUES (new.id, new.first_name, new.last_name, new.email);"
+        for t in FTS_TABLES)
+    delete_old = "".join(
+        f"INSERT INTO {t}({t}, rowid, {_COLS}) VALUES ('delete', old.id, old.first_name, old.last_name, old.email);"
+        for t in FTS_TABLES)
+    yield f"CREATE TRIGGER IF NOT EXISTS employees_fts_ai AFTER INSERT ON employees BEGIN {insert_new} END"
+    yield f"CREATE TRIGGER IF NOT EXISTS employees_fts_ad AFTER DELETE ON employees BEGIN {delete_old} END"
+    yield (f"CREATE TRIGGER IF NOT EXISTS employees_fts_au AFTER UPDATE OF {_COLS} ON employees "
+           f"BEGIN {delete_old}{insert_new} END")
+
+
+def install_search(engine):
+    """Create the FTS5 tables and triggers if missing, backfilling from existing rows."""
+    with engine.begin() as conn:
+        existing = {r[0] for r in conn.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE name IN ('employees_fts', 'employees_fts_tri')")}
+        if existing == set(FTS_TABLES):
+            return
+        for stmt in _ddl():
+            conn.exec_driver_sql(stmt)
+        for table in FTS_TABLES:
+            if table not in existing:
+                conn.exec_driver_sql(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+
+
+def _tokens(query):
+    return [t.lower() for t in re.findall(r"\w+", query or "")]
+
+
+def prefix_ids(session, query, limit):
+    """Ids whose name/email words start with every query token, best bm25 rank first."""
+    tokens = _tokens(query)
+    if not tokens:
+        return []
+    match = " AND ".join(f'"{t}"*' for t in tokens)
+    rows = session.execute(
+        text("SELECT rowid FROM employees_fts WHERE employees_fts MATCH :q ORDER BY rank LIMIT :n"),
+        {"q": match, "n": limit},
+    )
+    return [r[0] for r in rows]
+
+
+def fuzzy_ids(session, query, limit, exclude=()):
+    """Ids close to the query despite typos: trigram candidates re-ranked by similarity."""
+    needle = " ".join(_tokens(query))
+    # Trigrams of the query and of every one-character deletion of it, so a
+    # transposed/extra letter ("jonh") still shares a gram with the intended word ("joh")
+    variants = [needle] + [needle[:i] + needle[i + 1:] for i in range(len(needle))]
+    grams = {v[i:i + 3] for v in variants for i in range(len(v) - 2)}
+    grams = [g for g in grams if " " not in g]
+    if not grams:
+        return []
+    match = " OR ".join(f'"{g}"' for g in grams)
+    rows = session.execute(
+        text(f"SELECT rowid, {_COLS} FROM employees_fts_tri WHERE employees_fts_tri MATCH :q "
+             "ORDER BY rank LIMIT :n"),
+        {"q": match, "n": limit * 20},
+    )
+    scored = []
+    for id_, first, last, email in rows:
+        if id_ in exclude:
+            continue
+        candidates = (f"{first} {last}", first, last, email.split("@")[0])
+        score = max(difflib.SequenceMatcher(None, needle, c.lower()).ratio() for c in candidates)
+        if score >= MIN_SIMILARITY:
+            scored.append((-score, id_))
+    scored.sort()
+    return [id_ for _, id_ in scored[:limit]]
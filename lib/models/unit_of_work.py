@@ -0,0 +1,174 @@
+# lib/models/unit_of_work.py
+import functools
+import os
+import random
+import time
+from contextlib import contextmanager
+
+from sqlalchemy.exc import OperationalError
+
+# Default number of create/update calls between flushes inside batch()
+FLUSH_EVERY = 1000
+
+# Write coordination. Every write transaction starts with BEGIN IMMEDIATE (see
+# make_engine), so the write lock is taken before any change is made; when another
+# process holds it past busy_timeout the whole helper is rolled back and re-run
+# after a jittered exponential backoff: uniform(0, min(cap, base * 2**attempt)).
+WRITE_RETRIES = int(os.environ.get("EMS_WRITE_RETRIES", 5))
+RETRY_BASE = 0.05   # seconds
+RETRY_CAP = 2.0
+
+_retry_stats = {"retries": 0, "gave_up": 0}
+
+SQLITE_BUSY, SQLITE_LOCKED = 5, 6
+
+
+def is_lock_error(exc):
+    """True for SQLite 'database is locked' / busy errors (worth retrying)."""
+    if not isinstance(exc, OperationalError):
+        return False
+    code = getattr(exc.orig, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in (SQLITE_BUSY, SQLITE_LOCKED)
+    return "locked" in str(exc.orig) or "busy" in str(exc.orig)
+
+
+def _delay(attempt):
+    return random.uniform(0, min(RETRY_CAP, RETRY_BASE * 2 ** attempt))
+
+
+def _backoff(attempt):
+    time.sleep(_delay(attempt))
+
+
+def retry_stats():
+    """Process-wide counts of lock retries and of helpers that gave up."""
+    return dict(_retry_stats)
+
+
+def _in_write(session):
+    """True when the session already holds uncommitted changes (in memory or in SQLite)."""
+    if session.new or session.dirty or session.deleted:
+        return True
+    return session.connection().connection.driver_connection.in_transaction
+
+
+def _retrying(call, before_retry=None):
+    for attempt in range(WRITE_RETRIES + 1):
+        try:
+            return call()
+        except OperationalError as e:
+            if not is_lock_error(e):
+                raise
+            if attempt == WRITE_RETRIES:
+                _retry_stats["gave_up"] += 1
+                raise
+            if before_retry:
+                before_retry()
+            _retry_stats["retries"] += 1
+            _backoff(attempt)
+
+
+def retry_on_lock(method):
+    """Re-run a model write helper `(cls_or_self, session, ...)` when the database is locked.
+
+    Only retried when the helper owns the whole transaction: inside batch() or with
+    other uncommitted changes in the session a rollback would discard the caller's
+    work, so the error is raised as before.
+    """
+    @functools.wraps(method)
+    def wrapper(owner, session, *args, **kwargs):
+        call = functools.partial(method, owner, session, *args, **kwargs)
+        if "batch" in session.info or _in_write(session):
+            return call()
+        return _retrying(call, session.rollback)
+    return wrapper
+
+
+def aretry_on_lock(method):
+    """retry_on_lock for async helpers `(cls_or_self, async_session, ...)`.
+
+    Same rules and counters; the backoff awaits asyncio.sleep instead of blocking the loop.
+    """
+    @functools.wraps(method)
+    async def wrapper(owner, session, *args, **kwargs):
+        if await session.run_sync(_in_write):
+            return await method(owner, session, *args, **kwargs)
+        for attempt in range(WRITE_RETRIES + 1):
+            try:
+                return await method(owner, session, *args, **kwargs)
+            except OperationalError as e:
+                if not is_lock_error(e):
+                    raise
+                if attempt == WRITE_RETRIES:
+                    _retry_stats["gave_up"] += 1
+                    raise
+                await session.rollback()
+                _retry_stats["retries"] += 1
+                # here rather than at module level: the CLI never needs asyncio
+                import asyncio
+                await asyncio.sleep(_delay(attempt))
+    return wrapper
+
+
+def begin_write(session):
+    """Start the session's transaction with BEGIN IMMEDIATE, retrying while locked.
+
+    For multi-statement writes (batch(), bulk import) whose first statement would
+    otherwise open a deferred transaction, e.g. a SAVEPOINT. No-op if one is open.
+    """
+    conn = session.connection()
+    if not conn.connection.driver_connection.in_transaction:
+        _retrying(lambda: conn.exec_driver_sql("BEGIN IMMEDIATE"))
+
+
+class _Batch:
+    def __init__(self, flush_every):
+        self.flush_every = flush_every
+        self.pending = 0
+
+
+@contextmanager
+def batch(session, flush_every=FLUSH_EVERY):
+    """Unit of work: model CRUD helpers skip their per-call commit/refresh.
+
+    Changes are flushed every `flush_every` calls and committed once on exit;
+    any exception rolls the whole batch back. Nested batch() blocks join the outer one.
+    Rows created inside the batch get their ids at the next flush, so link them
+    through relationships (department=dept) or call session.flush() first.
+    The write lock is taken on entry (BEGIN IMMEDIATE) and held until exit.
+
+        with batch(session):
+            for row in rows:
+                Employee.create(session, **row)
+    """
+    if "batch" in session.info:
+        yield session
+        return
+    begin_write(session)
+    session.info["batch"] = _Batch(flush_every)
+    # Queries inside the batch must see rows created earlier in it
+    autoflush, session.autoflush = session.autoflush, True
+    try:
+        yield session
+        session.commit()
+    except BaseException:
+        session.rollback()
+        raise
+    finally:
+        session.autoflush = autoflush
+        session.info.pop("batch", None)
+
+
+def commit(session, *refresh):
+    """Commit and refresh `refresh`, or, inside batch(), just count towards the next flush."""
+    state = session.info.get("batch")
+    if state is None:
+        session.commit()
+        for obj in refresh:
+            session.refresh(obj)
+        return
+    state.pending += 1
+    if state.pending >= state.flush_every:
+        session.flush()
+        state.pending = 0
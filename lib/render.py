@@ -0,0 +1,142 @@
+# lib/render.py
+"""Table output for the menu and the scripted commands.
+
+    render.table(rows, ["ID", "Name"])              # rows: sequences, or dicts with headers="keys"
+
+Modes (EMS_OUTPUT, `--format`, or set_mode()):
+
+- grid: tabulate's boxed grid. It measures every row before printing anything,
+  so it is only suitable for small results.
+- fixed: aligned plain columns. Widths come from the first SAMPLE_ROWS rows (or
+  from `widths`), and rows are written in chunks as they arrive. A longer value
+  later on pushes the rest of its line to the right.
+- tsv: tab-separated, with a header line. Tabs, newlines and backslashes are escaped.
+- jsonl: one JSON object per row, using raw values (no `formats`).
+- auto (default): grid up to SAMPLE_ROWS rows, fixed above that.
+"""
+import json
+import os
+import sys
+from itertools import chain, islice
+
+from models import metrics
+
+MODES = ("auto", "grid", "fixed", "tsv", "jsonl")
+MODE = os.environ.get("EMS_OUTPUT", "auto")
+
+# Rows read before choosing between grid and fixed, and for fixed column widths
+SAMPLE_ROWS = 200
+# Rows formatted and written per write() call when streaming
+CHUNK_ROWS = 1000
+
+_TSV_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def set_mode(mode):
+    global MODE
+    if mode not in MODES:
+        raise ValueError(f"output mode must be one of {', '.join(MODES)}")
+    MODE = mode
+
+
+def _text(value):
+    return "" if value is None else str(value)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+# ---------- Line formatters: (header lines, row -> line) ----------
+def _fixed(headers, sample, widths):
+    n = len(headers)
+    if widths is None:
+        widths = [len(str(h)) for h in headers]
+        for row in sample:
+            widths = [max(w, len(_text(v))) for w, v in zip(widths, row)]
+    # Right-align columns whose sampled values are all numbers, like the grid does
+    right = [bool(sample) and all(_is_number(r[i]) or r[i] is None for r in sample)
+             and any(r[i] is not None for r in sample) for i in range(n)]
+
+    def line(row):
+        return "  ".join(_text(v).rjust(w) if r else _text(v).ljust(w)
+                         for v, w, r in zip(row, widths, right)).rstrip()
+
+    header = "  ".join(str(h).ljust(w) for h, w in zip(headers, widths)).rstrip()
+    return [header, "  ".join("-" * w for w in widths)], line
+
+
+def _tsv(headers, sample, widths):
+    def line(row):
+        return "\t".join(_text(v).translate(_TSV_ESCAPES) for v in row)
+    return [line(headers)], line
+
+
+def _jsonl(headers, sample, widths):
+    keys = [str(h) for h in headers]
+
+    def line(row):
+        return json.dumps(dict(zip(keys, row)), default=str)
+    return [], line
+
+
+_FORMATTERS = {"fixed": _fixed, "tsv": _tsv, "jsonl": _jsonl}
+
+
+# Only formatting and writing is charged as render time; fetching rows from the
+# iterator (often a query) is charged to SQL as usual.
+@metrics.timed_render
+def _grid(rows, headers, out):
+    from tabulate import tabulate
+    out.write(tabulate(rows, headers=headers, tablefmt="grid") + "\n")
+
+
+@metrics.timed_render
+def _write(out, lines, line, rows):
+    out.write("\n".join(chain(lines, map(line, rows))) + "\n")
+
+
+def _apply(formats, headers, rows):
+    by_index = {i: formats[h] for i, h in enumerate(headers) if h in formats}
+    for row in rows:
+        row = list(row)
+        for i, fmt in by_index.items():
+            row[i] = fmt(row[i])
+        yield row
+
+
+def table(rows, headers, mode=None, widths=None, formats=None, out=None):
+    """Write rows under headers; returns the number of rows written.
+
+    rows is any iterable and is consumed incrementally except in grid mode. Rows
+    may be dicts: headers="keys" takes the first row's keys, a list picks those keys.
+    formats maps a header to a callable applied to that column in grid and fixed
+    mode only (e.g. money), so tsv and jsonl keep the raw values.
+    """
+    out = out or sys.stdout
+    mode = mode or MODE
+    rows = iter(rows)
+    sample = list(islice(rows, SAMPLE_ROWS + 1))
+    if sample and isinstance(sample[0], dict):
+        keys = list(sample[0]) if headers == "keys" else list(headers)
+        sample = [[r.get(k) for k in keys] for r in sample]
+        rows = ([r.get(k) for k in keys] for r in rows)
+        headers = keys
+    elif headers == "keys":
+        headers = []
+    if mode == "auto":
+        mode = "grid" if len(sample) <= SAMPLE_ROWS else "fixed"
+    if formats and mode in ("grid", "fixed"):
+        sample = list(_apply(formats, headers, sample))
+        rows = _apply(formats, headers, rows)
+    if mode == "grid":
+        sample.extend(rows)
+        _grid(sample, headers, out)
+        return len(sample)
+    lines, line = _FORMATTERS[mode](headers, sample, widths)
+    count, chunk = 0, sample
+    while chunk or lines:
+        _write(out, lines, line, chunk)
+        count += len(chunk)
+        lines, chunk = [], list(islice(rows, CHUNK_ROWS))
+    return count
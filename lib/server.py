@@ -0,0 +1,272 @@
+# lib/server.py
+"""Local HTTP/JSON API over the models: `python lib/cli.py serve [--port 8000]`.
+
+Each request runs in its own thread with its own Session, drawn from an engine
+whose connection pool is sized to the number of concurrent workers.
+
+    GET    /departments?after=<id>&limit=<n>     keyset-paginated list
+    GET    /departments?name=<name>              find_by_name
+    GET    /departments/<id>                     find_by_id
+    GET    /departments/<id>/employees           paginated members
+    POST   /departments                          create   {"name", "location"}
+    PATCH  /departments/<id>                     update   (any fields)
+    DELETE /departments/<id>?reassign_to=<id>    members are deleted, or moved (&dry_run=1 only counts)
+
+    /employees and /projects follow the same pattern; additionally
+    GET    /employees?q=<text>&limit=<n>         Employee.search
+    POST   /projects/<id>/employees              assign   {"employee_id"} or {"employee_ids": [...]}
+    DELETE /projects/<id>/employees/<emp_id>     remove one assignment
+    GET    /changes?since=<seq>&limit=<n>&table=<t1,t2>   change log (incremental sync)
+"""
+import json
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from models import DB_PATH, Session, init_db, make_engine
+from models.changes import changes_since
+from models.department import Department
+from models.employee import Employee
+from models.project import Project
+
+DEFAULT_PAGE = 50
+MAX_PAGE = 1000
+SEARCH_LIMIT = 10
+RESOURCES = {"departments": Department, "employees": Employee, "projects": Project}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _int(value, name):
+    if value is None or not str(value).isdigit():
+        raise HTTPError(400, f"{name} must be a non-negative integer")
+    return int(value)
+
+
+def _limit(query, default):
+    """The ?limit= page size: at least 1 (a page must have a last row to continue from), at most MAX_PAGE."""
+    limit = _int(query.get("limit", default), "limit")
+    if limit < 1:
+        raise HTTPError(400, "limit must be at least 1")
+    return min(limit, MAX_PAGE)
+
+
+def _one(session, cls, id_):
+    obj = cls.find_by_id(session, id_)
+    if not obj:
+        raise HTTPError(404, f"{cls.__name__} {id_} not found")
+    return obj
+
+
+def _page(rows, limit):
+    """Paginated envelope; `next` is the `after` value for the following page."""
+    items = [r.to_dict() for r in rows]
+    return {"items": items, "next": items[-1]["id"] if len(items) == limit else None}
+
+
+# ---------- Handlers: return JSON-able results, raise HTTPError for client errors ----------
+def list_or_find(session, cls, query):
+    if "name" in query:
+        obj = cls.find_by_name(session, query["name"])
+        if not obj:
+            raise HTTPError(404, f"{cls.__name__} '{query['name']}' not found")
+        return obj.to_dict()
+    if cls is Employee and "q" in query:
+        limit = _limit(query, SEARCH_LIMIT)
+        return {"items": [e.to_dict() for e in Employee.search(session, query["q"], limit)], "next": None}
+    limit = _limit(query, DEFAULT_PAGE)
+    after = _int(query.get("after", 0), "after")
+    return _page(cls.page(session, after, limit), limit)
+
+
+def get_one(session, cls, id_, query):
+    return _one(session, cls, id_).to_dict()
+
+
+def department_employees(session, cls, id_, query):
+    limit = _limit(query, DEFAULT_PAGE)
+    after = _int(query.get("after", 0), "after")
+    d = _one(session, Department, id_)
+    return _page(Employee.page(session, after, limit, department_id=d.id), limit)
+
+
+def create(session, cls, body):
+    if cls is Employee and not Department.find_by_id(session, body.get("department_id")):
+        raise HTTPError(400, "department_id must reference an existing department")
+    return cls.create(session, **body).to_dict()
+
+
+def update(session, cls, id_, body):
+    obj = _one(session, cls, id_)
+    if cls is Employee and "department_id" in body and not Department.find_by_id(session, body["department_id"]):
+        raise HTTPError(400, "department_id must reference an existing department")
+    return obj.update(session, **body).to_dict()
+
+
+def delete(session, cls, id_, query):
+    obj = _one(session, cls, id_)
+    if cls is not Department:
+        obj.delete(session)
+        return {"deleted": int(id_)}
+    # ?dry_run=1 counts what would go; ?reassign_to=<id> moves the members instead
+    if query.get("dry_run") in ("1", "true"):
+        return obj.delete_preview(session)
+    target = None
+    if "reassign_to" in query:
+        target = Department.find_by_id(session, _int(query["reassign_to"], "reassign_to"))
+        if not target:
+            raise HTTPError(400, "reassign_to must reference an existing department")
+    return dict(obj.delete(session, reassign_to=target), deleted=int(id_))
+
+
+def assign(session, id_, body):
+    p = _one(session, Project, id_)
+    ids = body.get("employee_ids") or [body.get("employee_id")]
+    return {"project_id": p.id, "assigned": p.assign_employees(session, [_int(i, "employee_id") for i in ids])}
+
+
+def unassign(session, id_, emp_id):
+    p = _one(session, Project, id_)
+    return {"project_id": p.id, "removed": p.unassign_employees(session, [int(emp_id)])}
+
+
+def changes(session, query):
+    """Change-log page; `next` is the `since` value for the following request."""
+    since = _int(query.get("since", 0), "since")
+    limit = _limit(query, MAX_PAGE)
+    tables = [t for t in query.get("table", "").split(",") if t] or None
+    items = changes_since(session, since, limit, tables)
+    return {"items": items, "next": items[-1]["seq"] if items else since}
+
+
+_FIELDS = {
+    Department: {"name", "location"},
+    Employee: {"first_name", "last_name", "email", "salary", "department_id"},
+    Project: {"name", "budget"},
+}
+
+
+def _route(method, path):
+    """Return a callable(session, query, body) for the request, or raise HTTPError."""
+    parts = [p for p in path.split("/") if p]
+    if parts == ["changes"] and method == "GET":
+        return lambda s, q, b: changes(s, q)
+    if not parts or parts[0] not in RESOURCES:
+        raise HTTPError(404, f"no such resource: {path}")
+    cls = RESOURCES[parts[0]]
+    rest = parts[1:]
+
+    def fields(body):
+        unknown = set(body) - _FIELDS[cls]
+        if unknown:
+            raise HTTPError(400, f"unknown field(s): {', '.join(sorted(unknown))}")
+        return body
+
+    if not rest:
+        if method == "GET":
+            return lambda s, q, b: list_or_find(s, cls, q)
+        if method == "POST":
+            return lambda s, q, b: create(s, cls, fields(b))
+    elif len(rest) == 1 and rest[0].isdigit():
+        id_ = rest[0]
+        if method == "GET":
+            return lambda s, q, b: get_one(s, cls, id_, q)
+        if method == "PATCH":
+            return lambda s, q, b: update(s, cls, id_, fields(b))
+        if method == "DELETE":
+            return lambda s, q, b: delete(s, cls, id_, q)
+    elif len(rest) >= 2 and rest[0].isdigit() and rest[1] == "employees":
+        id_ = rest[0]
+        if cls is Department and len(rest) == 2 and method == "GET":
+            return lambda s, q, b: department_employees(s, cls, id_, q)
+        if cls is Project and len(rest) == 2 and method == "POST":
+            return lambda s, q, b: assign(s, id_, b)
+        if cls is Project and len(rest) == 3 and rest[2].isdigit() and method == "DELETE":
+            return lambda s, q, b: unassign(s, id_, rest[2])
+    raise HTTPError(405 if method != "GET" else 404, f"{method} {path} is not supported")
+
+
+class APIHandler(BaseHTTPRequestHandler):
+    server_version = "EMS/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status, payload):
+        data = json.dumps(payload, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self):
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            action = _route(self.command, url.path)
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+            if not isinstance(body, dict):
+                raise HTTPError(400, "request body must be a JSON object")
+            with Session(bind=self.server.engine) as s:
+                try:
+                    result = action(s, query, body)
+                except Exception:
+                    s.rollback()
+                    raise
+            status = 201 if self.command == "POST" else 200
+            self._send(status, result)
+        except HTTPError as e:
+            self._send(e.status, {"error": str(e)})
+        except json.JSONDecodeError as e:
+            self._send(400, {"error": f"invalid JSON: {e}"})
+        except (ValueError, TypeError) as e:  # model validators, bad field values
+            self._send(400, {"error": str(e)})
+        except IntegrityError as e:
+            self._send(409, {"error": str(e.orig)})
+        except OperationalError as e:  # e.g. database is locked
+            self._send(503, {"error": str(e.orig)})
+        except Exception:
+            # a bug in one handler must not drop the client's connection
+            self.log_error("%s", traceback.format_exc())
+            self._send(500, {"error": "internal server error"})
+
+    do_GET = do_POST = do_PATCH = do_DELETE = _handle
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class APIServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Default backlog (5) drops bursts of connections into SYN retries (~1 s each)
+    request_queue_size = 128
+
+    def __init__(self, address, workers=8, quiet=False):
+        super().__init__(address, APIHandler)
+        # One thread per connection, but at most `workers` run queries at once:
+        # the pool has exactly that many connections and the rest wait for one
+        self.engine = make_engine(DB_PATH, pool_size=workers, max_overflow=0, pool_timeout=30)
+        self.quiet = quiet
+
+    def server_close(self):
+        super().server_close()
+        self.engine.dispose()
+
+
+def serve(host="127.0.0.1", port=8000, workers=8, quiet=False):
+    init_db()
+    server = APIServer((host, port), workers=workers, quiet=quiet)
+    print(f"Serving EMS API on http://{host}:{server.server_address[1]} ({workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,53 @@
+# lib/tests/conftest.py
+import os
+import sys
+import tempfile
+
+import pytest
+
+# models opens EMS_DB_PATH on import; never let a test run touch company.db
+os.environ.setdefault("EMS_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="ems-tests-"), "company.db"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event  # noqa: E402
+
+from benchmarks.synthetic import populate  # noqa: E402
+from models import Base, init_db, make_engine  # noqa: E402
+
+# Every mapper (and its relationships) must be configured before a Session is used
+init_db()
+
+
+@pytest.fixture
+def company(tmp_path):
+    """make(name, employees, departments, projects) -> engine on a fresh synthetic database."""
+    engines = []
+
+    def make(name, employees, departments=None, projects=None):
+        eng = make_engine(str(tmp_path / f"{name}.db"), "fast")
+        Base.metadata.create_all(eng)
+        populate(eng, employees, departments=departments, projects=projects)
+        engines.append(eng)
+        return eng
+
+    yield make
+    for eng in engines:
+        eng.dispose()
+
+
+@pytest.fixture
+def statements():
+    """count(engine, fn) -> SQL statements executed on engine while fn() runs."""
+    def count(eng, fn):
+        seen = []
+
+        def before(conn, cursor, statement, parameters, context, executemany):
+            seen.append(statement)
+
+        event.listen(eng, "before_cursor_execute", before)
+        try:
+            fn()
+        finally:
+            event.remove(eng, "before_cursor_execute", before)
+        return len(seen)
+    return count
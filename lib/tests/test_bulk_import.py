@@ -0,0 +1,30 @@
+# lib/tests/test_bulk_import.py
+"""Bad JSONL lines are rejected one by one; the rest of the file is still imported."""
+from models import Session
+from models.bulk import bulk_import
+from models.department import Department
+
+
+def test_jsonl_lines_that_are_not_objects_are_rejected(company, tmp_path):
+    path = tmp_path / "departments.jsonl"
+    path.write_text('{"name": "Imported Ops", "location": "HQ"}\n[1, 2]\n"x"\n3\n{bad\n'
+                    '{"name": "Imported Lab", "location": "Annex"}\n', encoding="utf-8")
+    eng = company("import", 0, departments=1, projects=1)
+    with Session(bind=eng) as s:
+        report = bulk_import(s, "departments", str(path))
+        assert report.inserted == 2
+        assert [line for line, _ in report.errors] == [2, 3, 4, 5]
+        assert [msg for _, msg in report.errors[:3]] == ["expected a JSON object"] * 3
+        assert {"Imported Ops", "Imported Lab"} <= {d.name for d in Department.get_all(s)}
+
+
+def test_jsonl_values_of_the_wrong_type_are_rejected(company, tmp_path):
+    path = tmp_path / "employees.jsonl"
+    row = '{"first_name": "Ada", "last_name": "Lovelace", "email": %s, "salary": 50000, "department_id": 1}\n'
+    path.write_text(row % '"ada@example.com"' + row % "123" + row % '["x@y.z"]' + row % '"ada2@example.com"',
+                    encoding="utf-8")
+    eng = company("import", 0, departments=1, projects=1)
+    with Session(bind=eng) as s:
+        report = bulk_import(s, "employees", str(path))
+        assert report.inserted == 2
+        assert [line for line, _ in report.errors] == [2, 3]
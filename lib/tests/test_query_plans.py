@@ -0,0 +1,58 @@
+# lib/tests/test_query_plans.py
+"""Indexed lookups stay index searches: EXPLAIN QUERY PLAN of the statements the
+helpers actually issue must not contain a full scan of employees or employee_project,
+and must name the index the lookup is meant to use."""
+import pytest
+from sqlalchemy import event, select
+
+from models import Session
+from models.employee import Employee
+from models.project import Project, employee_project
+
+FULL_SCANS = ("SCAN employees", "SCAN employee_project")
+
+# lookup -> (what it runs, text its plan must contain)
+LOOKUPS = {
+    "full name": (lambda s: Employee.find_by_name(s, "Mary Smith"), "ix_employee_last_first"),
+    "first or last name": (lambda s: Employee.find_by_name(s, "Smith"), "MULTI-INDEX OR"),
+    "email": (lambda s: s.execute(select(Employee).where(Employee.email == "mary.smith@corp.example")).first(),
+              "(email=?)"),
+    "department listing": (lambda s: Employee.page(s, department_id=2, limit=50), "ix_employee_department_id"),
+    "project members (reverse assignment)": (lambda s: s.get(Project, 3).employees,
+                                             "COVERING INDEX ix_employee_project_project_employee"),
+    "project member ids (reverse assignment)": (lambda s: s.execute(
+        select(employee_project.c.employee_id).where(employee_project.c.project_id == 3)).all(),
+        "COVERING INDEX ix_employee_project_project_employee"),
+}
+
+
+def _plans(eng, s, fn):
+    """EXPLAIN QUERY PLAN detail lines of every statement fn() executes."""
+    seen = []
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        seen.append((statement, parameters))
+
+    event.listen(eng, "before_cursor_execute", before)
+    try:
+        fn()
+    finally:
+        event.remove(eng, "before_cursor_execute", before)
+    conn = s.connection()
+    return [(statement, [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, params)])
+            for statement, params in seen if statement.lstrip().upper().startswith("SELECT")]
+
+
+@pytest.mark.parametrize("lookup", LOOKUPS)
+def test_lookup_uses_an_index(company, lookup):
+    eng = company("plans", 2000, departments=8, projects=20)
+    with Session(bind=eng) as s:
+        s.get(Project, 3)  # load outside the explained block; only the member query is checked
+        run, expected = LOOKUPS[lookup]
+        plans = _plans(eng, s, lambda: run(s))
+        assert plans, "lookup issued no SELECT"
+        for statement, details in plans:
+            scans = [d for d in details if d.startswith(FULL_SCANS)]
+            assert not scans, f"{lookup}: {scans}\n{statement}"
+        details = [d for _, ds in plans for d in ds]
+        assert any(expected in d for d in details), f"{lookup}: expected {expected!r} in {details}"
@@ -0,0 +1,27 @@
+# lib/tests/test_ref_cache.py
+"""Cached lookups of rows that break a rule added after they were stored."""
+from sqlalchemy import update
+
+from models import Session
+from models.cache import clear_caches
+from models.department import Department
+from models.project import Project
+
+
+def test_lookup_of_invalid_stored_row(company):
+    clear_caches()
+    eng = company("legacy", 20, departments=3, projects=3)
+    with eng.begin() as conn:
+        conn.execute(update(Department.__table__).where(Department.__table__.c.id == 2)
+                     .values(name="Legacy", location=""))
+        conn.execute(update(Project.__table__).where(Project.__table__.c.id == 2).values(name=" "))
+    try:
+        for _ in range(2):  # a miss that caches the row, then a hit on the cached copy
+            with Session(bind=eng) as s:
+                dept = Department.find_by_name(s, "Legacy")
+                assert (dept.id, dept.location) == (2, "")
+                assert Department.find_by_id(s, 2) is dept
+                assert Project.find_by_id(s, 2).name == " "
+        assert Department._cache.hits and Project._cache.hits
+    finally:
+        clear_caches()
@@ -0,0 +1,25 @@
+# lib/tests/test_roster.py
+"""The project roster is one query however many projects and employees there are."""
+import pytest
+
+import helpers
+from models import Session
+from models.project import Project
+
+
+@pytest.mark.parametrize("listing", ["roster", "list_projects"])
+def test_roster_statement_count_is_constant(company, statements, monkeypatch, capsys, listing):
+    counts = []
+    for name, employees, projects in (("small", 20, 3), ("large", 400, 40)):
+        eng = company(name, employees, projects=projects)
+        with Session(bind=eng) as s:
+            s.connection()  # connect (pragmas) outside the counted block
+            if listing == "roster":
+                rows = []
+                counts.append(statements(eng, lambda: rows.extend(Project.roster(s, chunk_size=50))))
+                assert {r.project_id for r in rows} == set(range(1, projects + 1))
+            else:
+                monkeypatch.setattr(helpers, "_read_session", lambda: s)
+                counts.append(statements(eng, helpers.list_projects))
+                assert capsys.readouterr().out.count("\n") > projects
+    assert counts[0] == counts[1] == 1
@@ -0,0 +1,45 @@
+# lib/tests/test_server.py
+"""Bad requests get a JSON error response, never a dropped connection."""
+import json
+import threading
+from http.client import HTTPConnection
+
+import pytest
+
+import server
+
+
+@pytest.fixture
+def api():
+    srv = server.APIServer(("127.0.0.1", 0), workers=2, quiet=True)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+
+    def request(method, path):
+        conn = HTTPConnection(*srv.server_address, timeout=10)
+        try:
+            conn.request(method, path)
+            resp = conn.getresponse()
+            return resp.status, json.loads(resp.read())
+        finally:
+            conn.close()
+
+    yield request
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.mark.parametrize("path", ["/employees?limit=0", "/departments/1/employees?limit=0",
+                                  "/employees?q=a&limit=0", "/changes?limit=0"])
+def test_zero_limit_is_rejected(api, path):
+    assert api("GET", path) == (400, {"error": "limit must be at least 1"})
+
+
+def test_unexpected_error_is_a_json_500(api, monkeypatch):
+    def broken(session, cls, query):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(server, "list_or_find", broken)
+    assert api("GET", "/employees") == (500, {"error": "internal server error"})
+    monkeypatch.undo()
+    assert api("GET", "/employees")[0] == 200